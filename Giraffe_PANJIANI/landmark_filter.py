@@ -0,0 +1,89 @@
+"""
+关键点平滑（One-Euro 滤波）
+MediaPipe 的关键点逐帧抖动，相似度在 85% 的阈值上下跳动，玩家要多保持一会儿才能过关；
+轻量模型（model_complexity=0）抖动更大，原来无法使用。
+
+One-Euro 滤波是按速度自适应截止频率的低通滤波：
+    - 静止时截止频率低（min_cutoff），抖动被压平，相似度稳定
+    - 快速移动时截止频率随速度升高（beta），跟手不拖尾
+每个关键点的 x、y、z 各自独立滤波，全部用 numpy 一次算完
+
+参数在 pose_configs.py 中配置（LANDMARK_FILTER 为默认值，单个姿势可用 "filter" 覆盖）
+
+用法：
+    smoother = LandmarkFilter(**get_filter_params(pose_name))
+    points = smoother(points, timestamp)     # points: (33, 3) 归一化坐标，timestamp: 秒
+    smoother.reset()                          # 人离开画面后重新开始
+"""
+import math
+
+import numpy as np
+
+from pose_configs import LANDMARK_FILTER
+
+
+def _alpha(cutoff, dt):
+    """截止频率 cutoff（Hz）、采样间隔 dt（秒）时低通滤波的平滑系数"""
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class LandmarkFilter:
+    """逐关键点的 One-Euro 滤波"""
+
+    def __init__(self, min_cutoff=None, beta=None, d_cutoff=None, enabled=None):
+        """
+        参数为 None 时使用 pose_configs.LANDMARK_FILTER 中的默认值（与游戏中相同）
+
+        Args:
+            min_cutoff: 静止时的截止频率（Hz），越小越稳，但慢速移动时越拖尾
+            beta: 速度对截止频率的放大系数（坐标为归一化坐标，速度单位为 画面/秒），越大移动时越跟手
+            d_cutoff: 速度估计的截止频率（Hz）
+            enabled: False 时原样返回（用于对比）
+        """
+        self.min_cutoff = LANDMARK_FILTER["min_cutoff"] if min_cutoff is None else min_cutoff
+        self.beta = LANDMARK_FILTER["beta"] if beta is None else beta
+        self.d_cutoff = LANDMARK_FILTER["d_cutoff"] if d_cutoff is None else d_cutoff
+        self.enabled = LANDMARK_FILTER["enabled"] if enabled is None else enabled
+        self.reset()
+
+    def reset(self):
+        """清空状态（人离开画面、切换姿势时调用）"""
+        self._value = None
+        self._speed = None
+        self._time = None
+
+    def __call__(self, points, timestamp):
+        """
+        滤波一帧
+
+        Args:
+            points: 关键点数组 (N, 2) 或 (N, 3)
+            timestamp: 这一帧的时间（秒，单调递增）
+
+        Returns:
+            平滑后的关键点数组（同形状）
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if not self.enabled:
+            return points
+        if self._value is None:
+            self._value = points.copy()
+            self._speed = np.zeros_like(points)
+            self._time = timestamp
+            return self._value.copy()
+
+        dt = timestamp - self._time
+        if dt <= 0:
+            return self._value.copy()
+        self._time = timestamp
+
+        # 速度先低通，再按速度决定每个坐标的截止频率
+        speed = (points - self._value) / dt
+        a = _alpha(self.d_cutoff, dt)
+        self._speed += a * (speed - self._speed)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._speed)
+        tau = 1.0 / (2 * math.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self._value += a * (points - self._value)
+        return self._value.copy()
@@ -1,11 +1,24 @@
 import pygame
-import cv2
 import sys
+import logging
 from pathlib import Path
-from PIL import Image
-import glob
-from importlib import import_module
-import numpy as np
+
+# 项目根目录下的公共模块（frame_profiler 等）
+ROOT_DIR = str(Path(__file__).parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import lazy_import  # 尽早导入，启动计时从这里开始
+import frame_profiler
+import frame_scheduler
+import input_replay
+import scene_data
+import scene_engine
+from triggers import ENTER
+import game_log
+
+# cv2/numpy 只在绘制像素文字时用到
+cv2 = lazy_import.lazy("cv2")
+np = lazy_import.lazy("numpy")
 
 
 def draw_pixel_text(surface, text, position, color, pixel_size=3, font_scale=1.0):
@@ -47,111 +60,7 @@ def draw_pixel_text(surface, text, position, color, pixel_size=3, font_scale=1.0
                     pygame.draw.rect(surface, color, 
                                    (block_x, block_y, step, step))
 
-# 动态导入 000firstfloor_pose 模块
-firstfloor_pose_module = import_module('000firstfloor_pose')
-FirstFloorPoseChallenge = firstfloor_pose_module.PoseChallenge
-
-# 动态导入 001secondfloor_pose 模块
-secondfloor_pose_module = import_module('001secondfloor_pose')
-SecondFloorPoseChallenge = secondfloor_pose_module.PoseChallenge
-
-
-# 前景与背景图片的路径（确保 GIF 路径为当前脚本同目录下）
-FOREGROUND_FRAMES_PATTERN = str(Path(__file__).parent.parent / "zammi_*.png")
-BACKGROUND_GIF_PATH = str(Path(__file__).parent / "giraffe home.gif")
-VIDEO_PATH = Path(r"875b55be8f5a0e72b6e28c650a49a795.mp4")
-
-
-def load_image(path: Path):
-    if not path.exists():
-        raise FileNotFoundError(f"找不到图片: {path}")
-    # 使用 str(path) 以兼容 pygame
-    return pygame.image.load(str(path))
-
-
-def load_png_frames(pattern: str):
-    """加载PNG序列帧"""
-    frame_files = sorted(glob.glob(pattern))
-    if not frame_files:
-        raise FileNotFoundError(f"找不到匹配的PNG文件: {pattern}")
-    
-    # 重新排序：将 zammi_0005.png 作为第一帧
-    # 新顺序：0005, 0006, 0007, ..., 0016, 0001, 0002, 0003, 0004
-    reordered_files = []
-    frame_0005 = None
-    other_frames = []
-    
-    for frame_file in frame_files:
-        if 'zammi_0005.png' in frame_file:
-            frame_0005 = frame_file
-        else:
-            other_frames.append(frame_file)
-    
-    # 如果找到了 zammi_0005.png，将它放在最前面
-    if frame_0005:
-        reordered_files.append(frame_0005)
-        # 添加 0006-0016
-        for f in other_frames:
-            if 'zammi_0006.png' <= f.split('\\')[-1] <= 'zammi_0016.png':
-                reordered_files.append(f)
-        # 添加 0001-0004
-        for f in other_frames:
-            if 'zammi_0001.png' <= f.split('\\')[-1] <= 'zammi_0004.png':
-                reordered_files.append(f)
-    else:
-        reordered_files = frame_files
-    
-    frames = []
-    print(f"正在加载 {len(reordered_files)} 个PNG帧...")
-    print(f"帧顺序: {[f.split('\\')[-1] for f in reordered_files[:5]]}...")
-    
-    for frame_file in reordered_files:
-        surface = pygame.image.load(frame_file).convert_alpha()
-        frames.append(surface)
-    
-    # 所有帧使用相同的持续时间（100毫秒）
-    durations = [100] * len(frames)
-    
-    return frames, durations
-
-
-def load_gif_frames(gif_path: str, target_size=(1280, 720)):
-    """加载 GIF 文件的所有帧并缩放到目标尺寸"""
-    if not Path(gif_path).exists():
-        raise FileNotFoundError(f"找不到GIF文件: {gif_path}")
-    
-    pil_img = Image.open(gif_path)
-    frames = []
-    durations = []
-    
-    try:
-        for i in range(getattr(pil_img, "n_frames", 1)):
-            pil_img.seek(i)
-            frame = pil_img.convert("RGBA")
-            # 缩放到目标尺寸
-            frame = frame.resize(target_size, Image.Resampling.LANCZOS)
-            mode = frame.mode
-            size = frame.size
-            data = frame.tobytes()
-            py_image = pygame.image.fromstring(data, size, mode)
-            frames.append(py_image)
-            # 获取帧持续时间（毫秒），默认 100ms
-            duration = pil_img.info.get('duration', 100)
-            durations.append(duration)
-    except Exception as e:
-        # 如果只有单帧或读取失败，至少返回第一帧
-        frame = pil_img.convert("RGBA")
-        # 缩放到目标尺寸
-        frame = frame.resize(target_size, Image.Resampling.LANCZOS)
-        mode = frame.mode
-        size = frame.size
-        data = frame.tobytes()
-        py_image = pygame.image.fromstring(data, size, mode)
-        frames.append(py_image)
-        durations.append(100)
-    
-    print(f"正在加载 GIF：{len(frames)} 帧，缩放至 {target_size[0]}×{target_size[1]}")
-    return frames, durations
+log = game_log.get_logger("giraffe")
 
 
 def main():
@@ -161,70 +70,50 @@ def main():
     
     pygame.init()
 
-    # 先创建临时窗口以便加载帧
-    temp_screen = pygame.display.set_mode((100, 100))
-    
-    # 加载背景 GIF 动画
-    bg_frames, bg_durations = load_gif_frames(BACKGROUND_GIF_PATH)
-    bg_current_frame = 0
-    bg_frame_timer = 0
-    print(f"✅ 成功加载 {len(bg_frames)} 帧背景动画")
-    
-    # 加载前景PNG序列帧动画（角色）
-    fg_frames, fg_durations = load_png_frames(FOREGROUND_FRAMES_PATTERN)
-    fg_current_frame = 0
-    fg_frame_timer = 0
-    print(f"✅ 成功加载 {len(fg_frames)} 帧角色动画")
-
-    # 获取第一帧背景作为基础
-    bg = bg_frames[0]
-    
-    # 转换背景加速显示
-    bg_frames_converted = []
-    for frame in bg_frames:
-        try:
-            if getattr(frame, 'get_alpha', lambda: None)() is not None or frame.get_bitsize() == 32:
-                bg_frames_converted.append(frame.convert_alpha())
-            else:
-                bg_frames_converted.append(frame.convert())
-        except Exception:
-            bg_frames_converted.append(frame)
-    bg_frames = bg_frames_converted
-    bg = bg_frames[0]
+    # 背景、角色、出生点、触发点和对话页见 scenes/giraffe.json，窗口大小固定为 1280×720（与邮局图片相同）
+    scene = scene_data.load("giraffe")
 
-    # 一楿触发点参数
-    circle_radius = 40  # 触发判定半径（检测用，较宽松）
-    visual_radius = 10  # 白色圆点的视觉半径（较小）
-    floor1_trigger_x = 550  # 一楿触发点 X 坐标
-    floor1_trigger_y = 585  # 一楿触发点 Y 坐标（590-5）
+    # 背景 GIF、角色动画帧和对话框图片在后台线程加载，每个动画有一帧就绪即开始，其余帧边玩边加入
+    # 构建过增量数据时背景只保留一张画布，切换帧时只贴变化的小块
+    screen, loading, background, fg_stream, dialogue_stream = scene_engine.open_scene(scene)
 
-    # 二楼触发点参数
-    floor2_trigger_x = 1000  # 二楼触发点 X 坐标
-    floor2_trigger_y = 385   # 二楼触发点 Y 坐标（390-5）
-
-    # 窗口大小固定为 1280×720（与邮局图片相同）
-    screen = pygame.display.set_mode((1280, 720))
-    pygame.display.set_caption("WASD 控制 — Esc 退出 | GIF 动画")
+    # 帧列表随加载增长，动画按已就绪的帧数循环
+    fg_frames, fg_durations = fg_stream.frames, fg_stream.durations
+    fg_current_frame = 0
+    fg_frame_timer = 0
 
-    clock = pygame.time.Clock()
+    # 一楼/二楼触发点按角色检测点判断（网格索引 + 平方距离），挑战参数在区域的 data 中
+    triggers = scene.trigger_index(screen.get_size())
+    floor1_zone = triggers.zones["floor1"]
+    floor2_zone = triggers.zones["floor2"]
+    # 二楼挑战完成后显示的对话页（0: Sleeping, 1: Awakened, 2: Happy）
+    dialogue_pages = floor2_zone.data["trigger"].pages
+    # 画面左右边缘按角色中心点判断
+    edges = scene.exit_index(screen.get_size())
+
+    clock = input_replay.Clock()
+    # 字体只创建一次（SysFont 每次都要查找字体文件）
     font = pygame.font.SysFont(None, 20)
+    ruler_font = pygame.font.SysFont(None, 16)
+    axis_label_font = pygame.font.SysFont(None, 14)
+
+    # 第一帧显示后在后台导入姿态挑战（mediapipe）和像素文字用到的 cv2
+    # 姿态挑战模块依赖 mediapipe（导入约 1 秒），延迟导入
+    pose_modules = {t.name: lazy_import.lazy(t.data["challenge"]["module"]) for t in scene.triggers}
+    lazy_import.schedule_preload("cv2", "numpy", *(t.data["challenge"]["module"] for t in scene.triggers))
 
     # 初始位置：zamimi 中心点在显示坐标 (140, 495)
     # 红色检测点在中心点左侧40像素、下方100像素处，即 (100, 595)
     fg = fg_frames[fg_current_frame]
-    center_x, center_y = 140, 495
-    
-    # 计算左上角坐标（blit 使用左上角坐标）
-    x = center_x - fg.get_width() // 2
-    y = center_y - fg.get_height() // 2
+    # 出生点是左上角坐标（blit 使用左上角坐标）
+    x, y = scene.spawn_position(screen.get_size(), fg.get_size())
+    center_x = x + fg.get_width() // 2
+    center_y = y + fg.get_height() // 2
     
-    print(f"Zamimi初始位置: 中心点({center_x},{center_y}) -> 左上角({x},{y}), 尺寸({fg.get_width()}x{fg.get_height()})")
+    log.info("Zamimi初始位置: 中心点(%s,%s) -> 左上角(%s,%s), 尺寸(%sx%s)", center_x, center_y, x, y, fg.get_width(), fg.get_height())
 
     # 运动参数（每帧即时响应的简单实现，参考示例）
-    speed = 5  # 每帧移动像素（可调整，增大使移动更灵敏）
-
-    # 简单文字提示
-    font = pygame.font.SysFont(None, 20)
+    speed = scene.speed  # 每帧移动像素
 
     # 使用整数位置以匹配每帧位移
     x = int(x)
@@ -239,40 +128,39 @@ def main():
     floor1_challenge_completed = False  # 一楼挑战是否已完成
     floor2_challenge_completed = False  # 二楼挑战是否已完成
     
-    # 加载对话框图片（二楼挑战完成后显示）
-    dialogue_box_img1 = None  # 睡觉状态
-    dialogue_box_img2 = None  # 醒来状态
-    dialogue_box_img3 = None  # 高兴状态
     dialogue_page = 0  # 0: 第一页(Sleeping), 1: 第二页(Awakened), 2: 第三页(Happy)
-    
-    try:
-        dialogue_box_path1 = Path("Zammis-Delivery/assets/Dialogue box materials/Giraffe Dialogue Box1_Sleeping_New.png")
-        if dialogue_box_path1.exists():
-            dialogue_box_img1 = pygame.image.load(str(dialogue_box_path1)).convert_alpha()
-            print(f"✅ 已加载对话框图片1: {dialogue_box_img1.get_size()}")
-        else:
-            print(f"❌ 找不到对话框图片1: {dialogue_box_path1}")
-        dialogue_box_path2 = Path("Zammis-Delivery/assets/Dialogue box materials/Giraffe Dialogue Box2_Awakened_New.png")
-        if dialogue_box_path2.exists():
-            dialogue_box_img2 = pygame.image.load(str(dialogue_box_path2)).convert_alpha()
-            print(f"✅ 已加载对话框图片2: {dialogue_box_img2.get_size()}")
-        else:
-            print(f"❌ 找不到对话框图片2: {dialogue_box_path2}")
-        dialogue_box_path3 = Path("Zammis-Delivery/assets/Dialogue box materials/Giraffe Dialogue Box3_Happy_New.png")
-        if dialogue_box_path3.exists():
-            dialogue_box_img3 = pygame.image.load(str(dialogue_box_path3)).convert_alpha()
-            print(f"✅ 已加载对话框图片3: {dialogue_box_img3.get_size()}")
-        else:
-            print(f"❌ 找不到对话框图片3: {dialogue_box_path3}")
-    except Exception as e:
-        print(f"❌ 加载对话框图片失败: {e}")
 
+    def advance_dialogue():
+        """翻到下一页；最后一页启动下一个场景（pig.py），返回 False 表示本场景结束"""
+        nonlocal dialogue_page
+        page = dialogue_pages[dialogue_page]
+        if page.on_click == "next":
+            dialogue_page += 1
+            log.info("切换到对话框第%d页", dialogue_page + 1)
+            return True
+        import subprocess
+        subprocess.Popen([
+            sys.executable,
+            page.scene
+        ])
+        return False
+
+    # 当前进行中的姿态挑战（在本窗口内逐帧绘制，不再另开 OpenCV 窗口）
+    active_challenge = None
+    active_challenge_floor = 0
 
     running = True
-    prev_collided = False
-    prev_collided_floor2 = False
     while running:
-        for event in pygame.event.get():
+        frame_profiler.begin_frame()
+        for event in input_replay.events():
+            frame_profiler.handle_event(event)
+            frame_scheduler.handle_event(event)
+            if active_challenge is not None:
+                # 挑战进行中，事件交给挑战处理（Esc 放弃挑战）
+                active_challenge.handle_event(event)
+                if event.type == pygame.QUIT:
+                    running = False
+                continue
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.KEYDOWN:
@@ -280,30 +168,13 @@ def main():
                     running = False
                 # 空格键切换对话框
                 elif event.key == pygame.K_SPACE and floor2_challenge_completed:
-                    if dialogue_page < 2:
-                        dialogue_page += 1
-                        print(f"切换到对话框第{dialogue_page + 1}页")
-                    elif dialogue_page == 2:
-                        # 第三页剧情结束，进入 pig.py
-                        import subprocess
-                        subprocess.Popen([
-                            sys.executable,
-                            "Zammis-Delivery/pig.py"
-                        ])
+                    # 第三页剧情结束，进入 pig.py
+                    if not advance_dialogue():
                         running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 # 鼠标右键点击也可以切换对话框
                 if event.button == 3 and floor2_challenge_completed:
-                    if dialogue_page < 2:
-                        dialogue_page += 1
-                        print(f"切换到对话框第{dialogue_page + 1}页")
-                    elif dialogue_page == 2:
-                        # 第三页点击后，进入 pig.py
-                        import subprocess
-                        subprocess.Popen([
-                            sys.executable,
-                            "Zammis-Delivery/pig.py"
-                        ])
+                    if not advance_dialogue():
                         running = False
                 # 鼠标左键点击时，如果点击在文字框区域且二楼挑战已完成，则切换剧情页或进入 pig.py
                 elif event.button == 1 and floor2_challenge_completed:
@@ -313,25 +184,68 @@ def main():
                     by = screen.get_height() - h
                     bw = screen.get_width()
                     if bx <= mx <= bx + bw and by <= my <= by + h:
-                        if dialogue_page < 2:
-                            dialogue_page += 1
-                            print(f"切换到对话框第{dialogue_page + 1}页")
-                        elif dialogue_page == 2:
-                            import subprocess
-                            subprocess.Popen([
-                                sys.executable,
-                                "Zammis-Delivery/pig.py"
-                            ])
+                        if not advance_dialogue():
                             running = False
 
-        # 更新背景动画帧
-        bg_frame_timer += clock.get_time()
-        if bg_frame_timer >= bg_durations[bg_current_frame]:
-            bg_frame_timer = 0
-            bg_current_frame = (bg_current_frame + 1) % len(bg_frames)
-            bg = bg_frames[bg_current_frame]
+        frame_profiler.mark("events")
+
+        # 姿态挑战进行中：场景逻辑暂停，只推进并绘制挑战画面
+        if active_challenge is not None:
+            if not active_challenge.finished:
+                try:
+                    active_challenge.step(clock.get_time())
+                except Exception as e:
+                    log.error("姿态挑战错误: %s", e)
+                    import traceback
+                    traceback.print_exc()
+                    active_challenge.cancel()
+                frame_profiler.mark("update")
+                active_challenge.draw(screen)
+                frame_profiler.draw_overlay(screen)
+                frame_profiler.mark("draw")
+                pygame.display.flip()
+                frame_profiler.mark("flip")
+                # 摄像头挑战进行中保持全速
+                frame_scheduler.wake()
+                frame_scheduler.tick(clock)
+            if active_challenge.finished:
+                active_challenge.close()
+                if active_challenge_floor == 1:
+                    if active_challenge.is_completed:
+                        log.info("✅ 姿态挑战完成！")
+                        floor1_challenge_completed = True
+                        
+                        # 传送到二楼位置 - 红点(detect点)在 (580, 390)
+                        # detect_x = center_x - 40, detect_y = center_y + 100
+                        # 所以 center_x = 620, center_y = 290
+                        center_x, center_y = floor1_zone.data["teleport"]
+                        x = center_x - fg.get_width() // 2
+                        y = center_y - fg.get_height() // 2
+                        log.info("传送到二楼: 角色中心(%d,%d), 红点检测位置(%d,%d)", center_x, center_y, center_x - 40, center_y + 100)
+                    else:
+                        log.info("❌ 姿态挑战未完成")
+                else:
+                    if active_challenge.is_completed:
+                        log.info("✅ 二楼姿态挑战完成！")
+                        floor2_challenge_completed = True
+                        dialogue_page = 0  # 立即显示第一页对话框
+                    else:
+                        log.info("❌ 二楼姿态挑战未完成")
+                log.info("=== 返回游戏 ===")
+                active_challenge = None
+            continue
+
+        # 后台加载的动画帧逐帧加入动画（加载期间保持全速）
+        if not loading.done:
+            frame_scheduler.wake()
+            with frame_profiler.section("loading"):
+                loading.poll()
+
+        with frame_profiler.section("animation"):
+            # 更新背景动画帧
+            background.update(clock.get_time())
         
-        keys = pygame.key.get_pressed()
+        keys = input_replay.pressed()
         
         # 检测是否正在移动
         is_moving = False
@@ -339,21 +253,22 @@ def main():
         # 只有在二楼挑战未完成时才允许移动
         if not floor2_challenge_completed:
             # A/D 左右移动 - 调试所有按键
-            if any(keys):  # 如果有任何按键被按下
+            # 逐帧扫描全部按键开销不小，只在 DEBUG 级别时做
+            if log.isEnabledFor(logging.DEBUG) and any(keys):  # 如果有任何按键被按下
                 pressed_keys = [i for i, key in enumerate(keys) if key]
                 if len(pressed_keys) > 0 and len(pressed_keys) < 10:  # 避免输出过多
-                    print(f"检测到按键: {pressed_keys[:5]}")
+                    log.debug("检测到按键: %s", pressed_keys[:5])
             
             old_x = x
             # pygame.K_a 是 97, pygame.K_d 是 100
             if keys[pygame.K_a]:
                 x -= speed
                 is_moving = True
-                print(f"按下A键(97): x从{old_x}变为{x}")
+                log.debug("按下A键(97): x从%s变为%s", old_x, x)
             if keys[pygame.K_d]:
                 x += speed
                 is_moving = True
-                print(f"按下D键(100): x从{old_x}变为{x}")
+                log.debug("按下D键(100): x从%s变为%s", old_x, x)
         
         # 更新前景动画帧 - 只有在移动时才播放动画
         if is_moving:
@@ -368,50 +283,56 @@ def main():
             fg = fg_frames[0]
             fg_frame_timer = 0
 
-        # X轴边界限制：角色中心点在0到1280范围内移动
-        left_limit = -fg.get_width() // 2
-        right_limit = 1280 - fg.get_width() // 2
+        # X轴边界限制：角色中心点在场景给出的范围内（0 到 1280）移动
+        center_min, center_max = scene.bounds["center_x"]
+        left_limit = center_min - fg.get_width() // 2
+        right_limit = center_max - fg.get_width() // 2
         x = max(left_limit, min(right_limit, x))
 
-        # 检查角色是否走出画面并触发事件
-        if x <= left_limit:
-            print("角色已离开画面左侧！可以触发自定义事件。")
-            # TODO: 在此处添加你需要的触发逻辑（如切换场景、弹窗等）
-        elif x >= right_limit:
-            print("角色已离开画面右侧！可以触发自定义事件。")
-            # TODO: 在此处添加你需要的触发逻辑（如切换场景、弹窗等）
-
-        # 绘制背景（循环播放的邮局序列帧）
-        screen.fill((50, 50, 50))
-        try:
-            screen.blit(bg, (0, 0))
-        except Exception as e:
-            print(f"背景绘制错误: {e}")
-            pass
-        screen.blit(fg, (int(x), int(y)))
-
-        # 碰撞检测:使用角色中心点作为检测点
-        character_center_x = int(x) + fg.get_width() // 2
-        character_center_y = int(y) + fg.get_height() // 2
+        # 检查角色是否走出画面并触发事件（角色中心点到达左右边缘时触发一次）
+        for event in edges.update(int(x) + fg.get_width() // 2, int(y) + fg.get_height() // 2):
+            if event.type != ENTER:
+                continue
+            if event.zone.name == "left":
+                log.info("角色已离开画面左侧！可以触发自定义事件。")
+                # TODO: 在此处添加你需要的触发逻辑（如切换场景、弹窗等）
+            else:
+                log.info("角色已离开画面右侧！可以触发自定义事件。")
+                # TODO: 在此处添加你需要的触发逻辑（如切换场景、弹窗等）
+
+        frame_profiler.mark("update")
+
+        with frame_profiler.section("draw.scene"):
+            # 绘制背景（循环播放的邮局序列帧）
+            screen.fill((50, 50, 50))
+            try:
+                screen.blit(background.surface, (0, 0))
+            except Exception as e:
+                log.warning("背景绘制错误: %s", e)
+                pass
+            screen.blit(fg, (int(x), int(y)))
+
+        with frame_profiler.section("collision"):
+            # 碰撞检测:使用角色中心点作为检测点
+            character_center_x = int(x) + fg.get_width() // 2
+            character_center_y = int(y) + fg.get_height() // 2
         
-        # 中心点标记已隐藏（透明度0%）
-        # cross_size = 10
-        # overlay = pygame.Surface((screen.get_width(), screen.get_height()), pygame.SRCALPHA)
-        # cyan_color = (0, 255, 255, 0)  # 0%透明度（完全透明/不可见）
-        # pygame.draw.line(overlay, cyan_color, ...)
-        # screen.blit(overlay, (0, 0))
+            # 中心点标记已隐藏（透明度0%）
+            # cross_size = 10
+            # overlay = pygame.Surface((screen.get_width(), screen.get_height()), pygame.SRCALPHA)
+            # cyan_color = (0, 255, 255, 0)  # 0%透明度（完全透明/不可见）
+            # pygame.draw.line(overlay, cyan_color, ...)
+            # screen.blit(overlay, (0, 0))
         
-        # 检测点偏移：向左40像素，向下100像素（与main.py相同）
-        detect_x = character_center_x - 40
-        detect_y = character_center_y + 100
-
-        # 计算检测点与一楼触发点的距离
-        dist_x = detect_x - floor1_trigger_x
-        dist_y = detect_y - floor1_trigger_y
-        distance = (dist_x ** 2 + dist_y ** 2) ** 0.5
+            # 检测点偏移：向左40像素，向下100像素（与main.py相同）
+            detect_x = character_center_x - 40
+            detect_y = character_center_y + 100
 
-        # 实际触发仅在玩家检测点触碰白点时发生
-        collided = distance <= circle_radius
+            # 实际触发仅在玩家检测点触碰白点时发生
+            trigger_events = triggers.update(detect_x, detect_y)
+            collided = triggers.is_inside("floor1")
+            collided_floor2 = triggers.is_inside("floor2")
+            entered = {event.zone.name for event in trigger_events if event.type == ENTER}
 
         # 调试：在角色中心画小红点，显示距离与状态文本
         try:
@@ -419,185 +340,141 @@ def main():
         except Exception:
             pass
 
-        dbg_text = font.render(f"Floor1 dist={int(distance)} r={circle_radius} collided={collided}", True, (255, 255, 255))
+        dbg_text = font.render(f"Floor1 dist={int(floor1_zone.distance(detect_x, detect_y))} r={floor1_zone.radius} collided={collided}", True, (255, 255, 255))
         dbg_bg = pygame.Surface((dbg_text.get_width() + 8, dbg_text.get_height() + 6), pygame.SRCALPHA)
         dbg_bg.fill((0, 0, 0, 160))
         screen.blit(dbg_bg, (8, 40))
         screen.blit(dbg_text, (12, 42))
         
         # 二楼触发点距离调试信息
-        dist_x_floor2 = detect_x - floor2_trigger_x
-        dist_y_floor2 = detect_y - floor2_trigger_y
-        distance_floor2 = (dist_x_floor2 ** 2 + dist_y_floor2 ** 2) ** 0.5
-        collided_floor2 = distance_floor2 <= circle_radius
-        
-        dbg_text2 = font.render(f"Floor2 dist={int(distance_floor2)} r={circle_radius} collided={collided_floor2}", True, (255, 255, 255))
+        dbg_text2 = font.render(f"Floor2 dist={int(floor2_zone.distance(detect_x, detect_y))} r={floor2_zone.radius} collided={collided_floor2}", True, (255, 255, 255))
         dbg_bg2 = pygame.Surface((dbg_text2.get_width() + 8, dbg_text2.get_height() + 6), pygame.SRCALPHA)
         dbg_bg2.fill((0, 0, 0, 160))
         screen.blit(dbg_bg2, (8, 65))
         screen.blit(dbg_text2, (12, 67))
 
         # 在首次碰撞时在控制台打印一条记录，便于确认触发
-        if collided and not prev_collided:
-            print(f"触发：distance={distance:.1f}, circle_radius={circle_radius}, detect=({detect_x},{detect_y}), 一楼触发点=({floor1_trigger_x},{floor1_trigger_y})")
+        if "floor1" in entered:
+            log.info("触发：distance=%.1f, circle_radius=%s, detect=(%s,%s), 一楼触发点=(%s,%s)", floor1_zone.distance(detect_x, detect_y), floor1_zone.radius, detect_x, detect_y, floor1_zone.x, floor1_zone.y)
             
             # 触发一楼姿态挑战（仅触发一次）
             if not floor1_challenge_completed:
-                print("\n=== 启动姿态挑战 ===")
-                # 暂停 pygame 以运行挑战
+                log.info("=== 启动姿态挑战 ===")
+                # 挑战在本窗口内以覆盖层形式运行，清空积压的事件
                 pygame.event.clear()
                 
                 try:
-                    challenge = FirstFloorPoseChallenge(
-                        target_image_path="../assets/4poses/strong_action.png",
-                        pose_config_name="strong_action",
-                        window_size=(1280, 720),
-                        next_challenge={
-                            "image": "../assets/4poses/RiseHighWithTwoHand.png",
-                            "config": "RiseHighWithTwoHand"
-                        }
+                    spec = floor1_zone.data["challenge"]
+                    pose_module = pose_modules["floor1"]
+                    challenge = pose_module.PoseChallenge(
+                        target_image_path=spec["target_image"],
+                        pose_config_name=spec["pose_config"],
+                        window_size=screen.get_size(),
+                        next_challenge=spec.get("next")
                     )
-                    challenge_success = challenge.run()
-                    
-                    if challenge_success:
-                        print("✅ 姿态挑战完成！")
-                        floor1_challenge_completed = True
-                        
-                        # 传送到二楼位置 - 红点(detect点)在 (580, 390)
-                        # detect_x = center_x - 40, detect_y = center_y + 100
-                        # 所以 center_x = 620, center_y = 290
-                        center_x = 620
-                        center_y = 290
-                        x = center_x - fg.get_width() // 2
-                        y = center_y - fg.get_height() // 2
-                        print(f"传送到二楼: 角色中心({center_x},{center_y}), 红点检测位置({center_x-40},{center_y+100})")
-                    else:
-                        print("❌ 姿态挑战未完成")
+                    if pose_module.POSE_BACKEND == "highgui":
+                        # 调试：在独立 OpenCV 窗口中阻塞运行，结束后由下方统一处理结果
+                        challenge.run(backend="highgui")
+                        active_challenge = challenge
+                    elif challenge.start():
+                        active_challenge = challenge
+                    active_challenge_floor = 1
                 except Exception as e:
-                    print(f"姿态挑战错误: {e}")
+                    log.error("姿态挑战错误: %s", e)
                     import traceback
                     traceback.print_exc()
                 
-                print("=== 返回游戏 ===\n")
-                # 重新激活 pygame 窗口
-                pygame.display.set_mode((1280, 720))
-                pygame.display.set_caption("WASD 控制 — Esc 退出 | GIF 动画")
-                
-        prev_collided = collided
-        
         # 在首次碰撞二楼触发点时触发挑战（仅触发一次）
-        if collided_floor2 and not prev_collided_floor2:
-            print(f"触发二楼：distance={distance_floor2:.1f}, circle_radius={circle_radius}, detect=({detect_x},{detect_y}), 二楼触发点=({floor2_trigger_x},{floor2_trigger_y})")
+        if "floor2" in entered:
+            log.info("触发二楼：distance=%.1f, circle_radius=%s, detect=(%s,%s), 二楼触发点=(%s,%s)", floor2_zone.distance(detect_x, detect_y), floor2_zone.radius, detect_x, detect_y, floor2_zone.x, floor2_zone.y)
             # 触发二楼姿态挑战（仅触发一次）
             if not floor2_challenge_completed:
-                print("\n=== 启动二楼姿态挑战 ===")
+                log.info("=== 启动二楼姿态挑战 ===")
                 pygame.event.clear()
                 try:
-                    challenge = SecondFloorPoseChallenge(
-                        target_image_path="../assets/4poses/RaiseHighWithOneHand.png",
-                        pose_config_name="RaiseHighWithOneHand",
-                        window_size=(1280, 720),
-                        next_challenge={
-                            "image": "../assets/4poses/CompareHearts.png",
-                            "config": "CompareHearts"
-                        }
+                    spec = floor2_zone.data["challenge"]
+                    pose_module = pose_modules["floor2"]
+                    challenge = pose_module.PoseChallenge(
+                        target_image_path=spec["target_image"],
+                        pose_config_name=spec["pose_config"],
+                        window_size=screen.get_size(),
+                        next_challenge=spec.get("next")
                     )
-                    challenge_success = challenge.run()
-                    if challenge_success:
-                        print("✅ 二楼姿态挑战完成！")
-                        floor2_challenge_completed = True
-                        dialogue_page = 0  # 立即显示第一页对话框
-                    else:
-                        print("❌ 二楼姿态挑战未完成")
+                    if pose_module.POSE_BACKEND == "highgui":
+                        challenge.run(backend="highgui")
+                        active_challenge = challenge
+                    elif challenge.start():
+                        active_challenge = challenge
+                    active_challenge_floor = 2
                 except Exception as e:
-                    print(f"二楼姿态挑战错误: {e}")
+                    log.error("二楼姿态挑战错误: %s", e)
                     import traceback
                     traceback.print_exc()
-                print("=== 返回游戏 ===\n")
-                pygame.display.set_mode((1280, 720))
-                pygame.display.set_caption("WASD 控制 — Esc 退出 | GIF 动画")
-        
-        prev_collided_floor2 = collided_floor2
         
-        # 绘制一楿触发点标记（白色实心圆，较小的视觉半径）
-        pygame.draw.circle(screen, (255, 255, 255), (floor1_trigger_x, floor1_trigger_y), visual_radius)
-        
-        # 绘制二楿触发点标记（白色实心圆）
-        pygame.draw.circle(screen, (255, 255, 255), (floor2_trigger_x, floor2_trigger_y), visual_radius)
+        # 绘制一楼/二楼触发点标记（白色实心圆，较小的视觉半径）
+        for trigger in scene.triggers:
+            if trigger.marker:
+                pygame.draw.circle(screen, (255, 255, 255), (trigger.x, trigger.y), trigger.marker)
         # 不再绘制白点周围的额外可视化圈（按要求）
         
         # 如果二楼挑战已完成，显示对话框
-        if floor2_challenge_completed:
-            # 根据页面选择显示哪个对话框
-            if dialogue_page == 0:
-                current_dialogue_img = dialogue_box_img1
-            elif dialogue_page == 1:
-                current_dialogue_img = dialogue_box_img2
-            else:
-                current_dialogue_img = dialogue_box_img3
-            
-            if current_dialogue_img:
+        with frame_profiler.section("draw.dialogue"):
+            if floor2_challenge_completed:
+                # 根据页面选择显示哪个对话框（图片已在后台加载）
+                page = dialogue_pages[dialogue_page]
+                dialogue_stream.wait(page.image_index + 1)
+                current_dialogue_img = dialogue_stream.frames[page.image_index]
+
                 # 对话框底部对齐窗口底部
                 dialogue_x = 0
                 dialogue_y = screen.get_height() - current_dialogue_img.get_height()
                 screen.blit(current_dialogue_img, (dialogue_x, dialogue_y))
-                
-                # 根据页面显示不同的文字（使用像素风格）
+
+                # 显示该页的文字（使用像素风格，较长的文字分行显示）
                 dialogue_color = (139, 69, 19)  # 棕色
-                if dialogue_page == 0:
-                    # "......what's the matter?" 中心点在 (600, 550)
-                    draw_pixel_text(screen, "......what's the matter?", (350, 530), dialogue_color, pixel_size=2, font_scale=0.9)
-                elif dialogue_page == 1:
-                    # "Oh my god! It's my letter!" 中心点在 (600, 550)
-                    draw_pixel_text(screen, "Oh my god! It's my letter!", (340, 530), dialogue_color, pixel_size=2, font_scale=0.9)
-                else:
-                    # 第三页文字较长，需要分两行显示
-                    # 第一行: "Thank you! You are welcome to come to my house often~"
-                    draw_pixel_text(screen, "Thank you! You are welcome to come to my house often~", (150, 510), dialogue_color, pixel_size=2, font_scale=0.9)
-                    # 第二行: "I'll share with you my favorite fresh grass."
-                    draw_pixel_text(screen, "I'll share with you my favorite fresh grass.", (230, 550), dialogue_color, pixel_size=2, font_scale=0.9)
-
-        # 绘制坐标标尺
-        ruler_font = pygame.font.SysFont(None, 16)
-        ruler_color = (255, 255, 0)  # 黄色
+                for text, text_x, text_y in page.lines:
+                    draw_pixel_text(screen, text, (text_x, text_y), dialogue_color, pixel_size=2, font_scale=0.9)
+
+        with frame_profiler.section("draw.debug"):
+            # 绘制坐标标尺
+            ruler_color = (255, 255, 0)  # 黄色
         
-        # 左侧 Y 轴标尺（每50像素一个刻度）
-        for y_pos in range(0, screen.get_height() + 1, 50):
-            line_length = 15 if y_pos % 100 == 0 else 8
-            pygame.draw.line(screen, ruler_color, (0, y_pos), (line_length, y_pos), 2)
-            if y_pos % 100 == 0 or y_pos in [250, 279, 300, 319, 350]:  # 主要刻度和关键位置
-                y_text = ruler_font.render(str(y_pos), True, ruler_color)
-                screen.blit(y_text, (line_length + 2, y_pos - 8))
+            # 左侧 Y 轴标尺（每50像素一个刻度）
+            for y_pos in range(0, screen.get_height() + 1, 50):
+                line_length = 15 if y_pos % 100 == 0 else 8
+                pygame.draw.line(screen, ruler_color, (0, y_pos), (line_length, y_pos), 2)
+                if y_pos % 100 == 0 or y_pos in [250, 279, 300, 319, 350]:  # 主要刻度和关键位置
+                    y_text = ruler_font.render(str(y_pos), True, ruler_color)
+                    screen.blit(y_text, (line_length + 2, y_pos - 8))
         
-        # 顶部 X 轴标尺（每50像素一个刻度）
-        for x_pos in range(0, screen.get_width() + 1, 50):
-            line_length = 15 if x_pos % 100 == 0 else 8
-            pygame.draw.line(screen, ruler_color, (x_pos, 0), (x_pos, line_length), 2)
-            if x_pos % 100 == 0 or x_pos in [500, 550, 600]:  # 主要刻度和关键位置
-                x_text = ruler_font.render(str(x_pos), True, ruler_color)
-                screen.blit(x_text, (x_pos - 10, line_length + 2))
+            # 顶部 X 轴标尺（每50像素一个刻度）
+            for x_pos in range(0, screen.get_width() + 1, 50):
+                line_length = 15 if x_pos % 100 == 0 else 8
+                pygame.draw.line(screen, ruler_color, (x_pos, 0), (x_pos, line_length), 2)
+                if x_pos % 100 == 0 or x_pos in [500, 550, 600]:  # 主要刻度和关键位置
+                    x_text = ruler_font.render(str(x_pos), True, ruler_color)
+                    screen.blit(x_text, (x_pos - 10, line_length + 2))
         
-        # 绘制坐标轴线
-        pygame.draw.line(screen, ruler_color, (0, 0), (0, screen.get_height()), 2)  # Y轴
-        pygame.draw.line(screen, ruler_color, (0, 0), (screen.get_width(), 0), 2)  # X轴
+            # 绘制坐标轴线
+            pygame.draw.line(screen, ruler_color, (0, 0), (0, screen.get_height()), 2)  # Y轴
+            pygame.draw.line(screen, ruler_color, (0, 0), (screen.get_width(), 0), 2)  # X轴
         
-        # 添加坐标轴说明
-        axis_label_font = pygame.font.SysFont(None, 14)
-        x_label = axis_label_font.render("X ->", True, ruler_color)
-        y_label = axis_label_font.render("Y", True, ruler_color)
-        y_label_down = axis_label_font.render("|", True, ruler_color)
-        y_label_arrow = axis_label_font.render("v", True, ruler_color)
-        screen.blit(x_label, (20, 2))
-        screen.blit(y_label, (2, 20))
-        screen.blit(y_label_down, (5, 30))
-        screen.blit(y_label_arrow, (4, 38))
+            # 添加坐标轴说明
+            x_label = axis_label_font.render("X ->", True, ruler_color)
+            y_label = axis_label_font.render("Y", True, ruler_color)
+            y_label_down = axis_label_font.render("|", True, ruler_color)
+            y_label_arrow = axis_label_font.render("v", True, ruler_color)
+            screen.blit(x_label, (20, 2))
+            screen.blit(y_label, (2, 20))
+            screen.blit(y_label_down, (5, 30))
+            screen.blit(y_label_arrow, (4, 38))
         
-        # 显示当前角色中心位置以便与交互点比较
-        pos_text = ruler_font.render(f"Center: ({character_center_x}, {character_center_y})", True, (255, 255, 0))
-        pos_bg = pygame.Surface((pos_text.get_width() + 8, pos_text.get_height() + 4), pygame.SRCALPHA)
-        pos_bg.fill((0, 0, 0, 150))
-        screen.blit(pos_bg, (screen.get_width() - pos_text.get_width() - 12, screen.get_height() - 30))
-        screen.blit(pos_text, (screen.get_width() - pos_text.get_width() - 8, screen.get_height() - 28))
+            # 显示当前角色中心位置以便与交互点比较
+            pos_text = ruler_font.render(f"Center: ({character_center_x}, {character_center_y})", True, (255, 255, 0))
+            pos_bg = pygame.Surface((pos_text.get_width() + 8, pos_text.get_height() + 4), pygame.SRCALPHA)
+            pos_bg.fill((0, 0, 0, 150))
+            screen.blit(pos_bg, (screen.get_width() - pos_text.get_width() - 12, screen.get_height() - 30))
+            screen.blit(pos_text, (screen.get_width() - pos_text.get_width() - 8, screen.get_height() - 28))
 
         # 在右上角显示当前前景帧索引和是否启用 Y 轴限制，方便调试
         clamp_active = fg_current_frame < 8
@@ -616,9 +493,17 @@ def main():
         screen.blit(info_bg, (8, 8))
         screen.blit(info, (12, 10))
 
+        loading.draw_progress(screen)
+        frame_profiler.draw_overlay(screen)
+        frame_profiler.mark("draw")
         pygame.display.flip()
-        clock.tick(60)
+        frame_profiler.mark("flip")
+        lazy_import.first_frame()
+        # 没有活动时降低帧率（对话框等待点击、展台前没有人）
+        frame_scheduler.tick(clock)
 
+    if active_challenge is not None:
+        active_challenge.close()
     pygame.quit()
 
 
@@ -0,0 +1,747 @@
+"""
+姿态识别挑战
+使用 MediaPipe 进行姿态识别，对比玩家姿态和目标图片轮廓
+
+各楼层的挑战模块（000firstfloor_pose.py、001secondfloor_pose.py）继承 PoseChallenge，只设置本楼层的参数
+"""
+import logging
+import os
+import sys
+import time
+import cv2
+import numpy as np
+import mediapipe as mp
+import pygame
+from pathlib import Path
+from PIL import Image
+from pose_configs import (get_pose_landmarks, get_pose_tolerance, get_key_points, get_filter_params,
+                          get_gesture, get_model_complexity, list_available_poses)
+from landmark_filter import LandmarkFilter
+
+# 项目根目录下的公共模块（video_surface 等）
+ROOT_DIR = str(Path(__file__).parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+from video_surface import FrameSurface
+from frame_source import open_source, describe_source
+from presence_gate import PresenceGate
+import device_profile
+import gesture_engine
+from motion_gesture import MotionGesture
+import input_replay
+import frame_profiler
+import game_log
+import stall_watchdog
+
+# 挑战画面显示方式："pygame"（游戏窗口内覆盖层，默认）或 "highgui"（独立 OpenCV 窗口，调试用）
+POSE_BACKEND = os.environ.get("ZAMMI_POSE_BACKEND", "pygame")
+# SUCCESS 画面停留的毫秒数（按主循环的帧间隔累计，回放时与录制逐帧一致）
+SUCCESS_HOLD_MS = 1500
+
+log = game_log.get_logger("pose")
+
+
+class PoseChallenge:
+    # MediaPipe 检测 / 追踪置信度，楼层模块可以覆盖
+    confidence = 0.5
+
+    def __init__(self, target_image_path, pose_config_name=None, window_size=(1280, 720), next_challenge=None, source=None):
+        """
+        初始化姿态挑战
+        
+        Args:
+            target_image_path: 目标姿势图片路径（透明PNG，仅用于显示）
+            pose_config_name: 姿势配置名称（从 pose_configs.py 中选择）
+                            如果为 None，将尝试从文件名推断
+            window_size: 窗口大小 (width, height)
+            next_challenge: 下一个挑战的配置字典 {"image": 路径, "config": 配置名}
+            source: 帧源描述（见 frame_source.open_source），None 时使用环境变量 ZAMMI_CAMERA 或摄像头 0
+        """
+        self.window_size = window_size
+        self.target_image_path = target_image_path
+        self.next_challenge = next_challenge
+        self.source = source
+        
+        # 如果未指定配置名称，从文件名推断
+        if pose_config_name is None:
+            filename = Path(target_image_path).stem
+            self.pose_config_name = filename
+        else:
+            self.pose_config_name = pose_config_name
+        
+        # 加载容差和关键点配置
+        self.tolerance = get_pose_tolerance(self.pose_config_name)
+        self.key_points = get_key_points(self.pose_config_name)
+        # 关键点平滑，参数见 pose_configs.LANDMARK_FILTER
+        self.landmark_filter = LandmarkFilter(**get_filter_params(self.pose_config_name))
+        # 动态手势（ZAMMI_GESTURE_BACKEND），做出姿势配置的手势也算完成
+        self.gesture_backend = gesture_engine.backend()
+        self._setup_gesture()
+        
+        # 初始化 MediaPipe Pose
+        self.mp_pose = mp.solutions.pose
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.pose = self._create_pose(get_model_complexity())
+        
+        # 自定义连接 - 只显示主要身体部位（包括头部，不包括脸部细节）
+        self.body_connections = [
+            # 头部到肩膀
+            (0, 11),   # 鼻子 - 左肩
+            (0, 12),   # 鼻子 - 右肩
+            # 躯干
+            (11, 12),  # 左肩 - 右肩
+            (11, 23),  # 左肩 - 左臀
+            (12, 24),  # 右肩 - 右臀
+            (23, 24),  # 左臀 - 右臀
+            # 左臂
+            (11, 13),  # 左肩 - 左肘
+            (13, 15),  # 左肘 - 左手腕
+            # 右臂
+            (12, 14),  # 右肩 - 右肘
+            (14, 16),  # 右肘 - 右手腕
+            # 左腿
+            (23, 25),  # 左臀 - 左膝
+            (25, 27),  # 左膝 - 左脚踝
+            # 右腿
+            (24, 26),  # 右臀 - 右膝
+            (26, 28),  # 右膝 - 右脚踝
+        ]
+        
+        # 加载目标图片
+        self.target_image = self._load_target_image()
+        
+        # 挑战状态
+        self.is_completed = False
+        self.similarity_threshold = 0.85  # 相似度阈值
+        self.current_similarity = 0.0
+
+        # 逐帧驱动状态
+        self.cap = None
+        self.target_pose = None
+        self.finished = False
+        self.frame = None  # 最近一次合成的 BGR 画面
+        self._success_left = None  # SUCCESS 画面还要停留的毫秒数
+        self._frame_surface = None
+        # 摄像头前没有人时跳过姿态推理
+        self.presence = PresenceGate("pose")
+        # 低档位机器隔帧推理，其余帧沿用上次的关键点
+        self.inference_every = device_profile.setting("inference_every")
+        self._camera_frames = 0
+        self._last_landmarks = None
+        
+    def _create_pose(self, complexity):
+        """
+        创建 MediaPipe Pose；轻量 / 高精度模型第一次使用时需要下载，失败（如离线）时退回完整模型
+
+        Args:
+            complexity: model_complexity（0 轻量 / 1 完整 / 2 高精度）
+        """
+        try:
+            pose = self.mp_pose.Pose(
+                static_image_mode=False,
+                model_complexity=complexity,
+                smooth_landmarks=True,
+                min_detection_confidence=self.confidence,
+                min_tracking_confidence=self.confidence
+            )
+        except Exception as e:
+            if complexity == 1:
+                raise
+            log.warning("⚠️ 无法加载 model_complexity=%d 的姿态模型（%s），改用完整模型", complexity, e)
+            return self._create_pose(1)
+        log.info("🦴 姿态模型 model_complexity=%d", complexity)
+        return pose
+
+    def _setup_gesture(self):
+        """按当前姿势的 "gesture" 配置准备动态手势识别（切换动作时重新调用）"""
+        self.gesture = get_gesture(self.pose_config_name, self.gesture_backend)
+        self.gesture_matched = False
+        # pose 方式：姿态关键点序列与手势模板流式匹配（gesture_engine）
+        self.gesture_engine = None
+        # motion 方式：帧差运动能量判断手势，这一步不做姿态推理
+        self.motion_detector = None
+        if self.gesture and self.gesture_backend == "motion":
+            self.motion_detector = MotionGesture()
+        elif self.gesture:
+            self.gesture_engine = gesture_engine.GestureEngine([self.gesture])
+        if self.gesture:
+            log.info("👋 %s: 做出手势 %s 也算完成（%s）", self.pose_config_name, self.gesture, self.gesture_backend)
+
+    def _load_target_image(self):
+        """加载目标姿势图片（保持透明度）"""
+        # 转换为绝对路径（相对于此脚本文件的位置）
+        script_dir = Path(__file__).parent
+        img_path = (script_dir / self.target_image_path).resolve()
+        
+        if not img_path.exists():
+            raise FileNotFoundError(f"找不到目标图片: {img_path}")
+        
+        # 使用 PIL 加载带透明通道的图片
+        pil_img = Image.open(img_path).convert("RGBA")
+        
+        # 水平翻转图片以匹配镜像模式
+        pil_img = pil_img.transpose(Image.FLIP_LEFT_RIGHT)
+        
+        # 调整大小以适应窗口（保持宽高比），放大到200%但不超过窗口
+        max_width = self.window_size[0]  # 窗口宽度
+        max_height = self.window_size[1]  # 窗口高度
+        
+        pil_img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+        
+        # 转换为 numpy 数组
+        img_array = np.array(pil_img)
+        
+        # 转换 RGBA 到 BGRA (OpenCV 格式)
+        img_bgra = cv2.cvtColor(img_array, cv2.COLOR_RGBA2BGRA)
+        
+        return img_bgra
+    
+    def _extract_pose_from_target(self):
+        """从配置文件加载目标姿态关键点"""
+        try:
+            # 从 pose_configs.py 加载预定义的关键点
+            target_landmarks = get_pose_landmarks(self.pose_config_name)
+            return target_landmarks
+        except ValueError as e:
+            log.warning("⚠️ %s（可用的姿势配置: %s）", e, ", ".join(list_available_poses()))
+            return None
+    
+    def _landmarks_to_array(self, landmarks):
+        """将姿态关键点转换为归一化数组"""
+        points = []
+        for landmark in landmarks.landmark:
+            points.append([landmark.x, landmark.y, landmark.z])
+        return np.array(points)
+    
+    def _calculate_pose_similarity(self, pose1, pose2):
+        """
+        计算两个姿态的相似度（基于容差的宽松匹配）
+        
+        Args:
+            pose1: 当前姿态关键点数组 (33, 3) - 归一化坐标
+            pose2: 目标姿态关键点数组 (33, 3) - 归一化坐标
+        
+        Returns:
+            similarity: 相似度 (0-1)
+        """
+        if pose1 is None or pose2 is None:
+            return 0.0
+        
+        # 只使用 X, Y 坐标
+        pose1_2d = pose1[:, :2]
+        pose2_2d = pose2[:, :2]
+        
+        # 计算容差（归一化到 0-1 范围）
+        # tolerance 是像素值，需要转换为归一化坐标
+        tolerance_x = self.tolerance / self.window_size[0]  # X方向容差
+        tolerance_y = self.tolerance / self.window_size[1]  # Y方向容差
+        
+        # 头部特殊容差（如果配置了）
+        head_tolerance = get_pose_tolerance(self.pose_config_name)
+        try:
+            from pose_configs import POSE_CONFIGS
+            head_tolerance_pixels = POSE_CONFIGS[self.pose_config_name].get("head_tolerance", self.tolerance)
+            wrist_tolerance_pixels = POSE_CONFIGS[self.pose_config_name].get("wrist_tolerance", self.tolerance)
+        except:
+            head_tolerance_pixels = self.tolerance
+            wrist_tolerance_pixels = self.tolerance
+        
+        head_tolerance_x = head_tolerance_pixels / self.window_size[0]
+        head_tolerance_y = head_tolerance_pixels / self.window_size[1]
+        wrist_tolerance_x = wrist_tolerance_pixels / self.window_size[0]
+        wrist_tolerance_y = wrist_tolerance_pixels / self.window_size[1]
+        
+        # 只关注上半身关键点
+        important_indices = [0, 11, 12, 13, 14, 15, 16]
+        
+        # 计算每个关键点的匹配度
+        matches = []
+        # 只有开启 DEBUG 日志时才拼接调试信息
+        debug_info = [] if log.isEnabledFor(logging.DEBUG) else None
+        for idx in important_indices:
+            # 计算距离
+            diff_x = abs(pose1_2d[idx][0] - pose2_2d[idx][0])
+            diff_y = abs(pose1_2d[idx][1] - pose2_2d[idx][1])
+            
+            # 选择容差（头部、手腕使用特殊容差）
+            if idx == 0:  # 头部
+                tol_x, tol_y = head_tolerance_x, head_tolerance_y
+            elif idx in [15, 16]:  # 左右手腕
+                tol_x, tol_y = wrist_tolerance_x, wrist_tolerance_y
+            else:
+                tol_x, tol_y = tolerance_x, tolerance_y
+            
+            # 判断是否在容差范围内
+            is_match_x = diff_x <= tol_x
+            is_match_y = diff_y <= tol_y
+            
+            # 计算该点的相似度（在容差内为1，超出则递减）
+            if is_match_x and is_match_y:
+                point_similarity = 1.0
+            else:
+                # 计算超出容差的比例，转换为相似度
+                exceed_x = max(0, diff_x - tol_x) / tol_x if tol_x > 0 else 0
+                exceed_y = max(0, diff_y - tol_y) / tol_y if tol_y > 0 else 0
+                exceed_total = (exceed_x + exceed_y) / 2
+                point_similarity = max(0, 1.0 - exceed_total)
+            
+            # 关键点（手腕等）权重更高
+            weight = 2.0 if idx in self.key_points else 1.0
+            matches.append(point_similarity * weight)
+            
+            # 调试信息（转换回像素显示）
+            if debug_info is not None:
+                diff_x_pixels = diff_x * self.window_size[0]
+                diff_y_pixels = diff_y * self.window_size[1]
+                debug_info.append(f"[{idx}] dx:{diff_x_pixels:.0f} dy:{diff_y_pixels:.0f} sim:{point_similarity:.2f}")
+        
+        # 调试信息（DEBUG 级别，按时间限流）
+        if debug_info is not None:
+            rows = []
+            for i, idx in enumerate(important_indices):
+                target_x = int(pose2_2d[idx][0] * self.window_size[0])
+                target_y = int(pose2_2d[idx][1] * self.window_size[1])
+                current_x = int(pose1_2d[idx][0] * self.window_size[0])
+                current_y = int(pose1_2d[idx][1] * self.window_size[1])
+                rows.append(f"[{idx}] 目标:({target_x},{target_y}) 当前:({current_x},{current_y}) {debug_info[i]}")
+            log.debug("\n=== 关键点匹配详情 ===\n目标坐标 vs 当前坐标 (像素):\n%s", "\n".join(rows))
+        
+        # 计算加权平均相似度
+        total_weight = sum(2.0 if idx in self.key_points else 1.0 for idx in important_indices)
+        similarity = sum(matches) / total_weight
+        
+        return similarity
+    
+    def _normalize_pose(self, pose):
+        """归一化姿态（消除位置和缩放差异）"""
+        # 计算中心点
+        center = np.mean(pose, axis=0)
+        
+        # 平移到中心
+        centered = pose - center
+        
+        # 缩放到单位大小
+        scale = np.max(np.abs(centered))
+        if scale > 0:
+            normalized = centered / scale
+        else:
+            normalized = centered
+        
+        return normalized
+    
+    def _overlay_transparent(self, background, overlay, x, y):
+        """将透明图片（BGRA）叠加到 BGR 背景上"""
+        h, w = overlay.shape[:2]
+        
+        # 确保不超出边界
+        if x + w > background.shape[1]:
+            w = background.shape[1] - x
+            overlay = overlay[:, :w]
+        if y + h > background.shape[0]:
+            h = background.shape[0] - y
+            overlay = overlay[:h, :]
+        
+        # 提取 alpha 通道
+        alpha = overlay[:, :, 3] / 255.0
+        
+        # 叠加图像
+        for c in range(3):
+            background[y:y+h, x:x+w, c] = (
+                alpha * overlay[:, :, c] +
+                (1 - alpha) * background[y:y+h, x:x+w, c]
+            )
+        
+        return background
+    
+    def _log_target_pose(self):
+        """目标坐标写入调试日志（DEBUG 级别）"""
+        if self.target_pose is None or not log.isEnabledFor(logging.DEBUG):
+            return
+        rows = []
+        important_indices = [0, 11, 12, 13, 14, 15, 16]
+        for idx in important_indices:
+            x_norm, y_norm = self.target_pose[idx][0], self.target_pose[idx][1]
+            x_pixel = int(x_norm * self.window_size[0])
+            y_pixel = int(y_norm * self.window_size[1])
+            rows.append(f"关键点 {idx}: 归一化({x_norm:.3f}, {y_norm:.3f}) -> 像素({x_pixel}, {y_pixel})")
+        log.debug("=== %s 目标姿势坐标 ===\n%s", self.pose_config_name, "\n".join(rows))
+
+    def start(self):
+        """
+        打开摄像头并准备挑战（逐帧驱动模式的第一步）
+
+        Returns:
+            ok: 摄像头是否成功打开
+        """
+        # 初始化摄像头（或其他帧源），采集尺寸按设备档位，画面随后缩放到窗口大小
+        self.cap = open_source(self.source, device_profile.setting("camera_size"))
+
+        if not self.cap.isOpened():
+            log.error("无法打开%s", describe_source(self.cap))
+            self.cap.release()
+            self.cap = None
+            return False
+
+        # 尝试从目标图片提取姿态（用于对比）
+        self.target_pose = self._extract_pose_from_target()
+        self._log_target_pose()
+
+        log.info("姿态挑战开始！请模仿屏幕右侧的姿势")
+        # 窗口说明已在界面显示
+        self.finished = False
+        self.frame = None
+        self._success_left = None
+        return True
+
+    def _advance_to_next_challenge(self):
+        """切换到下一个动作"""
+        # 重置完成状态
+        self.is_completed = False
+        self.current_similarity = 0.0
+
+        # 切换到下一个挑战的配置
+        self.target_image_path = self.next_challenge["image"]
+        self.pose_config_name = self.next_challenge["config"]
+
+        # 重新加载目标图片和姿势配置
+        self.target_image = self._load_target_image()
+        self.tolerance = get_pose_tolerance(self.pose_config_name)
+        self.key_points = get_key_points(self.pose_config_name)
+        self.landmark_filter = LandmarkFilter(**get_filter_params(self.pose_config_name))
+        self._setup_gesture()
+
+        # 动作二使用更低的阈值
+        self.similarity_threshold = 0.85  # 动作二阈值设为85%
+        self.target_pose = self._extract_pose_from_target()
+
+        # 清空下一个挑战（避免无限循环）
+        self.next_challenge = None
+
+        log.info("=== 切换到动作二: %s ===", self.pose_config_name)
+        self._log_target_pose()
+
+    def step(self, dt):
+        """
+        处理一帧：读取摄像头、识别姿态并合成显示画面（不阻塞）
+
+        Args:
+            dt: 距上一帧的毫秒数（input_replay.Clock 的 get_time()，回放时为录制的帧间隔）
+
+        Returns:
+            frame: 合成后的 BGR 画面；挑战结束后保持最后一帧
+        """
+        if self.finished:
+            return self.frame
+
+        # SUCCESS 画面停留 1.5 秒，期间不读取摄像头
+        if self._success_left is not None:
+            self._success_left -= dt
+            if self._success_left > 0:
+                return self.frame
+            self._success_left = None
+            # 如果有下一个挑战，切换到下一个动作，否则最后一个挑战完成
+            if self.next_challenge:
+                self._advance_to_next_challenge()
+            else:
+                self.finished = True
+                return self.frame
+
+        with frame_profiler.section("camera"):
+            ret, frame = self.cap.read()
+        if not ret:
+            self.finished = True
+            return self.frame
+
+        target_pose = self.target_pose
+
+        # 调整帧大小
+        frame = cv2.resize(frame, self.window_size)
+
+        # 水平翻转（镜像效果）
+        frame = cv2.flip(frame, 1)
+
+        # 检测姿态（录制的关键点流直接给出关键点，不需要推理）
+        if self.cap.provides_landmarks:
+            pose_landmarks = self.cap.landmarks("pose")
+        elif self.motion_detector is not None:
+            pose_landmarks = None
+            with frame_profiler.section("gesture"):
+                if self.motion_detector.update(frame) == self.gesture:
+                    self.gesture_matched = True
+        else:
+            pose_landmarks = None
+            self._camera_frames += 1
+            if self._camera_frames % self.inference_every:
+                pose_landmarks = self._last_landmarks
+            elif self.presence.check(frame):
+                started = time.perf_counter()
+                with frame_profiler.section("inference"):
+                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    pose_landmarks = self.pose.process(frame_rgb).pose_landmarks
+                self.presence.report(pose_landmarks is not None, (time.perf_counter() - started) * 1000)
+            self._last_landmarks = pose_landmarks
+            input_replay.record_landmarks("pose", pose_landmarks)
+
+        if not pose_landmarks:
+            # 人离开画面，平滑从头开始，避免下次出现时从旧位置滑过来
+            self.landmark_filter.reset()
+
+        # 绘制姿态骨架（只显示主要身体部位）
+        if pose_landmarks:
+            # 手动绘制连接线（不包括脸部和手部细节）
+            h, w = frame.shape[:2]
+            for connection in self.body_connections:
+                start_idx, end_idx = connection
+                start = pose_landmarks.landmark[start_idx]
+                end = pose_landmarks.landmark[end_idx]
+
+                # 转换为像素坐标
+                start_point = (int(start.x * w), int(start.y * h))
+                end_point = (int(end.x * w), int(end.y * h))
+
+                # 绘制连接线
+                cv2.line(frame, start_point, end_point, (0, 255, 255), 2)
+
+            # 绘制关键点（上半身关键点）
+            important_indices = [0, 11, 12, 13, 14, 15, 16]
+            for idx in important_indices:
+                landmark = pose_landmarks.landmark[idx]
+                point = (int(landmark.x * w), int(landmark.y * h))
+                cv2.circle(frame, point, 4, (0, 255, 0), -1)
+
+            # 提取当前姿态，平滑后再计算相似度（录制的关键点流按固定帧间隔计时，回放结果可复现）
+            timestamp = self.cap.index / 30 if self.cap.provides_landmarks else time.perf_counter()
+            current_pose = self.landmark_filter(self._landmarks_to_array(pose_landmarks), timestamp)
+
+            # 计算相似度
+            if target_pose is not None:
+                self.current_similarity = self._calculate_pose_similarity(current_pose, target_pose)
+            else:
+                # 如果目标图片无法提取姿态，使用简化判断
+                self.current_similarity = 0.0
+
+        if self.gesture_engine is not None:
+            with frame_profiler.section("gesture"):
+                if self.gesture_engine.update(pose_landmarks) == self.gesture:
+                    self.gesture_matched = True
+        if self.gesture_matched:
+            self.current_similarity = 1.0
+
+        # 叠加目标图片（窗口正中间，图片中心对齐窗口中心），直接在 BGR 帧上混合
+        target_h, target_w = self.target_image.shape[:2]
+        target_x = (self.window_size[0] - target_w) // 2
+        target_y = (self.window_size[1] - target_h) // 2
+        frame = self._overlay_transparent(frame, self.target_image, target_x, target_y)
+
+        # 绘制目标姿势的关键点（红色圆点）
+        if target_pose is not None:
+            important_indices = [0, 11, 12, 13, 14, 15, 16]
+            for idx in important_indices:
+                if idx < len(target_pose):
+                    # 目标姿势已经是归一化坐标
+                    x_norm, y_norm = target_pose[idx][0], target_pose[idx][1]
+                    if x_norm > 0 and y_norm > 0:  # 只绘制有效的点
+                        # 转换为像素坐标
+                        x_pixel = int(x_norm * self.window_size[0])
+                        y_pixel = int(y_norm * self.window_size[1])
+                        # 绘制红色圆点（较大，便于观察）
+                        cv2.circle(frame, (x_pixel, y_pixel), 8, (0, 0, 255), -1)
+                        # 绘制白色外圈
+                        cv2.circle(frame, (x_pixel, y_pixel), 8, (255, 255, 255), 2)
+                        # 添加关键点编号和坐标信息
+                        cv2.putText(frame, f"{idx}({x_pixel},{y_pixel})", (x_pixel + 10, y_pixel - 10),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+
+            # 绘制目标姿势的骨骼连接（红色线条）
+            for connection in self.body_connections:
+                start_idx, end_idx = connection
+                if start_idx < len(target_pose) and end_idx < len(target_pose):
+                    start_x, start_y = target_pose[start_idx][0], target_pose[start_idx][1]
+                    end_x, end_y = target_pose[end_idx][0], target_pose[end_idx][1]
+                    if start_x > 0 and start_y > 0 and end_x > 0 and end_y > 0:
+                        start_point = (int(start_x * self.window_size[0]), int(start_y * self.window_size[1]))
+                        end_point = (int(end_x * self.window_size[0]), int(end_y * self.window_size[1]))
+                        cv2.line(frame, start_point, end_point, (0, 0, 255), 2)
+
+        # 绘制坐标标尺（白色）
+        h, w = frame.shape[:2]
+        ruler_color = (255, 255, 255)
+
+        # 左侧 Y 轴标尺（每50像素一个刻度）
+        for y_pos in range(0, h + 1, 50):
+            line_length = 15 if y_pos % 100 == 0 else 8
+            cv2.line(frame, (0, y_pos), (line_length, y_pos), ruler_color, 2)
+            if y_pos % 100 == 0:
+                cv2.putText(frame, str(y_pos), (line_length + 2, y_pos + 5),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, ruler_color, 1)
+
+        # 顶部 X 轴标尺（每50像素一个刻度）
+        for x_pos in range(0, w + 1, 50):
+            line_length = 15 if x_pos % 100 == 0 else 8
+            cv2.line(frame, (x_pos, 0), (x_pos, line_length), ruler_color, 2)
+            if x_pos % 100 == 0:
+                cv2.putText(frame, str(x_pos), (x_pos - 10, line_length + 12),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, ruler_color, 1)
+
+        # 绘制坐标轴线
+        cv2.line(frame, (0, 0), (0, h), ruler_color, 2)  # Y轴
+        cv2.line(frame, (0, 0), (w, 0), ruler_color, 2)  # X轴
+
+        # 显示相似度
+        similarity_text = f"Similarity: {self.current_similarity:.1%}"
+        cv2.putText(frame, similarity_text, (20, 50),
+                   cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
+
+        # 显示需要达到的阈值
+        threshold_text = f"Need: {self.similarity_threshold:.1%}"
+        cv2.putText(frame, threshold_text, (20, 90),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
+
+        # 显示提示
+        instruction_text = "Match the pose!"
+        cv2.putText(frame, instruction_text, (20, 130),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+        # 显示进度条
+        bar_width = 400
+        bar_height = 30
+        bar_x = 20
+        bar_y = self.window_size[1] - 60
+
+        # 背景
+        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height),
+                     (50, 50, 50), -1)
+
+        # 进度
+        progress_width = int(bar_width * self.current_similarity)
+        color = (0, 255, 0) if self.current_similarity >= self.similarity_threshold else (0, 165, 255)
+        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + progress_width, bar_y + bar_height),
+                     color, -1)
+
+        # 阈值线
+        threshold_x = bar_x + int(bar_width * self.similarity_threshold)
+        cv2.line(frame, (threshold_x, bar_y), (threshold_x, bar_y + bar_height),
+                (255, 255, 255), 2)
+
+        # 检查是否完成
+        if self.current_similarity >= self.similarity_threshold:
+            self.is_completed = True
+
+            # 在窗口中央显示SUCCESS
+            success_text = "SUCCESS!"
+            text_size = cv2.getTextSize(success_text, cv2.FONT_HERSHEY_SIMPLEX, 3.0, 6)[0]
+            text_x = (self.window_size[0] - text_size[0]) // 2
+            text_y = (self.window_size[1] + text_size[1]) // 2
+
+            # 绘制文字背景
+            padding = 30
+            cv2.rectangle(frame,
+                        (text_x - padding, text_y - text_size[1] - padding),
+                        (text_x + text_size[0] + padding, text_y + padding),
+                        (0, 200, 0), -1)
+            cv2.rectangle(frame,
+                        (text_x - padding, text_y - text_size[1] - padding),
+                        (text_x + text_size[0] + padding, text_y + padding),
+                        (255, 255, 255), 3)
+
+            # 绘制SUCCESS文字
+            cv2.putText(frame, success_text, (text_x, text_y),
+                       cv2.FONT_HERSHEY_SIMPLEX, 3.0, (255, 255, 255), 6)
+
+            # SUCCESS 画面显示1.5秒
+            self._success_left = SUCCESS_HOLD_MS
+
+        self.frame = frame
+        return frame
+
+    def handle_event(self, event):
+        """处理 pygame 事件：Esc 或关闭窗口时放弃挑战"""
+        if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            self.cancel()
+
+    def cancel(self):
+        """放弃挑战"""
+        self.is_completed = False
+        self.finished = True
+
+    @frame_profiler.section("draw.challenge")
+    def draw(self, screen):
+        """把当前挑战画面绘制到游戏的 pygame 窗口（覆盖整个画面）"""
+        if self.frame is None:
+            return
+        if self._frame_surface is None or self._frame_surface.size != screen.get_size():
+            self._frame_surface = FrameSurface(screen.get_size())
+        screen.blit(self._frame_surface.update(self.frame), (0, 0))
+
+    def close(self):
+        """清理资源"""
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+            self.presence.print_summary()
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+
+    def _run_pygame(self, screen):
+        """在现有 pygame 窗口中阻塞运行（游戏场景外单独调用时使用）"""
+        if screen is None:
+            screen = pygame.display.get_surface() or pygame.display.set_mode(self.window_size)
+        clock = input_replay.Clock()
+        while not self.finished:
+            for event in input_replay.events():
+                self.handle_event(event)
+            self.step(clock.get_time())
+            self.draw(screen)
+            pygame.display.flip()
+            stall_watchdog.heartbeat("pose_challenge")
+            clock.tick(60)
+
+    def _run_highgui(self):
+        """调试用：在独立的 OpenCV 窗口中运行"""
+        clock = input_replay.Clock()
+        while not self.finished:
+            frame = self.step(clock.tick())
+            if frame is None:
+                continue
+
+            # 显示画面
+            cv2.imshow('Pose Challenge', frame)
+
+            # 按键处理
+            key = cv2.waitKey(1) & 0xFF
+
+            # 检查窗口是否被关闭
+            if cv2.getWindowProperty('Pose Challenge', cv2.WND_PROP_VISIBLE) < 1:
+                # 窗口被关闭，退出挑战
+                self.cancel()
+        cv2.destroyAllWindows()
+
+    def run(self, screen=None, backend=None):
+        """
+        运行姿态挑战（阻塞）
+
+        游戏场景内建议使用 start()/step()/draw() 由主循环逐帧驱动；
+        该方法用于单独运行或调试。
+
+        Args:
+            screen: 绘制用的 pygame Surface，默认使用当前窗口
+            backend: "pygame"（默认）或 "highgui"（独立 OpenCV 窗口，仅调试用），
+                     为 None 时读取环境变量 ZAMMI_POSE_BACKEND
+
+        Returns:
+            success: 挑战是否成功
+        """
+        backend = backend or POSE_BACKEND
+        if not self.start():
+            return False
+        try:
+            if backend == "highgui":
+                self._run_highgui()
+            else:
+                self._run_pygame(screen)
+        finally:
+            # 清理资源
+            self.close()
+
+        return self.is_completed
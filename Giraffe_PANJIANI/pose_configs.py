@@ -15,7 +15,18 @@
 - X 坐标范围: 0 (最左边) 到 1280 (最右边)
 - Y 坐标范围: 0 (最上面) 到 720 (最下面)
 - 窗口中心点: (640, 360)
+
+关键点平滑：
+- LANDMARK_FILTER 为默认的 One-Euro 滤波参数（见 landmark_filter.py），
+  单个姿势可以加 "filter": {...} 覆盖其中几项，如需要快速移动的姿势调大 beta
+
+动态手势：
+- 姿势可以加 "gesture": {识别方式: 手势名}，做出该手势也算完成这一步
+- 识别方式见 gesture_engine.backend()（ZAMMI_GESTURE_BACKEND）
+- motion 方式（帧差运动能量，motion_gesture）不做姿态推理，适合跑不动 MediaPipe 的机器，
+  只能完成配置了 motion 手势的姿势，其余姿势仍然推理
 """
+import os
 
 import numpy as np
 
@@ -23,6 +34,18 @@ import numpy as np
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
 
+# 关键点平滑（One-Euro）默认参数：
+#   min_cutoff 静止时的截止频率（Hz），越小越稳
+#   beta       速度对截止频率的放大系数，越大移动时越跟手
+#   d_cutoff   速度估计的截止频率（Hz）
+#   enabled    False 时不平滑
+LANDMARK_FILTER = {"min_cutoff": 1.0, "beta": 5.0, "d_cutoff": 1.0, "enabled": True}
+
+# MediaPipe Pose 模型：0 轻量 / 1 完整 / 2 高精度；环境变量 ZAMMI_POSE_MODEL 可覆盖
+# 关键点经过平滑后轻量模型的抖动不影响判定，所有设备档位都默认使用轻量模型
+POSE_MODEL_ENV = "ZAMMI_POSE_MODEL"
+POSE_MODEL_COMPLEXITY = 0
+
 # 姿势配置字典
 # 坐标格式: [x像素, y像素]，基于 1280×720 窗口
 POSE_CONFIGS = {
@@ -33,6 +56,7 @@ POSE_CONFIGS = {
         "head_tolerance": 50,  # 头部特殊容差范围
         "wrist_tolerance": 50,  # 手腕特殊容差范围
         "key_points": [15, 16],  # 最关键的点（双手腕），权重更高
+        "gesture": {"motion": "raise"},  # 举手
         "landmarks": {
             0:  [700, 280],    # 头部（鼻子）
             11: [560, 410],    # 左肩
@@ -49,6 +73,7 @@ POSE_CONFIGS = {
         "description": "单手举高",
         "tolerance": 50,  # 容差范围（像素）
         "key_points": [15],  # 最关键的点（左手腕举高）
+        "gesture": {"pose": "wave", "motion": "raise"},  # 举起一只手挥手
         "landmarks": {
             0:  [680, 270],    # 头部（鼻子）
             11: [600, 360],    # 左肩
@@ -67,6 +92,7 @@ POSE_CONFIGS = {
         "head_tolerance": 50,  # 头部特殊容差范围
         "wrist_tolerance": 50,  # 手腕特殊容差范围
         "key_points": [15, 16],  # 最关键的点（双手腕）
+        "gesture": {"motion": "raise"},
         "landmarks": {
             0:  [705, 250],    # 头部
             11: [560, 410],    # 左肩
@@ -158,3 +184,35 @@ def get_key_points(pose_name):
     if pose_name not in POSE_CONFIGS:
         return []
     return POSE_CONFIGS[pose_name].get("key_points", [])
+
+
+def get_gesture(pose_name, backend):
+    """
+    获取姿势对应的动态手势
+
+    Args:
+        pose_name: 姿势配置名
+        backend: 手势识别方式（"pose" / "motion"）
+
+    Returns:
+        手势名称，没有配置时为 None
+    """
+    if pose_name not in POSE_CONFIGS:
+        return None
+    return POSE_CONFIGS[pose_name].get("gesture", {}).get(backend)
+
+
+def get_filter_params(pose_name):
+    """获取姿势的关键点平滑参数（默认参数 + 姿势自己的 "filter" 覆盖项）"""
+    params = dict(LANDMARK_FILTER)
+    if pose_name in POSE_CONFIGS:
+        params.update(POSE_CONFIGS[pose_name].get("filter", {}))
+    return params
+
+
+def get_model_complexity():
+    """MediaPipe Pose 的 model_complexity（ZAMMI_POSE_MODEL > 默认的轻量模型）"""
+    value = os.environ.get(POSE_MODEL_ENV, "").strip()
+    if value in ("0", "1", "2"):
+        return int(value)
+    return POSE_MODEL_COMPLEXITY
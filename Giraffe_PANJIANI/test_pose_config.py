@@ -7,7 +7,7 @@ import numpy as np
 from PIL import Image
 from pose_configs import get_pose_landmarks, POSE_CONFIGS, WINDOW_WIDTH, WINDOW_HEIGHT
 
-# 自定义身体连接（与 firstfloor_pose.py 保持一致）
+# 自定义身体连接（与 pose_challenge.py 保持一致）
 BODY_CONNECTIONS = [
     (0, 11), (0, 12),           # 头部到肩膀
     (11, 12),                    # 肩膀连接
@@ -4,13 +4,24 @@
 通过摄像头识别手势来移动篮子接苹果
 """
 
+import lazy_import  # 尽早导入，启动计时从这里开始
 import cv2
 import mediapipe as mp
 import pygame
 import random
 import sys
+import time
 from pathlib import Path
 
+import frame_profiler
+import frame_scheduler
+import input_replay
+import game_log
+import presentation
+from frame_source import open_source, describe_source
+from presence_gate import PresenceGate
+import device_profile
+
 # 游戏配置
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -26,6 +37,10 @@ YELLOW = (255, 215, 0)
 SKY_BLUE = (135, 206, 235)
 DARK_GREEN = (0, 100, 0)
 
+log = game_log.get_logger("apple")
+# 得分/失误是离散事件，每条都要输出，不参与限流
+EVENT_LOG = {"rate": 0}
+
 class Apple:
     """苹果类"""
     def __init__(self):
@@ -110,7 +125,11 @@ class Basket:
 
 class HandTracker:
     """手势追踪器"""
-    def __init__(self):
+    def __init__(self, source=None):
+        """
+        Args:
+            source: 帧源描述（见 frame_source.open_source），None 时使用环境变量 ZAMMI_CAMERA 或摄像头 0
+        """
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
             model_complexity=0,
@@ -118,17 +137,22 @@ class HandTracker:
             min_tracking_confidence=0.5,
             max_num_hands=1
         )
+        self.source = source
         self.cap = None
+        # 摄像头前没有人时跳过手势推理
+        self.presence = PresenceGate("hand")
+        # 低档位机器隔帧推理，其余帧沿用上次的关键点
+        self.inference_every = device_profile.setting("inference_every")
+        self._camera_frames = 0
+        self._last_hands = None
         self.camera_width = 640
         self.camera_height = 480
     
     def setup_camera(self):
         """初始化摄像头"""
-        self.cap = cv2.VideoCapture(0)
+        self.cap = open_source(self.source, (self.camera_width, self.camera_height))
         if not self.cap.isOpened():
-            raise RuntimeError("无法打开摄像头")
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_height)
+            raise RuntimeError(f"无法打开{describe_source(self.cap)}")
         return True
     
     def get_hand_position(self):
@@ -136,21 +160,37 @@ class HandTracker:
         if self.cap is None:
             return None, None
         
-        ret, frame = self.cap.read()
+        with frame_profiler.section("camera"):
+            ret, frame = self.cap.read()
         if not ret:
             return None, None
         
         # 翻转镜像
         frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         
-        # 处理手势
-        results = self.hands.process(rgb_frame)
+        # 处理手势（录制的关键点流直接给出关键点，不需要推理）
+        if self.cap.provides_landmarks:
+            hand = self.cap.landmarks("hand")
+            multi_hand_landmarks = [hand] if hand is not None else []
+        else:
+            multi_hand_landmarks = None
+            self._camera_frames += 1
+            if self._camera_frames % self.inference_every:
+                multi_hand_landmarks = self._last_hands
+            elif self.presence.check(frame):
+                started = time.perf_counter()
+                with frame_profiler.section("inference"):
+                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    results = self.hands.process(rgb_frame)
+                multi_hand_landmarks = results.multi_hand_landmarks
+                self.presence.report(bool(multi_hand_landmarks), (time.perf_counter() - started) * 1000)
+            self._last_hands = multi_hand_landmarks
+            input_replay.record_landmarks("hand", multi_hand_landmarks[0] if multi_hand_landmarks else None)
         
         hand_x = None
         
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
+        if multi_hand_landmarks:
+            for hand_landmarks in multi_hand_landmarks:
                 # 获取手掌中心（手腕到中指根部的中点）
                 wrist = hand_landmarks.landmark[0]
                 middle_base = hand_landmarks.landmark[9]
@@ -178,15 +218,21 @@ class HandTracker:
         """清理资源"""
         if self.cap:
             self.cap.release()
+            self.presence.print_summary()
         cv2.destroyAllWindows()
 
 class Game:
     """游戏主类"""
-    def __init__(self):
+    def __init__(self, camera=None):
+        """
+        Args:
+            camera: 帧源描述，传给 HandTracker
+        """
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # 按 800×600 的逻辑分辨率绘制，放大到显示器由 presentation 统一处理
+        self.screen = presentation.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("🍎 像素接苹果 - 手势控制版")
-        self.clock = pygame.time.Clock()
+        self.clock = input_replay.Clock()
         self.font_large = pygame.font.Font(None, 48)
         self.font_medium = pygame.font.Font(None, 36)
         self.font_small = pygame.font.Font(None, 24)
@@ -194,7 +240,7 @@ class Game:
         # 游戏对象
         self.basket = Basket()
         self.apples = []
-        self.hand_tracker = HandTracker()
+        self.hand_tracker = HandTracker(camera)
         
         # 游戏状态
         self.score = 0
@@ -208,6 +254,7 @@ class Game:
         """生成新苹果"""
         self.apples.append(Apple())
     
+    @frame_profiler.section("draw.background")
     def draw_background(self):
         """绘制像素风格背景"""
         # 天空渐变
@@ -230,6 +277,7 @@ class Game:
             pygame.draw.line(self.screen, GREEN, 
                            (i, SCREEN_HEIGHT - 50), (i, SCREEN_HEIGHT - 40), 3)
     
+    @frame_profiler.section("draw.ui")
     def draw_ui(self):
         """绘制UI"""
         # 分数（左上角，显示目标）- 添加半透明背景，使用小字体
@@ -283,6 +331,7 @@ class Game:
             self.screen.blit(info_text, (apple_x + apple_size + 10, apple_y))
             y_offset += 25
     
+    @frame_profiler.section("draw.game_over")
     def draw_game_over(self):
         """绘制游戏结束画面"""
         # 半透明遮罩
@@ -364,8 +413,10 @@ class Game:
         
         running = True
         while running:
+            frame_profiler.begin_frame()
             # 事件处理
-            for event in pygame.event.get():
+            for event in input_replay.events():
+                frame_profiler.handle_event(event)
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN:
@@ -373,6 +424,7 @@ class Game:
                         running = False
                     elif event.key == pygame.K_r and self.game_over:
                         self.reset_game()
+            frame_profiler.mark("events")
             
             if not self.game_over:
                 # 获取手势位置
@@ -390,41 +442,44 @@ class Game:
                     if self.spawn_delay > 20:
                         self.spawn_delay -= 0.1
                 
-                # 更新苹果
-                basket_rect = self.basket.get_rect()
-                for apple in self.apples[:]:
-                    apple.update()
+                with frame_profiler.section("collision"):
+                    # 更新苹果
+                    basket_rect = self.basket.get_rect()
+                    for apple in self.apples[:]:
+                        apple.update()
                     
-                    # 检测碰撞
-                    if apple.get_rect().colliderect(basket_rect):
-                        self.apples.remove(apple)
-                        self.score += apple.points
-                        # 根据苹果颜色显示不同信息
-                        if apple.points == 3:
-                            print(f"🍎 红苹果！+{apple.points}分 总分: {self.score}")
-                        elif apple.points == 2:
-                            print(f"🍏 绿苹果！+{apple.points}分 总分: {self.score}")
-                        else:
-                            print(f"🍋 黄苹果！+{apple.points}分 总分: {self.score}")
+                        # 检测碰撞
+                        if apple.get_rect().colliderect(basket_rect):
+                            self.apples.remove(apple)
+                            self.score += apple.points
+                            # 根据苹果颜色显示不同信息
+                            if apple.points == 3:
+                                log.info("🍎 红苹果！+%s分 总分: %s", apple.points, self.score, extra=EVENT_LOG)
+                            elif apple.points == 2:
+                                log.info("🍏 绿苹果！+%s分 总分: %s", apple.points, self.score, extra=EVENT_LOG)
+                            else:
+                                log.info("🍋 黄苹果！+%s分 总分: %s", apple.points, self.score, extra=EVENT_LOG)
                         
-                        # 检测胜利条件：达到15分
-                        if self.score >= 15:
-                            self.game_over = True
-                            self.game_won = True
-                            print(f"🎉 恭喜获胜！最终得分: {self.score}")
+                            # 检测胜利条件：达到15分
+                            if self.score >= 15:
+                                self.game_over = True
+                                self.game_won = True
+                                log.info("🎉 恭喜获胜！最终得分: %s", self.score, extra=EVENT_LOG)
                     
-                    # 检测掉落
-                    elif apple.is_off_screen():
-                        self.apples.remove(apple)
-                        self.missed += 1
-                        print(f"💔 失误 {self.missed}/3")
+                        # 检测掉落
+                        elif apple.is_off_screen():
+                            self.apples.remove(apple)
+                            self.missed += 1
+                            log.info("💔 失误 %s/3", self.missed, extra=EVENT_LOG)
                         
-                        # 检测失败条件：错过3个苹果
-                        if self.missed >= 3:
-                            self.game_over = True
-                            self.game_won = False
-                            print(f"💀 游戏失败！最终得分: {self.score}")
+                            # 检测失败条件：错过3个苹果
+                            if self.missed >= 3:
+                                self.game_over = True
+                                self.game_won = False
+                                log.info("💀 游戏失败！最终得分: %s", self.score, extra=EVENT_LOG)
             
+            frame_profiler.mark("update")
+
             # 绘制
             self.draw_background()
             
@@ -442,8 +497,14 @@ class Game:
             if self.game_over:
                 self.draw_game_over()
             
+            frame_profiler.draw_overlay(self.screen)
+            frame_profiler.mark("draw")
             pygame.display.flip()
-            self.clock.tick(FPS)
+            frame_profiler.mark("flip")
+            lazy_import.first_frame()
+            # 摄像头游戏一直在进行，不进入空闲，只按 ZAMMI_PACING 控制节拍
+            frame_scheduler.wake()
+            frame_scheduler.tick(self.clock, FPS)
         
         # 清理
         self.hand_tracker.cleanup()
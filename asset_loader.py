@@ -0,0 +1,517 @@
+"""
+资源加载
+场景启动时不再阻塞等待全部动画帧：后台线程逐帧解码（PNG 序列 / GIF）并缩放，
+主线程每帧取回已解码的帧并转换成显示格式（convert 需要在创建窗口之后进行）；
+运行过 build_assets.py 时直接加载构建好的尺寸，不在运行时缩放
+
+每张图片的 alpha 通道只扫描一次（工作线程中，资源包里存有结论时不扫描），按结果选择显示格式：
+    - 完全不透明（背景）     convert()，blit 时直接复制像素
+    - 只有全透明/全不透明   convert() + colorkey（RLE 加速）
+    - 有半透明像素（角色、对话框） convert_alpha()
+
+不透明和 colorkey 图片还可以保存成 8 位调色板 Surface（每像素 1 字节，blit 时查表，比 32 位稍慢），
+由环境变量 ZAMMI_PALETTE 控制：
+    auto（默认） 不超过 256 种颜色的图片无损转成调色板
+    quantize     另外把颜色多的不透明图片量化成 256 色（有损，省内存，适合内存小的机器）
+    off          全部保持 32 位
+各资源能省多少内存见 asset_memory.py
+
+加载期间先显示启动画面和进度条，每个动画有最少帧数就绪后场景即可开始，
+其余帧边玩边加入动画（动画按已就绪的帧数循环）；回放输入时等待全部加载完成，保证逐帧一致
+
+用法：
+    bg_stream = asset_loader.FrameStream("背景动画", asset_loader.PngFrames(files, scale=2 / 3))
+    loading = asset_loader.Loading(bg_stream, fg_stream)
+    loading.start()
+    screen = presentation.set_mode(bg_stream.first_size())
+    loading.splash(screen)
+    bg_frames, bg_durations = bg_stream.frames, bg_stream.durations   # 随加载增长的列表
+    ...
+    while running:
+        loading.poll()                  # 每帧取回少量新帧
+        ...
+        loading.draw_progress(screen)   # 加载完成前在底部显示进度条
+"""
+import os
+import queue
+import threading
+
+import pygame
+
+import asset_pack
+import build_assets
+import device_profile
+import game_log
+import input_replay
+import stall_watchdog
+
+# 主循环中每个动画每帧最多转换的帧数（转换一帧 1280×720 约 1~2 毫秒）
+POLL_LIMIT = 1
+SPLASH_BG = (24, 24, 32)
+PROGRESS_COLOR = (255, 210, 80)
+
+log = game_log.get_logger("assets")
+
+# alpha 通道分类
+OPAQUE = "opaque"
+COLORKEY = "colorkey"
+TRANSLUCENT = "alpha"
+# colorkey 候选颜色（选图中不透明像素没有用到的一个）
+COLORKEY_CANDIDATES = ((255, 0, 255), (0, 255, 0), (1, 254, 3))
+
+# 调色板存储
+PALETTE_ENV = "ZAMMI_PALETTE"
+PALETTE_MODES = ("off", "auto", "quantize")
+# 统计颜色数时先每隔 PALETTE_SAMPLE 个像素抽样，抽样已超过 256 种时不再全图统计
+PALETTE_SAMPLE = 97
+
+# 工作线程结束标记
+_END = object()
+
+# 资源键 -> alpha 分类（本进程内已扫描过的图片）
+_alpha_cache = {}
+
+
+def frame_files(pattern):
+    """
+    解析序列帧文件列表
+
+    Args:
+        pattern: 逗号分隔的文件名，或 glob 通配符（按文件名排序）
+
+    Returns:
+        files: 文件路径列表
+    """
+    if ',' in pattern:
+        files = [f.strip() for f in pattern.split(',') if f.strip()]
+    else:
+        files = asset_pack.glob(pattern)
+    if not files:
+        raise FileNotFoundError(f"找不到匹配的PNG文件: {pattern}")
+    return files
+
+
+def classify_alpha(surface):
+    """
+    扫描 alpha 通道，判断图片的透明类型
+
+    Returns:
+        OPAQUE / COLORKEY / TRANSLUCENT
+    """
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return COLORKEY if surface.get_colorkey() is not None else OPAQUE
+    import numpy as np
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    try:
+        if alpha.min() == 255:
+            return OPAQUE
+        # uint8 减 1 后 0 -> 255、255 -> 254，其余（半透明）都小于 254
+        if not np.count_nonzero((alpha - np.uint8(1)) < 254):
+            return COLORKEY
+        return TRANSLUCENT
+    finally:
+        del alpha
+
+
+def alpha_class(path, surface):
+    """
+    图片的 alpha 分类：优先使用资源包中存的结论，其次本进程的缓存，都没有时扫描一次
+
+    Args:
+        path: 实际读取的图片路径
+        surface: 读出的 Surface
+    """
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return classify_alpha(surface)
+    name = asset_pack.key(path)
+    kind = _alpha_cache.get(name)
+    if kind is None:
+        kind = asset_pack.alpha_class(path) or classify_alpha(surface)
+        _alpha_cache[name] = kind
+    return kind
+
+
+def _colorkey_surface(surface):
+    """
+    把全透明像素涂成一个不透明像素没有用到的颜色
+
+    Returns:
+        (surface, colorkey)，找不到可用颜色时 colorkey 为 None
+    """
+    visible = pygame.mask.from_surface(surface, 0)
+    for color in COLORKEY_CANDIDATES:
+        used = pygame.mask.from_threshold(surface, color + (255,), (1, 1, 1, 255))
+        if not used.overlap_area(visible, (0, 0)):
+            keyed = surface.copy()
+            hidden = visible.copy()
+            hidden.invert()
+            hidden.to_surface(keyed, setcolor=color + (255,), unsetcolor=None)
+            return keyed, color
+    return surface, None
+
+
+def palette_mode():
+    """当前的调色板存储设置（ZAMMI_PALETTE，未设置时按设备档位，无效值按 auto 处理）"""
+    mode = os.environ.get(PALETTE_ENV, "").strip().lower() or device_profile.setting("palette")
+    return mode if mode in PALETTE_MODES else "auto"
+
+
+def _indexed(indices, size, palette):
+    surface = pygame.image.frombytes(indices, size, "P")
+    surface.set_palette(palette)
+    return surface
+
+
+def palettize(surface, kind, mode=None):
+    """
+    把不透明 / colorkey 图片转成 8 位调色板 Surface
+
+    Args:
+        surface: prepare_surface() 处理过的 Surface（colorkey 图片已涂好透明色）
+        kind: alpha 分类，半透明图片不转换
+        mode: 调色板设置，默认 palette_mode()
+
+    Returns:
+        8 位 Surface，不转换时返回原 Surface
+    """
+    mode = palette_mode() if mode is None else mode
+    if mode == "off" or kind == TRANSLUCENT or surface.get_bitsize() == 8:
+        return surface
+    import numpy as np
+
+    def pack(rgb):
+        rgb = rgb.astype(np.uint32)
+        return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+    size = surface.get_size()
+    rgb = np.frombuffer(pygame.image.tobytes(surface, "RGB"), dtype=np.uint8).reshape(-1, 3)
+    if np.unique(pack(rgb[::PALETTE_SAMPLE])).size <= 256:
+        colors, indices = np.unique(pack(rgb), return_inverse=True)
+        if colors.size <= 256:
+            palette = [((c >> 16) & 255, (c >> 8) & 255, c & 255) for c in colors.tolist()]
+            return _indexed(indices.astype(np.uint8).tobytes(), size, palette)
+    if mode != "quantize" or kind != OPAQUE:
+        return surface
+    from PIL import Image
+    image = Image.frombytes("RGB", size, pygame.image.tobytes(surface, "RGB"))
+    quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    flat = quantized.getpalette()
+    palette = [tuple(flat[i:i + 3]) for i in range(0, len(flat), 3)]
+    return _indexed(quantized.tobytes(), size, palette)
+
+
+def prepare_surface(surface, kind):
+    """
+    在工作线程中为转换做准备：colorkey 图片涂好透明色，按 ZAMMI_PALETTE 转成调色板
+
+    Returns:
+        (surface, kind, colorkey)
+    """
+    colorkey = None
+    if kind == COLORKEY and surface.get_flags() & pygame.SRCALPHA:
+        surface, colorkey = _colorkey_surface(surface)
+        if colorkey is None:
+            return surface, TRANSLUCENT, None
+    elif kind == COLORKEY:
+        colorkey = surface.get_colorkey()[:3]
+    return palettize(surface, kind), kind, colorkey
+
+
+class PngFrames:
+    """PNG 序列帧来源（在工作线程中迭代）"""
+
+    def __init__(self, files, scale=None, flip_x=False, duration=100, width=None):
+        """
+        Args:
+            files: 文件路径列表
+            scale: 缩放比例，None 表示原尺寸
+            width: 缩放到的宽度（保持宽高比），与 scale 二选一
+            flip_x: 是否左右翻转
+            duration: 每帧持续时间（毫秒）
+        """
+        self.files = list(files)
+        self.scale = scale
+        self.flip_x = flip_x
+        self.duration = duration
+        self.width = width
+
+    def __len__(self):
+        return len(self.files)
+
+    def __iter__(self):
+        for path in self.files:
+            built = None
+            if self.scale is not None or self.width is not None:
+                built = build_assets.prebuilt(path, self.scale, self.width)
+            surface = asset_pack.load_surface(built or path)
+            # 在缩放前分类：smoothscale 会把不透明的 alpha 舍入成 253
+            kind = alpha_class(built or path, surface)
+            size = build_assets.scaled_size(surface.get_size(), self.scale, self.width)
+            if built is None and size != surface.get_size():
+                # 低档位机器用最近邻缩放，省去 smoothscale 的插值
+                if device_profile.setting("smooth_scaling"):
+                    surface = pygame.transform.smoothscale(surface, size)
+                else:
+                    surface = pygame.transform.scale(surface, size)
+                if kind == COLORKEY:
+                    # 缩放后边缘出现半透明像素
+                    kind = TRANSLUCENT
+            if self.flip_x:
+                surface = pygame.transform.flip(surface, True, False)
+            yield surface, self.duration, kind
+
+
+class GifFrames:
+    """GIF 动画帧来源，逐帧缩放到目标尺寸（在工作线程中迭代）"""
+
+    def __init__(self, path, target_size=(1280, 720)):
+        if not asset_pack.exists(path):
+            raise FileNotFoundError(f"找不到GIF文件: {path}")
+        self.path = str(path)
+        self.target_size = tuple(target_size)
+        self._count = None
+        # 构建好的帧序列（PNG 文件列表, 帧时长列表）
+        self._built = build_assets.gif_frames(self.path, self.target_size)
+
+    def __len__(self):
+        if self._built is not None:
+            return len(self._built[0])
+        if self._count is None:
+            from PIL import Image
+            with asset_pack.open_file(self.path) as f, Image.open(f) as img:
+                self._count = getattr(img, "n_frames", 1)
+        return self._count
+
+    def _to_surface(self, pil_frame):
+        from PIL import Image
+        resample = Image.Resampling.LANCZOS if device_profile.setting("smooth_scaling") else Image.Resampling.BILINEAR
+        frame = pil_frame.convert("RGBA").resize(self.target_size, resample)
+        return pygame.image.fromstring(frame.tobytes(), frame.size, frame.mode)
+
+    def __iter__(self):
+        if self._built is not None:
+            for path, duration in zip(*self._built):
+                surface = asset_pack.load_surface(path)
+                yield surface, duration, alpha_class(path, surface)
+            return
+        from PIL import Image
+        log.info("正在加载 GIF：%d 帧，缩放至 %d×%d", len(self), self.target_size[0], self.target_size[1],
+                 extra={"rate": 0})
+        with asset_pack.open_file(self.path) as f, Image.open(f) as img:
+            try:
+                for i in range(len(self)):
+                    img.seek(i)
+                    # 获取帧持续时间（毫秒），默认 100ms
+                    surface = self._to_surface(img)
+                    yield surface, img.info.get('duration', 100), classify_alpha(surface)
+            except EOFError:
+                # 帧数与实际不符时，已读出的帧照常使用
+                pass
+
+
+def convert_surface(surface, kind=None, colorkey=None):
+    """
+    转换成与窗口一致的像素格式
+
+    Args:
+        surface: 要转换的 Surface
+        kind: alpha 分类（OPAQUE / COLORKEY / TRANSLUCENT），None 时现场扫描
+        colorkey: COLORKEY 图片的透明色（prepare_surface() 的结果）
+
+    Returns:
+        转换后的 Surface；不透明图片不带 alpha，blit 时直接复制；调色板 Surface 保持 8 位
+    """
+    if kind is None:
+        surface, kind, colorkey = prepare_surface(surface, classify_alpha(surface))
+    if kind == TRANSLUCENT:
+        return surface.convert_alpha()
+    if surface.get_bitsize() == 8 and palette_mode() != "off":
+        converted = surface
+    else:
+        converted = surface.convert()
+    if kind == COLORKEY:
+        converted.set_colorkey(colorkey, pygame.RLEACCEL)
+    return converted
+
+
+class FrameStream:
+    """一个动画的帧流：工作线程解码，主线程 poll() 转换后追加到 frames / durations"""
+
+    def __init__(self, name, source):
+        """
+        Args:
+            name: 动画名（用于日志），如 "背景动画"
+            source: 可迭代的帧来源，逐个产生 (surface, 持续毫秒[, alpha 分类])，如 PngFrames / GifFrames
+        """
+        self.name = name
+        self.source = source
+        self.frames = []      # 已就绪的帧（列表对象不变，场景可直接持有引用）
+        self.durations = []
+        self.total = None     # 总帧数，工作线程开始时确定
+        self.done = False
+        self._queue = queue.Queue()
+        self._first = threading.Event()
+        self._first_size = None
+        self._error = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._worker, name=f"load-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _worker(self):
+        try:
+            self.total = len(self.source) if hasattr(self.source, "__len__") else None
+            for item in self.source:
+                surface, duration = item[:2]
+                kind = item[2] if len(item) > 2 else classify_alpha(surface)
+                surface, kind, colorkey = prepare_surface(surface, kind)
+                if self._first_size is None:
+                    self._first_size = surface.get_size()
+                    self._first.set()
+                self._queue.put((surface, duration, kind, colorkey))
+        except Exception as e:
+            self._error = e
+        finally:
+            self._first.set()
+            self._queue.put(_END)
+
+    def first_size(self):
+        """
+        等待第一帧解码完成并返回其尺寸（用于在其余帧加载前创建窗口）
+
+        Returns:
+            (width, height)
+        """
+        self._first.wait()
+        if self._first_size is None:
+            raise self._error or RuntimeError(f"{self.name}没有任何帧")
+        return self._first_size
+
+    def _take(self, item):
+        if item is _END:
+            self.done = True
+            if self._error is not None:
+                raise self._error
+            log.info("✅ 成功加载 %d 帧%s", len(self.frames), self.name, extra={"rate": 0})
+            return
+        surface, duration, kind, colorkey = item
+        self.frames.append(convert_surface(surface, kind, colorkey))
+        self.durations.append(duration)
+
+    def poll(self, limit=POLL_LIMIT):
+        """
+        取回已解码的帧（不阻塞）
+
+        Args:
+            limit: 最多转换的帧数，None 表示全部
+
+        Returns:
+            count: 本次新增的帧数
+        """
+        count = 0
+        while not self.done and (limit is None or count < limit):
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._take(item)
+            if item is not _END:
+                count += 1
+        return count
+
+    def wait(self, count=None):
+        """
+        阻塞直到至少 count 帧就绪（None 表示全部加载完成）
+        """
+        while not self.done and (count is None or len(self.frames) < count):
+            self._take(self._queue.get())
+
+    @property
+    def progress(self):
+        if self.done:
+            return 1.0
+        return len(self.frames) / self.total if self.total else 0.0
+
+
+class Loading:
+    """一个场景的全部帧流：启动画面、逐帧取回和进度条"""
+
+    def __init__(self, *streams):
+        self.streams = list(streams)
+        self._font = None
+
+    def start(self):
+        for stream in self.streams:
+            stream.start()
+
+    def add(self, stream):
+        """加入并启动一个帧流（如要等窗口创建后才知道缩放尺寸的对话框图片）"""
+        self.streams.append(stream)
+        stream.start()
+
+    @property
+    def done(self):
+        return all(stream.done for stream in self.streams)
+
+    @property
+    def progress(self):
+        return sum(stream.progress for stream in self.streams) / len(self.streams)
+
+    def poll(self, limit=POLL_LIMIT):
+        """主循环每帧调用：每个帧流取回少量新帧，全部完成后无开销"""
+        if self.done:
+            return
+        for stream in self.streams:
+            stream.poll(limit)
+
+    def splash(self, screen, min_ready=1):
+        """
+        显示启动画面，直到每个帧流至少有 min_ready 帧就绪
+
+        回放输入时等待全部加载完成，动画帧数与录制时一致
+
+        Args:
+            screen: 窗口 Surface
+            min_ready: 每个动画开始前至少需要的帧数
+        """
+        if input_replay.is_replaying():
+            min_ready = None
+        clock = pygame.time.Clock()
+        while not all(s.done or (min_ready is not None and len(s.frames) >= min_ready) for s in self.streams):
+            # 只处理窗口系统事件，按键等事件留给场景主循环
+            pygame.event.pump()
+            for stream in self.streams:
+                stream.poll(None)
+            self._draw_splash(screen)
+            pygame.display.flip()
+            stall_watchdog.heartbeat("splash")
+            clock.tick(60)
+        for stream in self.streams:
+            stream.poll(None)
+
+    def _draw_splash(self, screen):
+        screen.fill(SPLASH_BG)
+        first = self.streams[0].frames[:1]
+        if first:
+            screen.blit(first[0], (0, 0))
+        if self._font is None:
+            self._font = pygame.font.Font(None, 36)
+        text = self._font.render(f"Loading... {int(self.progress * 100)}%", True, (255, 255, 255))
+        w, h = screen.get_size()
+        screen.blit(text, ((w - text.get_width()) // 2, h // 2 - 40))
+        bar = pygame.Rect(w // 4, h // 2, w // 2, 12)
+        pygame.draw.rect(screen, (255, 255, 255), bar, 1)
+        pygame.draw.rect(screen, PROGRESS_COLOR, (bar.x + 2, bar.y + 2, int((bar.w - 4) * self.progress), bar.h - 4))
+
+    def draw_progress(self, screen):
+        """
+        加载完成前在窗口底部画一条细进度条
+
+        Returns:
+            绘制的区域（Rect），已加载完成时为 None
+        """
+        if self.done:
+            return None
+        w, h = screen.get_size()
+        return pygame.draw.rect(screen, PROGRESS_COLOR, (0, h - 3, int(w * self.progress), 3))
@@ -0,0 +1,125 @@
+"""
+资源内存报告
+按场景列出每个资源在运行时占用的像素内存：全部按 32 位保存时的大小，以及按当前设置（ZAMMI_PALETTE 调色板、
+build_assets.py 生成的增量背景）实际保存的大小，用来估算各场景的资源能否放进内存（如 4 GB 的展台机器）
+
+资源的读取、alpha 分类和调色板转换与运行时相同（asset_loader），只是不创建真正的窗口
+
+用法：
+    python Zammis-Delivery/asset_memory.py                          # 全部场景，按当前 ZAMMI_PALETTE
+    python Zammis-Delivery/asset_memory.py --palette quantize --scene pig
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import pygame
+
+import asset_loader
+import delta_frames
+import scene_data
+
+MB = 1024 * 1024
+
+
+def surface_bytes(surface):
+    """运行时占用的像素内存：8 位调色板 Surface 每像素 1 字节（加调色板），其余转换成 32 位显示格式"""
+    w, h = surface.get_size()
+    if surface.get_bitsize() == 8:
+        return w * h + 256 * 4
+    return w * h * 4
+
+
+def _names(source):
+    if hasattr(source, "files"):
+        return [Path(p).name for p in source.files]
+    return [f"{Path(source.path).name} #{i}" for i in range(len(source))]
+
+
+def _load(source):
+    """
+    按运行时的方式逐帧读取
+
+    Returns:
+        [(名称, 分类, Surface), ...]
+    """
+    rows = []
+    for name, item in zip(_names(source), source):
+        surface, _duration, kind = item
+        surface, kind, _colorkey = asset_loader.prepare_surface(surface, kind)
+        rows.append((name, kind, surface))
+    return rows
+
+
+def scene_report(scene):
+    """
+    一个场景全部资源的内存
+
+    Returns:
+        [(分组, 名称, (w, h), 保存方式, 32 位字节数, 实际字节数), ...]
+    """
+    rows = []
+    _stream, background = delta_frames.background(scene)
+    if isinstance(background, delta_frames.DeltaAnimation):
+        # 整帧播放时每帧一张 32 位 Surface；增量播放时是关键帧 + 图集 + 一张画布
+        loaded = _load(background.stream.source)
+        w, h = loaded[0][2].get_size()
+        frames = len(background.patches)
+        rows.append(("背景", f"{frames} 帧整帧（对比基准）", (w, h), "-", frames * w * h * 4, 0))
+        for (name, kind, surface), label in zip(loaded, ("关键帧", "增量图集")):
+            rows.append(("背景", f"{label} {name}", surface.get_size(), _storage(kind, surface), 0, surface_bytes(surface)))
+        rows.append(("背景", "画布", (w, h), "32 位", 0, w * h * 4))
+    else:
+        for name, kind, surface in _load(scene.background_source()):
+            w, h = surface.get_size()
+            rows.append(("背景", name, (w, h), _storage(kind, surface), w * h * 4, surface_bytes(surface)))
+
+    window_size = scene.window_size or rows[0][2]
+    sources = [("角色", scene.character_source()), ("对话框", scene.dialogue_source(window_size))]
+    for group, source in sources:
+        if source is None:
+            continue
+        for name, kind, surface in _load(source):
+            w, h = surface.get_size()
+            rows.append((group, name, (w, h), _storage(kind, surface), w * h * 4, surface_bytes(surface)))
+    return rows
+
+
+def _storage(kind, surface):
+    return f"8 位调色板（{kind}）" if surface.get_bitsize() == 8 else f"32 位（{kind}）"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="各场景资源的像素内存报告")
+    parser.add_argument("--scene", action="append", help="只报告指定场景（可重复），默认全部")
+    parser.add_argument("--palette", choices=asset_loader.PALETTE_MODES, help="调色板设置，默认 ZAMMI_PALETTE 或 auto")
+    args = parser.parse_args(argv)
+    if args.palette:
+        os.environ[asset_loader.PALETTE_ENV] = args.palette
+
+    names = args.scene or sorted(p.stem for p in scene_data.SCENES_DIR.glob("*.json"))
+    print(f"调色板设置: {asset_loader.palette_mode()}")
+    totals = []
+    for name in names:
+        rows = scene_report(scene_data.load(name))
+        before = sum(r[4] for r in rows)
+        after = sum(r[5] for r in rows)
+        totals.append((name, before, after))
+        print(f"\n== {name} ==")
+        for group, label, (w, h), storage, full, actual in rows:
+            saved = f"{(full - actual) / MB:+.1f}" if full else ""
+            print(f"  {group:<4} {label:<44} {w:>5}×{h:<5} {storage:<22} {full / MB:>7.1f} → {actual / MB:>6.1f} MB {saved}")
+        print(f"  合计 {before / MB:.1f} MB → {after / MB:.1f} MB（节省 {(before - after) / MB:.1f} MB）")
+
+    print("\n场景        32 位      实际")
+    for name, before, after in totals:
+        print(f"{name:<10} {before / MB:>7.1f} MB {after / MB:>7.1f} MB")
+    # 场景依次切换（上一个场景的进程退出后再运行下一个），常驻的只有当前场景的资源
+    peak = max(after for _, _, after in totals)
+    print(f"单个场景最多 {peak / MB:.1f} MB，全部场景合计 {sum(after for _, _, after in totals) / MB:.1f} MB")
+
+
+if __name__ == "__main__":
+    pygame.init()
+    sys.exit(main())
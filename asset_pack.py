@@ -0,0 +1,298 @@
+"""
+资源包
+把项目中的全部图片（assets/、根目录的角色帧、Giraffe_PANJIANI/ 下的 GIF 等）打成一个文件，
+运行时用 mmap 只读映射：只打开一个文件，不再逐个 open/stat 几百个小文件；
+帧数据按需由操作系统分页读入，多个场景进程映射同一个文件时共享页缓存
+
+内容完全相同的文件（如 长颈鹿家.gif 和 giraffe home.gif）只存一份
+
+PNG 可以选择预先解码成像素（--pixels），加载时从映射内存复制出 Surface，省去 PNG 解压；
+代价是包文件大得多（1920×1080 的背景一帧约 6 MB）
+
+格式：
+    头部   b"ZPAK" + 版本(uint32) + 索引偏移(uint64) + 索引长度(uint64)
+    数据   各条目按 16 字节对齐
+    索引   UTF-8 JSON：{相对路径: {"offset", "size", "kind": "file" | "pixels", "width", "height", "format", "alpha"}}
+
+打包时每张 PNG 的 alpha 通道扫描一次，分类（opaque / colorkey / alpha，见 asset_loader.classify_alpha）
+存在索引的 alpha 字段中，运行时不再扫描；完全不透明的 PNG 预解码时存成 RGB
+
+默认使用项目目录下的 assets.zpak（存在时）；环境变量 ZAMMI_ASSET_PACK 可指定其他包文件，设为 off 时不使用资源包
+资源文件修改后需要重新打包：
+
+    python Zammis-Delivery/asset_pack.py build              # 原始文件
+    python Zammis-Delivery/asset_pack.py build --pixels     # PNG 预解码
+    python Zammis-Delivery/asset_pack.py list
+
+场景代码不直接使用本模块，asset_loader / scene_data 通过 load_surface()、open_file()、exists()、glob() 读取资源，
+包中没有的文件从磁盘读取
+"""
+import argparse
+import fnmatch
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+
+import pygame
+
+import game_log
+
+ROOT = Path(__file__).parent
+ROOT_ABS = os.path.abspath(ROOT)
+PACK_ENV = "ZAMMI_ASSET_PACK"
+DEFAULT_PACK = ROOT / "assets.zpak"
+
+MAGIC = b"ZPAK"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQ")
+ALIGN = 16
+EXTENSIONS = (".png", ".gif", ".jpg", ".jpeg")
+SKIP_DIRS = {"__pycache__", "profiles", "sessions"}
+
+log = game_log.get_logger("assets")
+
+
+def key(path):
+    """
+    资源在包中的键：相对项目目录的路径（/ 分隔）
+
+    只做字符串运算，不访问文件系统
+    """
+    rel = os.path.relpath(os.path.abspath(path), ROOT_ABS)
+    return rel.replace(os.sep, "/")
+
+
+class AssetPack:
+    """只读映射的资源包"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_offset, index_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是资源包文件: {self.path}")
+        if version != VERSION:
+            raise ValueError(f"资源包版本 {version} 不受支持（需要 {VERSION}），请重新打包: {self.path}")
+        self.index = json.loads(bytes(self._mmap[index_offset:index_offset + index_size]).decode("utf-8"))
+        self._view = memoryview(self._mmap)
+
+    def __contains__(self, path):
+        return key(path) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def read(self, path):
+        """
+        Returns:
+            memoryview: 条目数据（直接引用映射内存，不复制）
+        """
+        entry = self.index[key(path)]
+        return self._view[entry["offset"]:entry["offset"] + entry["size"]]
+
+    def load_surface(self, path):
+        """
+        读取图片为 Surface；预解码的条目复制一份像素
+        （映射是只读的，直接引用映射内存的 Surface 一旦被写入，如 fill、涂透明色，进程就会崩溃）
+        """
+        entry = self.index[key(path)]
+        data = self._view[entry["offset"]:entry["offset"] + entry["size"]]
+        if entry["kind"] == "pixels":
+            return pygame.image.frombytes(bytes(data), (entry["width"], entry["height"]), entry["format"])
+        return pygame.image.load(io.BytesIO(data), os.path.basename(path))
+
+    def open_file(self, path):
+        """按原始文件读取（如给 PIL 打开 GIF）"""
+        entry = self.index[key(path)]
+        if entry["kind"] != "file":
+            raise ValueError(f"{path} 在资源包中是预解码的像素，不能按文件读取")
+        return io.BytesIO(self.read(path))
+
+    def alpha_class(self, path):
+        """
+        Returns:
+            打包时记录的 alpha 分类，没有记录时为 None
+        """
+        return self.index[key(path)].get("alpha")
+
+    def glob(self, pattern):
+        """
+        Returns:
+            paths: 包中匹配通配符的资源（项目目录下的绝对路径，按文件名排序）
+        """
+        pattern = key(pattern)
+        return sorted(os.path.join(ROOT_ABS, k) for k in self.index if fnmatch.fnmatchcase(k, pattern))
+
+
+_lock = threading.Lock()
+_pack = None
+_opened = False
+
+
+def get():
+    """
+    当前进程使用的资源包（第一次调用时打开）
+
+    Returns:
+        AssetPack，没有资源包或已关闭时为 None
+    """
+    global _pack, _opened
+    if _opened:
+        return _pack
+    with _lock:
+        if not _opened:
+            setting = os.environ.get(PACK_ENV)
+            path = DEFAULT_PACK if not setting else Path(setting)
+            if setting != "off" and path.exists():
+                try:
+                    _pack = AssetPack(path)
+                    log.info("📦 使用资源包: %s（%d 个资源）", path, len(_pack))
+                except (OSError, ValueError) as e:
+                    log.warning("⚠️ 资源包无法使用，改为读取散文件: %s", e)
+            _opened = True
+    return _pack
+
+
+def exists(path):
+    pack = get()
+    return (pack is not None and path in pack) or os.path.exists(path)
+
+
+def load_surface(path):
+    """读取图片：包中有则从包中读取，否则从磁盘读取"""
+    pack = get()
+    if pack is not None and path in pack:
+        return pack.load_surface(path)
+    return pygame.image.load(path)
+
+
+def alpha_class(path):
+    """资源包中记录的 alpha 分类，包中没有该图片时为 None"""
+    pack = get()
+    if pack is not None and path in pack:
+        return pack.alpha_class(path)
+    return None
+
+
+def open_file(path):
+    """打开资源文件（二进制），包中有则返回包内数据"""
+    pack = get()
+    if pack is not None and path in pack and pack.index[key(path)]["kind"] == "file":
+        return pack.open_file(path)
+    return open(path, "rb")
+
+
+def glob(pattern):
+    """匹配通配符的资源（包中没有匹配时查磁盘）"""
+    pack = get()
+    if pack is not None:
+        matches = pack.glob(pattern)
+        if matches:
+            return matches
+    import glob as _glob
+    return sorted(_glob.glob(pattern))
+
+
+# ----------------------------------------------------------------------
+# 打包
+# ----------------------------------------------------------------------
+
+def collect_assets(root=ROOT):
+    """
+    项目中的全部图片资源
+
+    Returns:
+        paths: Path 列表（按相对路径排序）
+    """
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS)
+        for name in filenames:
+            if name.lower().endswith(EXTENSIONS):
+                paths.append(Path(dirpath) / name)
+    return sorted(paths, key=key)
+
+
+def _pixels(surface, alpha):
+    """PNG 像素：有透明像素的存 BGRA（与常见的显示格式字节顺序一致），完全不透明的存 RGB"""
+    fmt = "RGB" if alpha == "opaque" else "BGRA"
+    return pygame.image.tobytes(surface, fmt), surface.get_size(), fmt
+
+
+def build(out_path=DEFAULT_PACK, pixels=False, paths=None):
+    """
+    打包资源
+
+    Args:
+        out_path: 输出文件
+        pixels: 是否把 PNG 预解码成像素
+        paths: 要打包的文件，默认 collect_assets()
+
+    Returns:
+        index: 写入的索引
+    """
+    from asset_loader import classify_alpha
+    out_path = Path(out_path)
+    paths = collect_assets() if paths is None else [Path(p) for p in paths]
+    index = {}
+    stored = {}  # 内容哈希 -> 已写入的条目（相同内容只存一份）
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        for path in paths:
+            raw = path.read_bytes()
+            entry = {"kind": "file"}
+            data = raw
+            if path.suffix.lower() == ".png":
+                surface = pygame.image.load(str(path))
+                entry["alpha"] = classify_alpha(surface)
+                if pixels:
+                    data, (width, height), fmt = _pixels(surface, entry["alpha"])
+                    entry.update(kind="pixels", width=width, height=height, format=fmt)
+            digest = hashlib.sha1(raw).hexdigest() + entry["kind"]
+            if digest not in stored:
+                f.write(b"\0" * (-f.tell() % ALIGN))
+                entry.update(offset=f.tell(), size=len(data))
+                f.write(data)
+                stored[digest] = entry
+            index[key(path)] = stored[digest]
+        f.write(b"\0" * (-f.tell() % ALIGN))
+        index_offset = f.tell()
+        index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+        f.write(index_bytes)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, index_offset, len(index_bytes)))
+    os.replace(tmp_path, out_path)
+    size_mb = out_path.stat().st_size / 1024 / 1024
+    print(f"📦 已打包 {len(index)} 个资源（{len(stored)} 份不同内容）到 {out_path}（{size_mb:.1f} MB）")
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="资源包打包 / 查看")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="打包项目中的全部图片")
+    build_parser.add_argument("-o", "--out", default=str(DEFAULT_PACK), help="输出文件，默认 assets.zpak")
+    build_parser.add_argument("--pixels", action="store_true", help="PNG 预解码成像素（加载更快，文件更大）")
+    list_parser = sub.add_parser("list", help="列出资源包内容")
+    list_parser.add_argument("pack", nargs="?", default=str(DEFAULT_PACK))
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build(args.out, pixels=args.pixels)
+    else:
+        pack = AssetPack(args.pack)
+        for name, entry in sorted(pack.index.items()):
+            detail = f"{entry['width']}×{entry['height']} {entry['format']}" if entry["kind"] == "pixels" else "file"
+            print(f"{entry['size'] / 1024:>10.1f} KB  {detail:<18} {entry.get('alpha', ''):<9} {name}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+无头性能基准
+用 SDL dummy 视频驱动、脚本化输入和合成摄像头（或 --camera 指定的帧源）运行每个场景 N 帧，
+统计各阶段（events / update / draw / flip）耗时、帧耗时 p50/p95/p99、峰值内存和启动到第一帧的耗时
+
+用法（在 Zammis-Delivery 的上一级目录运行，和游戏本身一致）：
+    python Zammis-Delivery/benchmark.py
+    python Zammis-Delivery/benchmark.py --scene main --scene pig --frames 600
+    python Zammis-Delivery/benchmark.py --json bench.json --compare baseline.json
+
+回放一局录制的完整游戏（见 input_replay.py），按真实的场景切换顺序运行并统计每个场景进程：
+    python Zammis-Delivery/benchmark.py --replay sessions/run1 --json run1.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).parent
+GIRAFFE_DIR = REPO_DIR / "Giraffe_PANJIANI"
+
+SCENES = ["main", "giraffe", "pig", "end", "apple"]
+
+# 录制文件中的场景名（启动脚本名）对应的脚本路径
+SCENE_SCRIPTS_BY_NAME = {
+    "main": "main.py",
+    "mainGiraffe": "Giraffe_PANJIANI/mainGiraffe.py",
+    "pig": "pig.py",
+    "end": "end.py",
+    "apple_catcher_game": "apple_catcher_game.py",
+}
+
+# 脚本化输入：(起始帧, 结束帧, 按住的键) 按周期循环；clicks/keydowns 为 (帧号, ...) 单次事件
+# 周期内左右往返，保证角色停留在场景里而不是走出画面触发场景切换
+SCENE_SCRIPTS = {
+    "main": {"period": 240, "hold": [(0, 120, "d"), (120, 240, "a")]},
+    # 向右走到一楼触发点启动姿态挑战，150 帧时按 Esc 放弃挑战后继续左右走动
+    "giraffe": {"period": 400, "hold": [(0, 100, "d"), (160, 260, "a"), (260, 400, "d")],
+                "keydowns": [(150, "escape")]},
+    "pig": {"period": 60, "hold": [(0, 30, "a"), (30, 60, "d")]},
+    "end": {"period": 240, "hold": [(0, 120, "a"), (120, 240, "d")]},
+    "apple": {"period": 1, "hold": []},
+}
+
+# 基准运行时的模拟帧间隔（毫秒），动画计时使用固定步长，结果可复现
+SIM_FRAME_MS = 1000 // 60
+
+
+def percentile(values, pct):
+    """线性插值百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def peak_rss_mb():
+    """当前进程峰值常驻内存（MB），无法获取时返回 None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def summarize(frames):
+    """把逐帧阶段耗时汇总为统计结果"""
+    from frame_profiler import PHASES
+    result = {"frames": len(frames), "phases": {}}
+    for phase in PHASES + ("frame",):
+        values = [f.get(phase, 0.0) for f in frames]
+        result["phases"][phase] = {
+            "mean": sum(values) / len(values) if values else 0.0,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+    # 代码段（frame_profiler.section）按每帧平均和 p95 统计，没有执行的帧记为 0
+    names = sorted({name for f in frames for name in f.get("sections", ())})
+    result["sections"] = {}
+    for name in names:
+        values = [f.get("sections", {}).get(name, 0.0) for f in frames]
+        result["sections"][name] = {"mean": sum(values) / len(values), "p95": percentile(values, 95)}
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 子进程：在无头环境中运行单个场景
+# ---------------------------------------------------------------------------
+
+class ScriptedKeys:
+    """模拟 pygame.key.get_pressed() 的返回值"""
+
+    def __init__(self, held):
+        self.held = held
+
+    def __getitem__(self, key):
+        return key in self.held
+
+    def __len__(self):
+        return 512
+
+    def __iter__(self):
+        return (i in self.held for i in range(512))
+
+
+class BenchClock:
+    """不休眠的时钟：tick 立即返回，get_time 给出固定模拟步长"""
+
+    def __init__(self):
+        self._fps = 0.0
+        self._last = time.perf_counter()
+
+    def tick(self, framerate=0):
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self._fps = 1.0 / elapsed if elapsed > 0 else 0.0
+        return SIM_FRAME_MS
+
+    tick_busy_loop = tick
+
+    def get_time(self):
+        return SIM_FRAME_MS
+
+    def get_rawtime(self):
+        return SIM_FRAME_MS
+
+    def get_fps(self):
+        return self._fps
+
+
+class _FinishedProcess:
+    """替代场景切换时启动的子进程（基准运行中不切换场景）"""
+
+    returncode = 0
+
+    def __init__(self, args, *a, **kw):
+        print(f"[benchmark] 跳过场景切换: {args}")
+
+    def wait(self, timeout=None):
+        return 0
+
+    def poll(self):
+        return 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def install_harness(scene, frames):
+    """安装无头运行所需的替换：输入、时钟、HighGUI 窗口、场景切换"""
+    import cv2
+    import pygame
+    import frame_profiler
+
+    script = SCENE_SCRIPTS[scene]
+    state = {"frame": -1}
+    real_event_get = pygame.event.get
+
+    def held_keys(frame):
+        t = frame % script["period"]
+        return {pygame.key.key_code(name) for start, end, name in script["hold"] if start <= t < end}
+
+    def scripted_event_get(*args, **kwargs):
+        # 每帧调用一次：清空真实事件队列，注入脚本事件，到达帧数后发出 QUIT
+        real_event_get(*args, **kwargs)
+        state["frame"] += 1
+        frame = state["frame"]
+        events = []
+        for at, name in script.get("keydowns", []):
+            if at == frame:
+                key = pygame.key.key_code(name)
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+        for at, pos, button in script.get("clicks", []):
+            if at == frame:
+                events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=button))
+        if frame >= frames:
+            events.append(pygame.event.Event(pygame.QUIT))
+        return events
+
+    pygame.event.get = scripted_event_get
+    pygame.key.get_pressed = lambda: ScriptedKeys(held_keys(max(state["frame"], 0)))
+    pygame.time.Clock = BenchClock
+    pygame.time.delay = lambda ms: 0
+    pygame.time.wait = lambda ms: 0
+
+    # 无头环境没有 HighGUI 窗口
+    cv2.imshow = lambda *a, **kw: None
+    cv2.waitKey = lambda *a, **kw: -1
+    cv2.destroyAllWindows = lambda *a, **kw: None
+    cv2.getWindowProperty = lambda *a, **kw: 1.0
+
+    real_popen = subprocess.Popen
+
+    def popen(args, *a, **kw):
+        # 只拦截场景脚本的启动，其他库内部的子进程照常运行
+        argv = [str(x) for x in args] if isinstance(args, (list, tuple)) else [str(args)]
+        if any(x.endswith(".py") for x in argv):
+            return _FinishedProcess(args)
+        return real_popen(args, *a, **kw)
+
+    subprocess.Popen = popen
+    frame_profiler.profiler.enable()
+
+
+def run_scene(scene):
+    """导入并运行场景入口"""
+    if scene == "main":
+        import main as module
+        module.main()
+    elif scene == "giraffe":
+        sys.path.insert(0, str(GIRAFFE_DIR))
+        import mainGiraffe as module
+        module.main()
+    elif scene == "pig":
+        import pig as module
+        module.main()
+    elif scene == "end":
+        import end as module
+        module.main()
+    elif scene == "apple":
+        import apple_catcher_game as module
+        module.Game().run()
+
+
+def child_main(scene, frames, out_path, camera):
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    # 摄像头由 frame_source 按 ZAMMI_CAMERA 创建，默认使用合成画面
+    os.environ["ZAMMI_CAMERA"] = camera
+    # 基准测试测量全速帧时间，不进入空闲降帧
+    os.environ["ZAMMI_IDLE_AFTER"] = "0"
+    # 固定设备档位（默认 high），不做首次运行的性能测试，各机器上的结果可比
+    os.environ.setdefault("ZAMMI_DEVICE_TIER", "high")
+    # 场景里的资源路径以 "Zammis-Delivery/..." 开头，需要在仓库上一级目录运行
+    os.chdir(REPO_DIR.absolute().parent)
+    sys.path.insert(0, str(REPO_DIR.absolute()))
+
+    install_harness(scene, frames)
+    import frame_profiler
+
+    started = time.perf_counter()
+    error = None
+    try:
+        run_scene(scene)
+    except SystemExit:
+        pass
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - started
+
+    # 从导入场景模块到第一帧显示的耗时（场景在第一次 flip 后调用 lazy_import.first_frame()）
+    import lazy_import
+    first_frame_at = lazy_import.startup_report()["first_frame_at"]
+    startup_ms = None if first_frame_at is None else (first_frame_at - started) * 1000.0
+
+    result = summarize(frame_profiler.profiler.frames)
+    result.update({"scene": scene, "wall_s": wall, "peak_rss_mb": peak_rss_mb(), "startup_ms": startup_ms,
+                   "error": error})
+    Path(out_path).write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+
+
+# ---------------------------------------------------------------------------
+# 父进程：逐个场景启动子进程并汇总
+# ---------------------------------------------------------------------------
+
+def run_benchmarks(scenes, frames, camera):
+    import tempfile
+    results = []
+    for scene in scenes:
+        print(f"▶ 运行场景 {scene}（{frames} 帧）...")
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "result.json"
+            proc = subprocess.run([sys.executable, str(Path(__file__).absolute()),
+                                   "--child", scene, "--frames", str(frames), "--out", str(out),
+                                   "--camera", camera],
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                  encoding="utf-8", errors="replace")
+            if out.exists():
+                result = json.loads(out.read_text(encoding="utf-8"))
+            else:
+                result = {"scene": scene, "frames": 0, "phases": {}, "peak_rss_mb": None,
+                          "error": f"子进程退出码 {proc.returncode}"}
+            if result.get("error"):
+                tail = "\n".join(proc.stdout.strip().splitlines()[-15:])
+                print(f"❌ {scene} 出错: {result['error']}\n{tail}")
+        results.append(result)
+    return results
+
+
+def run_replay(session_dir, timeout):
+    """
+    回放录制的会话：从第一个场景启动真实的场景链，等待所有场景进程写出帧统计
+
+    Args:
+        session_dir: input_replay 录制的会话目录
+        timeout: 最长等待秒数
+
+    Returns:
+        results: 按场景启动顺序排列的统计结果
+    """
+    import tempfile
+    import input_replay
+    import frame_profiler
+
+    session_dir = Path(session_dir).absolute()
+    manifest = session_dir / input_replay.MANIFEST_NAME
+    if not manifest.exists():
+        raise SystemExit(f"❌ 不是录制会话目录: {session_dir}")
+    entries = [line.strip() for line in manifest.read_text(encoding="utf-8").splitlines() if line.strip()]
+    first_scene = entries[0].split(".")[0]
+    script = SCENE_SCRIPTS_BY_NAME.get(first_scene)
+    if script is None:
+        raise SystemExit(f"❌ 未知的起始场景: {first_scene}")
+
+    profile_dir = Path(tempfile.mkdtemp(prefix="zammi-profile-"))
+    env = dict(os.environ)
+    env.update({"SDL_VIDEODRIVER": "dummy", "SDL_AUDIODRIVER": "dummy", "QT_QPA_PLATFORM": "offscreen",
+                input_replay.REPLAY_ENV: str(session_dir), input_replay.FAST_ENV: "1",
+                frame_profiler.PROFILE_ENV: str(profile_dir)})
+    env.pop(input_replay.RECORD_ENV, None)
+    env.pop(input_replay.CLAIMS_ENV, None)
+
+    print(f"▶ 回放会话 {session_dir}（{len(entries)} 个场景进程）...")
+    # 场景之间通过各自启动子进程切换，入口进程结束后链条仍在继续，所以按统计文件数量等待
+    subprocess.Popen([sys.executable, f"Zammis-Delivery/{script}"], env=env,
+                     cwd=str(REPO_DIR.absolute().parent),
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while len(list(profile_dir.glob("*.json"))) < len(entries) and time.time() < deadline:
+        time.sleep(0.5)
+    time.sleep(0.5)
+
+    dumps = []
+    for path in profile_dir.glob("*.json"):
+        try:
+            dumps.append(json.loads(path.read_text(encoding="utf-8")))
+        except ValueError:
+            continue
+    dumps.sort(key=lambda d: d.get("started") or 0)
+    if len(dumps) < len(entries):
+        print(f"⚠️ 只收到 {len(dumps)}/{len(entries)} 个场景的统计（超时或场景出错）")
+
+    results = []
+    for i, dump in enumerate(dumps):
+        result = summarize(dump["frames"])
+        label = entries[i].split(".jsonl")[0] if i < len(entries) else dump["script"]
+        result.update({"scene": label, "peak_rss_mb": None, "error": None})
+        results.append(result)
+    return results
+
+
+def print_report(results, baseline=None):
+    from frame_profiler import PHASES
+    header = f"{'scene':<14} {'frames':>6} " + " ".join(f"{p + ' p50':>11}" for p in PHASES)
+    header += f" {'frame p50':>10} {'p95':>8} {'p99':>8} {'RSS MB':>8} {'start ms':>8}"
+    print()
+    print(header)
+    print("-" * len(header))
+    base = {r["scene"]: r for r in (baseline or [])}
+    for r in results:
+        phases = r.get("phases") or {}
+        if not r.get("frames"):
+            print(f"{r['scene']:<14} {'-':>6}  {r.get('error') or '没有记录到帧'}")
+            continue
+        line = f"{r['scene']:<14} {r['frames']:>6} "
+        line += " ".join(f"{phases[p]['p50']:>11.2f}" for p in PHASES)
+        frame = phases["frame"]
+        rss = r.get("peak_rss_mb")
+        startup = r.get("startup_ms")
+        line += f" {frame['p50']:>10.2f} {frame['p95']:>8.2f} {frame['p99']:>8.2f} {'-' if rss is None else round(rss):>8}"
+        line += f" {'-' if startup is None else round(startup):>8}"
+        print(line)
+        sections = sorted((r.get("sections") or {}).items(), key=lambda item: -item[1]["mean"])[:5]
+        if sections:
+            print(f"{'':<14} {'':>6}  " + "  ".join(f"{name} {stat['mean']:.2f}" for name, stat in sections))
+        prev = base.get(r["scene"])
+        if prev and prev.get("frames"):
+            old = prev["phases"]["frame"]["p95"]
+            delta = (frame["p95"] - old) / old * 100 if old else 0.0
+            print(f"{'':<14} {'':>6}  p95 对比基线: {old:.2f} -> {frame['p95']:.2f} ms ({delta:+.1f}%)")
+    print("（单位：毫秒）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zammi's Delivery 无头性能基准")
+    parser.add_argument("--scene", action="append", choices=SCENES,
+                        help="要运行的场景，可重复；默认全部")
+    parser.add_argument("--frames", type=int, default=300, help="每个场景运行的帧数")
+    parser.add_argument("--camera", default="synthetic",
+                        help="帧源描述（见 frame_source.py），如 synthetic、clip.mp4、pose_take1.jsonl")
+    parser.add_argument("--replay", help="回放 input_replay 录制的会话目录（整局游戏）")
+    parser.add_argument("--timeout", type=float, default=900, help="回放模式最长等待秒数")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="p95 帧耗时相对基线的最大允许增幅（百分比），超过时返回非零退出码")
+    parser.add_argument("--child", choices=SCENES, help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child, args.frames, args.out, args.camera)
+        return 0
+
+    if REPO_DIR.absolute().name != "Zammis-Delivery":
+        print(f"⚠️ 场景资源路径假设仓库目录名为 Zammis-Delivery，当前为 {REPO_DIR.absolute().name}")
+
+    if args.replay:
+        results = run_replay(args.replay, args.timeout)
+    else:
+        results = run_benchmarks(args.scene or SCENES, args.frames, args.camera)
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]
+    print_report(results, baseline)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                                               "frames": args.frames, "results": results},
+                                              ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"结果已保存: {args.json}")
+
+    if baseline and args.max_regression is not None:
+        base = {r["scene"]: r for r in baseline}
+        for r in results:
+            prev = base.get(r["scene"])
+            if not (prev and prev.get("frames") and r.get("frames")):
+                continue
+            old = prev["phases"]["frame"]["p95"]
+            new = r["phases"]["frame"]["p95"]
+            if old and (new - old) / old * 100 > args.max_regression:
+                print(f"❌ {r['scene']} p95 帧耗时回退超过 {args.max_regression}%")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
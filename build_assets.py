@@ -0,0 +1,385 @@
+"""
+资源构建
+离线生成场景需要的各尺寸资源，运行时直接加载现成尺寸，不再缩放：
+    - 序列帧背景按场景的 scale 缩小（如邮局背景 1920×1080 → 1280×720）
+    - GIF 背景逐帧缩放到窗口大小，存成 PNG 序列（帧时长写入清单）
+    - 对话框图片按场景的 dialogue_width 缩放
+    - 不透明的循环背景另存一份增量数据（关键帧 + 变化小块的图集，见 delta_frames.py）
+需要哪些尺寸由 scenes/*.json 决定；缩放用 LANCZOS，alpha 全不透明的图片去掉 alpha 通道，PNG 用 optimize 压缩，
+多个文件用进程池并行处理。输出和清单写在 build/ 下，源文件大小和修改时间未变的跳过
+
+运行时 asset_loader 通过 prebuilt() / gif_frames() 查清单，清单中没有的尺寸照旧在加载时缩放；
+delta_frames 通过 delta_sequence() 查背景的增量数据；
+构建后再运行 asset_pack.py build，构建结果也会打进资源包
+
+用法：
+    python Zammis-Delivery/build_assets.py                    # 构建全部场景
+    python Zammis-Delivery/build_assets.py --scene pig -j 4
+    python Zammis-Delivery/build_assets.py --clean            # 删除 build/ 后重新构建
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import asset_pack
+
+ROOT = Path(__file__).parent
+BUILD_DIR = ROOT / "build"
+MANIFEST_PATH = BUILD_DIR / "manifest.json"
+MANIFEST_VERSION = 1
+
+_lock = threading.Lock()
+_data = None
+_loaded = False
+
+
+def scaled_size(size, scale=None, width=None):
+    """
+    与运行时缩放相同的目标尺寸计算
+
+    Args:
+        size: 原尺寸 (w, h)
+        scale: 缩放比例
+        width: 目标宽度（保持宽高比）
+
+    Returns:
+        (w, h)，不缩放时为原尺寸
+    """
+    w, h = size
+    if scale is not None:
+        return int(w * scale), int(h * scale)
+    if width is not None:
+        return width, int(h * (width / w))
+    return w, h
+
+
+def _size_key(size):
+    return f"{size[0]}x{size[1]}"
+
+
+# ----------------------------------------------------------------------
+# 运行时查询
+# ----------------------------------------------------------------------
+
+def _read_manifest():
+    global _data, _loaded
+    if _loaded:
+        return _data
+    with _lock:
+        if not _loaded:
+            try:
+                data = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+                if data.get("version") == MANIFEST_VERSION:
+                    _data = data
+            except (OSError, ValueError):
+                pass
+            _loaded = True
+    return _data
+
+
+def manifest():
+    """
+    构建清单（第一次调用时读取）
+
+    Returns:
+        dict，没有构建过时为 None
+    """
+    data = _read_manifest()
+    return data["assets"] if data else None
+
+
+def _sequence_key(background):
+    """背景动画的增量数据在清单中的键：源文件列表 + 缩放参数的摘要"""
+    if "gif" in background:
+        sources = [asset_pack.key(background["gif"])]
+        size = _size_key(background["size"])
+    else:
+        sources = [asset_pack.key(path) for path in background["files"]]
+        size = f"scale={background['scale']}"
+    digest = hashlib.sha1("\n".join(sources).encode("utf-8")).hexdigest()[:16]
+    return f"{digest}@{size}"
+
+
+def _variant(path, scale=None, width=None, size=None):
+    assets = manifest()
+    if not assets:
+        return None
+    info = assets.get(asset_pack.key(path))
+    if info is None:
+        return None
+    if size is None:
+        size = scaled_size(info["size"], scale, width)
+    return info["variants"].get(_size_key(size))
+
+
+def prebuilt(path, scale=None, width=None):
+    """
+    已构建好的缩放版本
+
+    Args:
+        path: 源图片路径
+        scale / width: 与 asset_loader.PngFrames 相同的缩放参数
+
+    Returns:
+        构建结果的路径，没有时为 None
+    """
+    variant = _variant(path, scale, width)
+    return os.path.join(asset_pack.ROOT_ABS, variant["path"]) if variant else None
+
+
+def delta_sequence(background):
+    """
+    已构建好的背景增量数据
+
+    Args:
+        background: scene_data.Scene.background
+
+    Returns:
+        {"keyframe", "atlas", "patches", "durations"}（路径为绝对路径），没有时为 None
+    """
+    data = _read_manifest()
+    sequence = data.get("sequences", {}).get(_sequence_key(background)) if data else None
+    if sequence is None:
+        return None
+    return dict(sequence,
+                keyframe=os.path.join(asset_pack.ROOT_ABS, sequence["keyframe"]),
+                atlas=os.path.join(asset_pack.ROOT_ABS, sequence["atlas"]))
+
+
+def gif_frames(path, size):
+    """
+    已构建好的 GIF 帧序列
+
+    Returns:
+        (帧文件路径列表, 帧时长列表)，没有时为 None
+    """
+    variant = _variant(path, size=size)
+    if not variant:
+        return None
+    return [os.path.join(asset_pack.ROOT_ABS, p) for p in variant["frames"]], variant["durations"]
+
+
+# ----------------------------------------------------------------------
+# 构建
+# ----------------------------------------------------------------------
+
+def save_png(image, out_path):
+    """
+    保存 PNG：alpha 全不透明时存成 RGB，用 optimize 压缩（resize_image.py 也使用）
+
+    Args:
+        image: PIL Image
+        out_path: 输出路径，所在目录不存在时自动创建
+    """
+    out_path = Path(out_path)
+    if image.mode == "RGBA" and image.getchannel("A").getextrema() == (255, 255):
+        image = image.convert("RGB")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(out_path, optimize=True)
+
+
+def _build_png(src, size, out_path):
+    from PIL import Image
+    with Image.open(src) as img:
+        image = img.convert("RGBA")
+    if image.size != tuple(size):
+        image = image.resize(tuple(size), Image.Resampling.LANCZOS)
+    save_png(image, out_path)
+    return {"path": asset_pack.key(out_path)}
+
+
+def _build_gif(src, size, out_dir):
+    from PIL import Image
+    frames, durations = [], []
+    with Image.open(src) as img:
+        for i in range(getattr(img, "n_frames", 1)):
+            img.seek(i)
+            out_path = Path(out_dir) / f"{i:04d}.png"
+            save_png(img.convert("RGBA").resize(tuple(size), Image.Resampling.LANCZOS), out_path)
+            frames.append(asset_pack.key(out_path))
+            durations.append(img.info.get("duration", 100))
+    return {"frames": frames, "durations": durations}
+
+
+def _build_delta(frame_paths, durations, atlas_path):
+    """编码增量数据；带透明通道的背景（贴小块会与画布混合）不编码，返回 None"""
+    import numpy as np
+    from PIL import Image
+
+    import delta_frames
+    frames = []
+    for path in frame_paths:
+        with Image.open(path) as img:
+            image = img.convert("RGBA")
+        if image.getchannel("A").getextrema() != (255, 255):
+            return None
+        frames.append(np.asarray(image.convert("RGB")))
+    atlas, patches = delta_frames.encode(frames)
+    save_png(Image.fromarray(atlas), atlas_path)
+    return {"keyframe": asset_pack.key(frame_paths[0]), "atlas": asset_pack.key(atlas_path),
+            "frames": [asset_pack.key(p) for p in frame_paths], "patches": patches, "durations": durations}
+
+
+def _background_frames(background, assets):
+    """
+    背景动画在运行时实际加载的各帧文件
+
+    Returns:
+        (帧文件列表, 帧时长列表)
+    """
+    if "gif" in background:
+        variant = assets[asset_pack.key(background["gif"])]["variants"][_size_key(background["size"])]
+        return [ROOT / p for p in variant["frames"]], variant["durations"]
+    paths = []
+    for path in background["files"]:
+        if background["scale"] is None:
+            paths.append(Path(path))
+        else:
+            info = assets[asset_pack.key(path)]
+            paths.append(ROOT / info["variants"][_size_key(scaled_size(info["size"], background["scale"]))]["path"])
+    return paths, [background["duration"]] * len(paths)
+
+
+def _output_path(src, size, suffix=".png"):
+    rel = Path(asset_pack.key(src))
+    return BUILD_DIR / rel.parent / f"{rel.stem}@{_size_key(size)}{suffix}"
+
+
+def _image_size(path):
+    from PIL import Image
+    with Image.open(path) as img:
+        return img.size
+
+
+def plan(scenes):
+    """
+    场景需要的全部缩放任务
+
+    Args:
+        scenes: scene_data.Scene 列表
+
+    Returns:
+        jobs: {(源文件, (w, h)): "png" | "gif"}
+    """
+    jobs = {}
+    for scene in scenes:
+        background = scene.background
+        if "gif" in background:
+            window = background["size"]
+            jobs[(Path(background["gif"]), window)] = "gif"
+        else:
+            window = scaled_size(_image_size(background["files"][0]), background["scale"])
+            if background["scale"] is not None:
+                for path in background["files"]:
+                    jobs[(Path(path), scaled_size(_image_size(path), background["scale"]))] = "png"
+        if scene.dialogue_width is not None:
+            width = int(scene.dialogue_width(W=window[0], H=window[1]))
+            for path in scene.dialogue_images:
+                jobs[(Path(path), scaled_size(_image_size(path), width=width))] = "png"
+    return jobs
+
+
+def build(scene_names=None, jobs=None):
+    """
+    构建场景需要的资源并更新清单
+
+    Args:
+        scene_names: 场景名列表，默认 scenes/ 下的全部场景
+        jobs: 并行进程数，默认 CPU 核数
+
+    Returns:
+        assets: 更新后的清单内容
+    """
+    import scene_data
+    if scene_names is None:
+        scene_names = sorted(p.stem for p in scene_data.SCENES_DIR.glob("*.json"))
+    scenes = [scene_data.load(name) for name in scene_names]
+
+    try:
+        old = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+        if old.get("version") != MANIFEST_VERSION:
+            old = {}
+    except (OSError, ValueError):
+        old = {}
+    assets = old.get("assets", {})
+    sequences = old.get("sequences", {})
+
+    start = time.perf_counter()
+    todo, skipped = [], 0
+    for (src, size), kind in sorted(plan(scenes).items(), key=lambda item: (str(item[0][0]), item[0][1])):
+        stat = src.stat()
+        info = assets.get(asset_pack.key(src))
+        if info is None or info.get("mtime") != stat.st_mtime or info.get("bytes") != stat.st_size:
+            info = {"size": list(_image_size(src)), "mtime": stat.st_mtime, "bytes": stat.st_size, "variants": {}}
+            assets[asset_pack.key(src)] = info
+        variant = info["variants"].get(_size_key(size))
+        outputs = [variant["path"]] if variant and "path" in variant else (variant or {}).get("frames", [])
+        if variant and all((ROOT / p).exists() for p in outputs):
+            skipped += 1
+            continue
+        todo.append((src, size, kind))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = []
+        for src, size, kind in todo:
+            if kind == "gif":
+                futures.append(pool.submit(_build_gif, str(src), size, str(_output_path(src, size, suffix=""))))
+            else:
+                futures.append(pool.submit(_build_png, str(src), size, str(_output_path(src, size))))
+        for (src, size, kind), future in zip(todo, futures):
+            assets[asset_pack.key(src)]["variants"][_size_key(size)] = future.result()
+            print(f"  {asset_pack.key(src)} -> {_size_key(size)}")
+
+        # 背景增量数据：帧有重新生成过或输出缺失时重新编码
+        rebuilt = {asset_pack.key(_output_path(src, size, suffix="" if kind == "gif" else ".png")) for src, size, kind in todo}
+        delta_jobs = {}
+        for scene in scenes:
+            seq_key = _sequence_key(scene.background)
+            paths, durations = _background_frames(scene.background, assets)
+            if len(paths) < 2 or seq_key in delta_jobs:
+                continue
+            keys = [asset_pack.key(p) for p in paths]
+            current = sequences.get(seq_key)
+            if (current and current["frames"] == keys and (ROOT / current["atlas"]).exists()
+                    and not any(k in rebuilt or k.rsplit("/", 1)[0] in rebuilt for k in keys)):
+                continue
+            atlas_path = BUILD_DIR / "delta" / f"{seq_key}.png"
+            delta_jobs[seq_key] = (scene.name, pool.submit(_build_delta, [str(p) for p in paths], durations, str(atlas_path)))
+        for seq_key, (name, future) in delta_jobs.items():
+            sequence = future.result()
+            if sequence is None:
+                sequences.pop(seq_key, None)
+                print(f"  {name} 背景带透明通道，不生成增量数据")
+                continue
+            sequences[seq_key] = sequence
+            area = sum(w * h for frame in sequence["patches"] for x, y, w, h, ax, ay in frame)
+            print(f"  {name} 背景增量数据: {len(sequence['patches'])} 帧，平均每帧变化 {area / len(sequence['patches']):.0f} 像素")
+
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    MANIFEST_PATH.write_text(json.dumps({"version": MANIFEST_VERSION, "assets": assets, "sequences": sequences},
+                                        ensure_ascii=False, indent=1),
+                             encoding="utf-8")
+    print(f"✅ 资源构建完成: 生成 {len(todo)} 个，跳过 {skipped} 个未变化的（{time.perf_counter() - start:.1f} s），清单: {MANIFEST_PATH}")
+    return assets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离线生成场景需要的各尺寸资源")
+    parser.add_argument("--scene", action="append", help="只构建指定场景（可重复），默认全部")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="并行进程数，默认 CPU 核数")
+    parser.add_argument("--clean", action="store_true", help="先删除 build/ 目录")
+    args = parser.parse_args(argv)
+    if args.clean and BUILD_DIR.exists():
+        shutil.rmtree(BUILD_DIR)
+    build(args.scene, args.jobs)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
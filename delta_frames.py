@@ -0,0 +1,212 @@
+"""
+增量背景动画
+循环背景（邮局 bg1、水果摊、长颈鹿家 GIF）相邻两帧只有小块区域在动，整帧保存和整帧绘制都很浪费：
+构建时（build_assets.py）与上一帧逐块比较，只保存变化的矩形，所有小块拼进一张图集，加上第一帧作为关键帧；
+运行时只保留一张画布，切换帧时把变化的小块贴到画布上，并返回这些矩形，场景只需重绘和刷新这些区域
+
+没有构建增量数据的背景（或带透明通道的背景）照常按整帧播放，两种动画接口相同：
+
+    bg_stream, background = delta_frames.background(scene)
+    ...
+    dirty = background.update(clock.get_time())   # 本帧背景变化的矩形（整帧切换时为整个画面）
+    screen.blit(background.surface, rect, rect)    # 按需重绘
+"""
+import pygame
+
+import asset_loader
+import build_assets
+
+# 比较变化区域的块大小（像素）
+TILE = 32
+
+
+# ----------------------------------------------------------------------
+# 构建（numpy 数组，H×W×C）
+# ----------------------------------------------------------------------
+
+def changed_rects(prev, cur, tile=TILE):
+    """
+    两帧之间变化的区域
+
+    按 tile×tile 的块比较，同一行相邻的变化块合并成一段，上下相邻且左右对齐的段再合并成矩形
+
+    Args:
+        prev, cur: 同尺寸的像素数组（H×W×C）
+
+    Returns:
+        rects: [[x, y, w, h], ...]
+    """
+    import numpy as np
+    diff = np.any(prev != cur, axis=2)
+    h, w = diff.shape
+    rows, cols = -(-h // tile), -(-w // tile)
+    padded = np.zeros((rows * tile, cols * tile), dtype=bool)
+    padded[:h, :w] = diff
+    tiles = padded.reshape(rows, tile, cols, tile).any(axis=(1, 3))
+
+    rects = []
+    growing = {}  # (起始块, 结束块) -> 上一行延伸下来的矩形
+    for row in range(rows):
+        runs = []
+        start = None
+        for col in range(cols + 1):
+            on = col < cols and tiles[row, col]
+            if on and start is None:
+                start = col
+            elif not on and start is not None:
+                runs.append((start, col))
+                start = None
+        next_growing = {}
+        for run in runs:
+            rect = growing.get(run)
+            if rect is None:
+                rect = [run[0] * tile, row * tile, (run[1] - run[0]) * tile, tile]
+                rects.append(rect)
+            else:
+                rect[3] += tile
+            next_growing[run] = rect
+        growing = next_growing
+    for rect in rects:
+        rect[2] = min(rect[2], w - rect[0])
+        rect[3] = min(rect[3], h - rect[1])
+    return rects
+
+
+def encode(frames):
+    """
+    把循环动画编码成关键帧 + 增量小块
+
+    第 i 帧的小块是相对第 i-1 帧的变化，第 0 帧的小块相对最后一帧（循环回到开头时使用）
+
+    Args:
+        frames: 像素数组列表（H×W×C，同尺寸）
+
+    Returns:
+        (atlas, patches)
+        atlas: 拼好全部小块的像素数组
+        patches: 每帧的小块列表 [[x, y, w, h, 图集 x, 图集 y], ...]
+    """
+    import numpy as np
+    height, width = frames[0].shape[:2]
+    patches = []
+    shelf_x = shelf_y = shelf_h = 0
+    for i, frame in enumerate(frames):
+        placed = []
+        for x, y, w, h in changed_rects(frames[i - 1], frame):
+            # 按行（shelf）摆放，一行放不下时换行
+            if shelf_x + w > width:
+                shelf_x, shelf_y, shelf_h = 0, shelf_y + shelf_h, 0
+            placed.append([x, y, w, h, shelf_x, shelf_y])
+            shelf_x += w
+            shelf_h = max(shelf_h, h)
+        patches.append(placed)
+    atlas = np.zeros((max(1, shelf_y + shelf_h), width, frames[0].shape[2]), dtype=frames[0].dtype)
+    for frame, placed in zip(frames, patches):
+        for x, y, w, h, ax, ay in placed:
+            atlas[ay:ay + h, ax:ax + w] = frame[y:y + h, x:x + w]
+    return atlas, patches
+
+
+# ----------------------------------------------------------------------
+# 播放
+# ----------------------------------------------------------------------
+
+class FrameAnimation:
+    """整帧动画：帧列表随加载增长，按已就绪的帧数循环"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.index = 0
+        self._timer = 0
+
+    @property
+    def surface(self):
+        return self.stream.frames[self.index]
+
+    def update(self, dt):
+        """
+        推进动画
+
+        Args:
+            dt: 距上一帧的毫秒数
+
+        Returns:
+            dirty: 背景变化的矩形列表（切换帧时为整个画面）
+        """
+        self._timer += dt
+        if self._timer < self.stream.durations[self.index]:
+            return []
+        self._timer = 0
+        index = (self.index + 1) % len(self.stream.frames)
+        if index == self.index:
+            return []
+        self.index = index
+        return [self.surface.get_rect()]
+
+
+class DeltaAnimation:
+    """增量动画：一张画布，切换帧时只贴变化的小块"""
+
+    def __init__(self, stream, patches, durations):
+        """
+        Args:
+            stream: 帧流，第 0 帧为关键帧，第 1 帧为图集
+            patches: encode() 得到的每帧小块
+            durations: 每帧持续时间（毫秒）
+        """
+        self.stream = stream
+        self.patches = [[(pygame.Rect(x, y, w, h), pygame.Rect(ax, ay, w, h)) for x, y, w, h, ax, ay in frame]
+                        for frame in patches]
+        self.durations = durations
+        self.index = 0
+        self._timer = 0
+        self._canvas = None
+
+    @property
+    def surface(self):
+        if self._canvas is None:
+            # 关键帧会被逐帧修改，转换出一份显示格式的画布（关键帧和图集可能是各自调色板的 8 位 Surface）
+            self._canvas = self.stream.frames[0].convert()
+        return self._canvas
+
+    def update(self, dt):
+        """
+        推进动画
+
+        Args:
+            dt: 距上一帧的毫秒数
+
+        Returns:
+            dirty: 本帧贴上去的小块所在的矩形
+        """
+        self._timer += dt
+        # 图集还没加载完时停在关键帧
+        if self._timer < self.durations[self.index] or len(self.stream.frames) < 2:
+            return []
+        self._timer = 0
+        self.index = (self.index + 1) % len(self.patches)
+        canvas, atlas = self.surface, self.stream.frames[1]
+        dirty = []
+        for dest, area in self.patches[self.index]:
+            canvas.blit(atlas, dest, area)
+            dirty.append(dest)
+        return dirty
+
+
+def background(scene):
+    """
+    场景的背景动画：构建过增量数据时用增量动画，否则整帧播放
+
+    Args:
+        scene: scene_data.Scene
+
+    Returns:
+        (stream, animation)：stream 交给 asset_loader.Loading 加载，animation 供主循环推进和绘制
+    """
+    sequence = build_assets.delta_sequence(scene.background)
+    if sequence is None:
+        stream = asset_loader.FrameStream("背景动画", scene.background_source())
+        return stream, FrameAnimation(stream)
+    source = asset_loader.PngFrames([sequence["keyframe"], sequence["atlas"]])
+    stream = asset_loader.FrameStream("背景动画（增量帧）", source)
+    return stream, DeltaAnimation(stream, sequence["patches"], sequence["durations"])
@@ -0,0 +1,264 @@
+"""
+设备性能档位
+所有机器原来都用同一套设置（1280×720 摄像头、60 帧、运行时 smoothscale）。
+第一次运行时在后台线程测一下这台机器的图片解码、整屏绘制和姿态推理速度，定出档位（high / medium / low），
+结果存在 device_profile.json，之后各场景进程直接读取；测试期间（以及测试失败时）使用 high 档位，
+不等待测试结果，不推迟第一帧：
+
+    设置              high        medium      low
+    fps               60          60          30          帧率上限（frame_scheduler）
+    inference_every   1           1           2           每几帧摄像头画面推理一次，其余帧沿用上次的关键点
+    camera_size       1280×720    960×540     640×360     姿态挑战的摄像头采集尺寸
+    smooth_scaling    是          是          否          运行时缩放用 smoothscale，否则用 scale（asset_loader）
+    palette           auto        auto        quantize    资源的调色板存储（asset_loader，ZAMMI_PALETTE）
+
+显式设置的环境变量（ZAMMI_PALETTE）优先于档位；姿态模型不分档位，都用轻量模型（pose_configs）
+
+环境变量：
+    ZAMMI_DEVICE_TIER      直接指定档位，不做测试（如 benchmark 固定为 high）
+    ZAMMI_DEVICE_PROFILE   档位文件路径，默认仓库目录下的 device_profile.json
+
+用法：
+    device_profile.setting("fps")                          # 当前档位的设置
+    python Zammis-Delivery/device_profile.py               # 重新测试并保存
+    python Zammis-Delivery/device_profile.py --show        # 查看当前档位
+    python Zammis-Delivery/device_profile.py --tier low    # 手动指定档位并保存
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from pathlib import Path
+
+import game_log
+
+ROOT = Path(__file__).parent
+TIER_ENV = "ZAMMI_DEVICE_TIER"
+PROFILE_ENV = "ZAMMI_DEVICE_PROFILE"
+PROFILE_PATH = ROOT / "device_profile.json"
+PROFILE_VERSION = 1
+
+TIERS = {
+    "high": {"fps": 60, "inference_every": 1, "camera_size": [1280, 720], "smooth_scaling": True, "palette": "auto"},
+    "medium": {"fps": 60, "inference_every": 1, "camera_size": [960, 540], "smooth_scaling": True, "palette": "auto"},
+    "low": {"fps": 30, "inference_every": 2, "camera_size": [640, 360], "smooth_scaling": False, "palette": "quantize"},
+}
+# 没有测试结果（测试中、测试失败）、也没有指定档位时使用（与原来的设置相同）
+DEFAULT_TIER = "high"
+
+# 档位阈值（毫秒）：每项都在 high 以内为 high，有一项超过 low 为 low，其余为 medium
+# 60 帧每帧 16.7 毫秒：推理放在摄像头帧上（30 帧），整屏绘制每帧约 3 次
+THRESHOLDS = {
+    "decode_ms": {"high": 15.0, "low": 40.0},
+    "blit_ms": {"high": 1.5, "low": 5.0},
+    "inference_ms": {"high": 30.0, "low": 60.0},
+}
+
+_profile = None
+_lock = threading.Lock()   # 资源加载线程和主循环可能同时第一次读取
+_calibrating = None        # 后台测试线程
+
+log = game_log.get_logger("device")
+
+
+def profile_path():
+    return Path(os.environ.get(PROFILE_ENV, PROFILE_PATH))
+
+
+def _machine():
+    """机器标识：档位文件被复制到别的机器时重新测试"""
+    return {"node": platform.node(), "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count()}
+
+
+def _time_ms(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+# 测试不创建窗口：解码只算 PNG 解压，绘制用两张同格式的 32 位 Surface（与显示格式之间的 blit 相同）
+
+def measure_decode():
+    """解码一张 1280×720 的 PNG（有纹理的画面，接近背景图的压缩率）"""
+    import numpy as np
+    import pygame
+    y, x = np.mgrid[0:720, 0:1280]
+    pixels = np.stack([(x * 7 + y) % 256, (y * 3) % 256, (x ^ y) % 256], axis=2).astype(np.uint8)
+    data = io.BytesIO()
+    pygame.image.save(pygame.surfarray.make_surface(pixels.swapaxes(0, 1)), data, "png")
+    png = data.getvalue()
+    return _time_ms(lambda: pygame.image.load(io.BytesIO(png), "x.png"), 5)
+
+
+def measure_blit():
+    """整屏 1280×720 绘制一次（display 格式之间的 blit）"""
+    import pygame
+    target = pygame.Surface((1280, 720), 0, 32)
+    source = pygame.Surface((1280, 720), 0, 32)
+    source.fill((120, 80, 40))
+    return _time_ms(lambda: target.blit(source, (0, 0)), 30)
+
+
+def measure_inference():
+    """MediaPipe Pose 推理一帧 640×480 画面（完整模型，轻量模型可能需要下载）；没有安装 MediaPipe 时返回 None"""
+    try:
+        import mediapipe as mp
+        import numpy as np
+    except ImportError:
+        return None
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    frame[120:420, 260:380] = (200, 170, 150)
+    with mp.solutions.pose.Pose(model_complexity=1) as pose:
+        pose.process(frame)   # 第一次推理包含初始化
+        return _time_ms(lambda: pose.process(frame), 5)
+
+
+def choose_tier(measured):
+    """
+    按测试结果定档位
+
+    Args:
+        measured: {"decode_ms": ..., "blit_ms": ..., "inference_ms": ...}（没有测的项为 None）
+
+    Returns:
+        "high" / "medium" / "low"
+    """
+    tier = "high"
+    for name, limits in THRESHOLDS.items():
+        value = measured.get(name)
+        if value is None:
+            continue
+        if value > limits["low"]:
+            return "low"
+        if value > limits["high"]:
+            tier = "medium"
+    return tier
+
+
+def calibrate():
+    """
+    测试这台机器并保存档位文件
+
+    Returns:
+        档位信息 dict
+    """
+    log.info("📏 正在测试设备性能（只在第一次运行时进行）...")
+    try:
+        measured = {"decode_ms": measure_decode(), "blit_ms": measure_blit(), "inference_ms": measure_inference()}
+    except Exception as e:
+        # 保存默认档位，之后的场景进程不再重复测试（可用命令行重新测试）
+        log.warning("⚠️ 设备性能测试失败（%s），使用 %s 档位", e, DEFAULT_TIER)
+        profile = _new_profile(DEFAULT_TIER, {}, error=str(e))
+        save(profile)
+        return profile
+    profile = _new_profile(choose_tier(measured), measured)
+    save(profile)
+    summary = "，".join(f"{k} {v:.1f}" for k, v in measured.items() if v is not None)
+    log.info("📏 设备档位: %s（%s）", profile["tier"], summary)
+    return profile
+
+
+def _new_profile(tier, measured, **extra):
+    return {"version": PROFILE_VERSION, "tier": tier, "measured": measured, "machine": _machine(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"), **extra}
+
+
+def save(profile):
+    """写入档位文件（先写临时文件再替换，同时启动的其他场景进程不会读到一半的文件）"""
+    path = profile_path()
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+        os.replace(temp, path)
+    except OSError as e:
+        log.warning("⚠️ 无法保存档位文件 %s（%s）", path, e)
+
+
+def _load():
+    path = profile_path()
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if profile.get("version") != PROFILE_VERSION or profile.get("tier") not in TIERS:
+        return None
+    if profile.get("machine") != _machine():
+        log.info("📏 档位文件来自另一台机器，重新测试")
+        return None
+    return profile
+
+
+def current():
+    """
+    当前档位（ZAMMI_DEVICE_TIER > 档位文件 > 默认档位）
+
+    没有档位文件时在后台线程测试并保存，本进程继续使用默认档位（同一进程内的设置不中途改变），
+    之后启动的场景进程读取测试结果
+
+    Returns:
+        档位信息 dict，至少包含 "tier"
+    """
+    global _profile, _calibrating
+    with _lock:
+        if _profile is not None:
+            return _profile
+        forced = os.environ.get(TIER_ENV, "").strip().lower()
+        if forced in TIERS:
+            _profile = {"tier": forced, "forced": True}
+            return _profile
+        profile = _load()
+        if profile is None:
+            profile = {"tier": DEFAULT_TIER, "pending": True}
+            _calibrating = threading.Thread(target=calibrate, name="device-calibrate", daemon=True)
+            _calibrating.start()
+        _profile = profile
+        return _profile
+
+
+def tier():
+    return current()["tier"]
+
+
+def setting(name):
+    """当前档位的一项设置（见 TIERS）"""
+    return TIERS[tier()][name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测试设备性能并保存档位")
+    parser.add_argument("--show", action="store_true", help="只显示当前档位，不重新测试")
+    parser.add_argument("--tier", choices=list(TIERS), help="手动指定档位并保存")
+    args = parser.parse_args(argv)
+
+    if args.tier:
+        profile = _new_profile(args.tier, {}, manual=True)
+        save(profile)
+    elif args.show:
+        profile = current()
+        if profile.get("pending"):
+            # 没有档位文件：等后台测试完成
+            _calibrating.join()
+            profile = _load() or profile
+    else:
+        profile = calibrate()
+    print(f"档位: {profile['tier']}{'（手动指定）' if profile.get('manual') or profile.get('forced') else ''}")
+    for name, value in (profile.get("measured") or {}).items():
+        print(f"  {name:<14} {'-' if value is None else f'{value:.2f}'}")
+    for name, value in TIERS[profile["tier"]].items():
+        print(f"  {name:<16} {value}")
+    print(f"档位文件: {profile_path()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+帧耗时统计
+场景主循环在每个阶段结束处打点（events / update / draw / flip），默认关闭，开启后记录每帧各阶段耗时；
+更细的代码段（动画、碰撞、推理、各绘制部分）用 section() 计时，可作为 with 语句或装饰器使用
+
+运行时按 F3 显示/隐藏帧耗时曲线（同时开启统计），按 F4 把最近的数据导出为 CSV 和 JSON
+
+设置环境变量 ZAMMI_PROFILE=<目录> 时自动开启，进程退出时把逐帧数据写入该目录（子进程同样生效）
+"""
+import atexit
+import csv
+import functools
+import json
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+# 阶段顺序与主循环一致
+PHASES = ("events", "update", "draw", "flip")
+PROFILE_ENV = "ZAMMI_PROFILE"
+# 最近帧的环形缓冲长度（曲线宽度，像素）
+RING_SIZE = 240
+
+# 曲线中各阶段颜色
+PHASE_COLORS = {
+    "events": (160, 160, 160),
+    "update": (80, 200, 120),
+    "draw": (80, 150, 255),
+    "flip": (255, 170, 60),
+}
+GRAPH_HEIGHT = 100
+GRAPH_MS = 50.0  # 曲线顶部对应的毫秒数
+
+
+def _script_name():
+    """当前场景脚本名，用于导出文件名"""
+    return Path(sys.argv[0]).stem.strip("-") or "profile"
+
+
+class _Section:
+    """代码段计时器，可作为 with 语句或装饰器使用"""
+
+    __slots__ = ("profiler", "name", "_start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self._start = None
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            self.profiler.add_section(self.name, (time.perf_counter() - self._start) * 1000.0)
+            self._start = None
+        return False
+
+    def __call__(self, func):
+        profiler, name = self.profiler, self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Section(profiler, name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class FrameProfiler:
+    """按阶段记录每帧耗时（毫秒）"""
+
+    def __init__(self):
+        self.enabled = False
+        self.keep_history = False  # 是否保留全部帧（基准/退出导出用），否则只保留环形缓冲
+        self.started = None
+        self.frames = []  # 每帧一个 {阶段: 毫秒} 字典
+        self.recent = deque(maxlen=RING_SIZE)
+        self.overlay_visible = False
+        self._frame_start = None
+        self._last_mark = None
+        self._current = None
+        self._overlay = None
+
+    def enable(self, history=True):
+        """
+        开启统计
+
+        Args:
+            history: 是否保留全部帧；只看曲线时为 False，内存占用固定
+        """
+        self.enabled = True
+        self.keep_history = history
+        self.frames = []
+        self.recent.clear()
+        self.started = time.time()
+
+    def section(self, name):
+        """
+        代码段计时
+
+            with frame_profiler.section("collision"):
+                ...
+
+            @frame_profiler.section("draw.ui")
+            def draw_ui(self): ...
+        """
+        return _Section(self, name)
+
+    def add_section(self, name, ms):
+        """把一段耗时累加到当前帧（同名代码段一帧内多次执行时累加）"""
+        if self._current is None:
+            return
+        sections = self._current.setdefault("sections", {})
+        sections[name] = sections.get(name, 0.0) + ms
+
+    def current_frame(self):
+        """
+        正在进行的这一帧已完成的阶段和代码段（可在其他线程调用，如卡顿看门狗）
+
+        Returns:
+            (phases, sections)：{阶段: 毫秒}、{代码段: 毫秒} 的副本；没有正在统计的帧时都为空
+        """
+        current = self._current
+        if not current:
+            return {}, {}
+        phases = {k: v for k, v in dict(current).items() if k in PHASES}
+        return phases, dict(current.get("sections", {}))
+
+    def begin_frame(self):
+        """主循环每帧开始时调用"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last_mark = now
+        self._current = {}
+
+    def mark(self, phase):
+        """
+        标记一个阶段结束
+
+        Args:
+            phase: 阶段名，通常是 PHASES 之一
+        """
+        if not self.enabled or self._current is None:
+            return
+        now = time.perf_counter()
+        self._current[phase] = self._current.get(phase, 0.0) + (now - self._last_mark) * 1000.0
+        self._last_mark = now
+        if phase == PHASES[-1]:
+            self._current["frame"] = (now - self._frame_start) * 1000.0
+            if self.keep_history:
+                self.frames.append(self._current)
+            self.recent.append(self._current)
+            if self._overlay is not None:
+                self._overlay.push(self._current)
+            self._current = None
+
+    # ------------------------------------------------------------------
+    # 导出
+    # ------------------------------------------------------------------
+
+    def _export_frames(self):
+        return self.frames if self.keep_history else list(self.recent)
+
+    def dump_json(self, path):
+        """把逐帧数据写入 JSON 文件"""
+        data = {"script": _script_name(), "pid": os.getpid(), "started": self.started,
+                "phases": list(PHASES), "frames": self._export_frames()}
+        Path(path).write_text(json.dumps(data), encoding="utf-8")
+
+    def dump_csv(self, path):
+        """把逐帧数据写入 CSV 文件（每帧一行，阶段和代码段各占一列）"""
+        frames = self._export_frames()
+        section_names = sorted({name for f in frames for name in f.get("sections", ())})
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame_index", *PHASES, "frame", *section_names])
+            for i, frame in enumerate(frames):
+                sections = frame.get("sections", {})
+                writer.writerow([i, *(f"{frame.get(p, 0.0):.3f}" for p in PHASES), f"{frame.get('frame', 0.0):.3f}",
+                                 *(f"{sections.get(name, 0.0):.3f}" for name in section_names)])
+
+    def dump(self, out_dir=None):
+        """
+        同时导出 CSV 和 JSON
+
+        Args:
+            out_dir: 输出目录，默认 ZAMMI_PROFILE 或当前目录下的 profiles
+
+        Returns:
+            base: 输出文件路径（不含扩展名）
+        """
+        out_dir = Path(out_dir or os.environ.get(PROFILE_ENV) or "profiles")
+        out_dir.mkdir(parents=True, exist_ok=True)
+        base = out_dir / f"{_script_name()}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.dump_csv(base.with_suffix(".csv"))
+        self.dump_json(base.with_suffix(".json"))
+        print(f"📊 帧耗时已导出: {base}.csv / .json")
+        return base
+
+    # ------------------------------------------------------------------
+    # 屏幕曲线
+    # ------------------------------------------------------------------
+
+    def handle_event(self, event):
+        """处理 F3（曲线开关）和 F4（导出），在场景事件循环中调用"""
+        import pygame
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_F3:
+            self.overlay_visible = not self.overlay_visible
+            if self.overlay_visible and not self.enabled:
+                self.enable(history=False)
+        elif event.key == pygame.K_F4 and self.enabled:
+            self.dump()
+
+    def draw_overlay(self, screen):
+        """
+        曲线可见时绘制到屏幕左下角
+
+        Returns:
+            绘制的区域（Rect），不可见时为 None
+        """
+        if not self.overlay_visible:
+            return None
+        if self._overlay is None:
+            self._overlay = _Overlay(self)
+        return self._overlay.draw(screen)
+
+
+class _Overlay:
+    """帧耗时曲线：每帧只画最新一列并滚动已有内容，开销与曲线宽度无关"""
+
+    def __init__(self, profiler):
+        import pygame
+        self.pygame = pygame
+        self.profiler = profiler
+        self.graph = pygame.Surface((RING_SIZE, GRAPH_HEIGHT), pygame.SRCALPHA)
+        self.graph.fill((0, 0, 0, 150))
+        self.font = pygame.font.Font(None, 18)
+        self.text = None
+        self._text_updated = 0.0
+        for frame in profiler.recent:
+            self.push(frame)
+
+    def push(self, frame):
+        """追加一帧：曲线左移一像素，在最右列画各阶段的堆叠柱"""
+        graph = self.graph
+        x = RING_SIZE - 1
+        graph.scroll(-1, 0)
+        graph.fill((0, 0, 0, 150), (x, 0, 1, GRAPH_HEIGHT))
+        scale = GRAPH_HEIGHT / GRAPH_MS
+        bottom = GRAPH_HEIGHT
+        for phase in PHASES:
+            h = frame.get(phase, 0.0) * scale
+            if h <= 0:
+                continue
+            top = max(0.0, bottom - h)
+            graph.fill(PHASE_COLORS[phase], (x, int(top), 1, max(1, int(bottom) - int(top))))
+            bottom = top
+            if bottom <= 0:
+                break
+        # 16.7ms（60fps）和 33.3ms（30fps）参考线
+        for ms in (1000.0 / 60, 1000.0 / 30):
+            graph.fill((255, 255, 255, 120), (x, int(GRAPH_HEIGHT - ms * scale), 1, 1))
+
+    def _summary(self):
+        frames = list(self.profiler.recent)
+        if not frames:
+            return ["no frames"]
+        times = sorted(f.get("frame", 0.0) for f in frames)
+        avg = sum(times) / len(times)
+        p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+        phases = "  ".join(f"{p} {sum(f.get(p, 0.0) for f in frames) / len(frames):.1f}" for p in PHASES)
+        totals = {}
+        for f in frames:
+            for name, ms in f.get("sections", {}).items():
+                totals[name] = totals.get(name, 0.0) + ms
+        top = sorted(totals.items(), key=lambda item: -item[1])[:4]
+        lines = [f"frame avg {avg:.1f} ms  p95 {p95:.1f} ms  ({1000.0 / avg if avg else 0:.0f} fps)", phases]
+        if top:
+            lines.append("  ".join(f"{name} {ms / len(frames):.1f}" for name, ms in top))
+        return lines
+
+    def draw(self, screen):
+        now = time.perf_counter()
+        # 文字每 0.25 秒更新一次
+        if self.text is None or now - self._text_updated > 0.25:
+            self._text_updated = now
+            rendered = [self.font.render(line, True, (255, 255, 255)) for line in self._summary()]
+            width = max(RING_SIZE, max(r.get_width() for r in rendered) + 8)
+            height = sum(r.get_height() for r in rendered) + 6
+            self.text = self.pygame.Surface((width, height), self.pygame.SRCALPHA)
+            self.text.fill((0, 0, 0, 170))
+            y = 3
+            for r in rendered:
+                self.text.blit(r, (4, y))
+                y += r.get_height()
+        x = 8
+        y = screen.get_height() - GRAPH_HEIGHT - self.text.get_height() - 8
+        text_rect = screen.blit(self.text, (x, y))
+        return text_rect.union(screen.blit(self.graph, (x, y + self.text.get_height())))
+
+
+# 全局实例，各场景共用
+profiler = FrameProfiler()
+begin_frame = profiler.begin_frame
+mark = profiler.mark
+section = profiler.section
+handle_event = profiler.handle_event
+draw_overlay = profiler.draw_overlay
+
+
+def _dump_on_exit(out_dir):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    profiler.dump_json(out_dir / f"{_script_name()}-{os.getpid()}.json")
+
+
+if os.environ.get(PROFILE_ENV):
+    profiler.enable()
+    atexit.register(_dump_on_exit, Path(os.environ[PROFILE_ENV]))
@@ -0,0 +1,158 @@
+"""
+帧调度
+场景主循环原来每帧都 clock.tick(60) 全速重绘，哪怕画面没有变化（对话框等待点击、展台前没有人）；
+常开的展台机器上这白白占用 CPU 和电量。主循环改为调用 tick()：
+
+    - 有输入、按住按键、视频播放、摄像头挑战进行中、资源加载中：按目标帧率运行
+    - 超过 ZAMMI_IDLE_AFTER 秒没有活动：进入空闲，降到 ZAMMI_IDLE_FPS 帧率（默认 10，正好跟上 100 毫秒一帧的动画）；
+      空闲时阻塞等待事件，有输入立即返回并恢复全速，不需要等下一个空闲周期
+
+环境变量：
+    ZAMMI_PACING       tick（默认）  Clock.tick 睡眠等待
+                       busy          Clock.tick_busy_loop 忙等，帧间隔更准，但占满一个 CPU 核
+                       vsync         窗口开启垂直同步（需要 SDL 渲染器，见 presentation），flip 按显示器刷新节拍，tick 只做上限
+    ZAMMI_IDLE_AFTER   无活动多少秒后进入空闲，默认 10，0 表示不进入空闲
+    ZAMMI_IDLE_FPS     空闲时的帧率，默认 10；0 表示只在有事件时才画下一帧（动画暂停）
+
+全速时的帧率不超过设备档位的上限（device_profile 的 fps，低档位机器为 30）
+
+回放输入时不进入空闲，保证与录制时逐帧一致
+
+每次 tick 都向卡顿看门狗（stall_watchdog）发送心跳，空闲等待事件不算卡顿
+
+用法：
+    for event in input_replay.events():
+        frame_scheduler.handle_event(event)
+        ...
+    if video_playing:
+        frame_scheduler.wake()
+    ...
+    pygame.display.flip()
+    frame_scheduler.tick(clock)          # 代替 clock.tick(60)
+"""
+import os
+import time
+
+import pygame
+
+import device_profile
+import game_log
+import input_replay
+import stall_watchdog
+
+PACING_ENV = "ZAMMI_PACING"
+IDLE_AFTER_ENV = "ZAMMI_IDLE_AFTER"
+IDLE_FPS_ENV = "ZAMMI_IDLE_FPS"
+PACING_MODES = ("tick", "busy", "vsync")
+FPS = 60
+IDLE_AFTER = 10.0
+IDLE_FPS = 10
+
+log = game_log.get_logger("scheduler")
+
+# 算作玩家活动的事件
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                pygame.MOUSEMOTION, pygame.MOUSEWHEEL, pygame.FINGERDOWN, pygame.FINGERUP, pygame.FINGERMOTION,
+                pygame.WINDOWEXPOSED, pygame.WINDOWFOCUSGAINED)
+
+
+def pacing():
+    """当前的帧节拍方式（无效值按 tick 处理）"""
+    mode = os.environ.get(PACING_ENV, "tick").strip().lower()
+    return mode if mode in PACING_MODES else "tick"
+
+
+def _env_number(name, default):
+    try:
+        return max(0.0, float(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+class FrameScheduler:
+    """按活动情况在全速和空闲帧率之间切换的帧调度"""
+
+    def __init__(self):
+        self.pacing = pacing()
+        self.idle_after = _env_number(IDLE_AFTER_ENV, IDLE_AFTER)
+        self.idle_fps = _env_number(IDLE_FPS_ENV, IDLE_FPS)
+        self.idle = False
+        self._last_active = time.perf_counter()
+        self._last_tick = self._last_active
+        self._held = set()   # 按住的按键和鼠标键
+        self._max_fps = None  # 设备档位的帧率上限，第一次 tick 时读取
+
+    def wake(self):
+        """标记有活动（如视频播放、摄像头挑战），立即恢复全速"""
+        self._last_active = time.perf_counter()
+        if self.idle:
+            self.idle = False
+            log.info("⏩ 检测到活动，恢复全速刷新")
+
+    def handle_event(self, event):
+        """处理一条事件，在场景事件循环中调用"""
+        if event.type not in INPUT_EVENTS:
+            return
+        if event.type == pygame.KEYDOWN:
+            self._held.add(("key", event.key))
+        elif event.type == pygame.KEYUP:
+            self._held.discard(("key", event.key))
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self._held.add(("mouse", event.button))
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self._held.discard(("mouse", event.button))
+        self.wake()
+
+    def _should_idle(self):
+        if not self.idle_after or self._held or input_replay.is_replaying():
+            return False
+        return time.perf_counter() - self._last_active >= self.idle_after
+
+    def _wait(self):
+        """空闲时等到下一帧的时间或有事件到来；事件放回队列留给主循环处理"""
+        if self.idle_fps:
+            timeout = int(1000 / self.idle_fps - (time.perf_counter() - self._last_tick) * 1000)
+            if timeout <= 0:
+                return
+            event = pygame.event.wait(timeout)
+        else:
+            event = pygame.event.wait()
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+
+    def tick(self, clock, fps=FPS):
+        """
+        结束一帧：按节拍方式等待到下一帧，空闲时降低帧率
+
+        Args:
+            clock: input_replay.Clock
+            fps: 全速时的目标帧率（不超过设备档位的上限）
+
+        Returns:
+            dt: 距上一帧的毫秒数（与 clock.tick 相同）
+        """
+        if self._max_fps is None:
+            self._max_fps = device_profile.setting("fps")
+        fps = min(fps, self._max_fps)
+        if self._should_idle():
+            if not self.idle:
+                self.idle = True
+                rate = f"{self.idle_fps:g} fps" if self.idle_fps else "有事件时才刷新"
+                log.info("💤 %g 秒没有活动，进入空闲（%s）", self.idle_after, rate)
+            with stall_watchdog.expect("空闲等待事件"):
+                self._wait()
+            dt = clock.tick(0)
+        elif self.pacing == "busy":
+            dt = clock.tick_busy_loop(fps)
+        else:
+            dt = clock.tick(fps)
+        self._last_tick = time.perf_counter()
+        stall_watchdog.heartbeat()
+        return dt
+
+
+# 全局实例，每个场景进程一个
+scheduler = FrameScheduler()
+handle_event = scheduler.handle_event
+wake = scheduler.wake
+tick = scheduler.tick
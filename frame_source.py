@@ -0,0 +1,452 @@
+"""
+帧源
+统一摄像头、视频文件、图片目录、录制的关键点流和合成画面的读取接口，
+接口与 cv2.VideoCapture 保持一致（isOpened / read / release），方便在没有摄像头的机器上复现测试
+
+帧源描述字符串（open_source 的 spec 参数或环境变量 ZAMMI_CAMERA）：
+    "0"、"1" ...        摄像头设备号
+    "synthetic"         合成画面（移动色块），无需任何文件
+    "xxx.mp4"           视频文件，逐帧顺序读取
+    "some/dir"          图片目录，按文件名顺序读取
+    "xxx.jsonl"         录制的关键点流，跳过 MediaPipe 推理直接给出关键点
+
+录制关键点流：
+    python Zammis-Delivery/frame_source.py record pose 0 pose_take1.jsonl --frames 300
+    python Zammis-Delivery/frame_source.py record hand clip.mp4 hand_take1.jsonl
+    python Zammis-Delivery/frame_source.py pose-config strong_action strong.jsonl --frames 60
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# 环境变量：指定全局使用的帧源，子进程（场景切换）会继承
+CAMERA_ENV = "ZAMMI_CAMERA"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+LANDMARK_FORMAT = "zammi-landmarks"
+
+
+class Landmark:
+    """单个关键点，字段与 MediaPipe NormalizedLandmark 一致"""
+
+    __slots__ = ("x", "y", "z", "visibility")
+
+    def __init__(self, x, y, z=0.0, visibility=1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+class LandmarkList:
+    """关键点列表，和 MediaPipe 结果一样通过 .landmark[i] 访问"""
+
+    def __init__(self, points):
+        self.landmark = [Landmark(*p) for p in points]
+
+
+def landmarks_to_points(landmark_list):
+    """把 MediaPipe 关键点列表转换为 [[x, y, z, visibility], ...]，用于录制"""
+    if landmark_list is None:
+        return None
+    return [[round(lm.x, 5), round(lm.y, 5), round(lm.z, 5), round(getattr(lm, "visibility", 1.0), 4)]
+            for lm in landmark_list.landmark]
+
+
+class FrameSource(ABC):
+    """帧源基类（子类必须实现 read）"""
+
+    # 为 True 时帧源自带关键点（landmarks()），使用方应跳过 MediaPipe 推理
+    provides_landmarks = False
+
+    def __init__(self, size=(640, 480)):
+        self.size = (int(size[0]), int(size[1]))
+        self.index = 0  # 已读取的帧数
+
+    def isOpened(self):
+        return True
+
+    @abstractmethod
+    def read(self):
+        """
+        读取下一帧
+
+        Returns:
+            ret: 是否读取成功
+            frame: BGR 图像
+        """
+
+    def landmarks(self, kind):
+        """
+        返回最近一帧的录制关键点
+
+        Args:
+            kind: "pose" 或 "hand"
+
+        Returns:
+            LandmarkList，该帧没有检测到目标时为 None
+        """
+        return None
+
+    def set(self, prop, value):
+        """兼容 VideoCapture.set，只处理分辨率"""
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.size = (int(value), self.size[1])
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.size = (self.size[0], int(value))
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.size[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.size[1])
+        return 0.0
+
+    def release(self):
+        pass
+
+
+class DeviceSource(FrameSource):
+    """摄像头设备"""
+
+    def __init__(self, device=0, size=(640, 480)):
+        super().__init__(size)
+        self.device = device
+        self.cap = cv2.VideoCapture(device)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.size[0])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.size[1])
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            self.index += 1
+        return ret, frame
+
+    def set(self, prop, value):
+        super().set(prop, value)
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """视频文件：每次 read() 顺序取下一帧，与播放速度无关，结果可复现"""
+
+    def __init__(self, path, size=(640, 480), loop=False):
+        super().__init__(size)
+        self.path = Path(path)
+        self.loop = loop
+        self.cap = cv2.VideoCapture(str(self.path))
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self.index > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if ret:
+            self.index += 1
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """图片目录：按文件名排序逐张读取"""
+
+    def __init__(self, path, size=(640, 480), loop=False):
+        super().__init__(size)
+        self.path = Path(path)
+        self.loop = loop
+        self.files = sorted(p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS) \
+            if self.path.is_dir() else []
+        self._next = 0
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def read(self):
+        if self._next >= len(self.files):
+            if not (self.loop and self.files):
+                return False, None
+            self._next = 0
+        frame = cv2.imread(str(self.files[self._next]), cv2.IMREAD_COLOR)
+        self._next += 1
+        if frame is None:
+            return False, None
+        self.index += 1
+        return True, frame
+
+
+class LandmarkStreamSource(FrameSource):
+    """
+    录制的关键点流（JSON Lines）
+    第一行是文件头 {"format": "zammi-landmarks", "size": [w, h], ...}，
+    之后每行一帧 {"pose": [[x, y, z, visibility], ...] 或 null, "hand": ...}
+    关键点坐标是游戏看到的画面（已镜像翻转）中的归一化坐标
+    """
+
+    provides_landmarks = True
+
+    def __init__(self, path, size=(640, 480), loop=False):
+        super().__init__(size)
+        self.path = Path(path)
+        self.loop = loop
+        self.records = []
+        self._current = {}
+        self._next = 0
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    record = json.loads(line)
+                    if record.get("format") == LANDMARK_FORMAT:
+                        continue
+                    self.records.append(record)
+        # 背景画面只生成一次，每帧返回副本（使用方会在帧上绘制）
+        self._blank = np.full((self.size[1], self.size[0], 3), 40, dtype=np.uint8)
+
+    def isOpened(self):
+        return bool(self.records)
+
+    def read(self):
+        if self._next >= len(self.records):
+            if not (self.loop and self.records):
+                return False, None
+            self._next = 0
+        self._current = self.records[self._next]
+        self._next += 1
+        self.index += 1
+        return True, self._blank.copy()
+
+    def landmarks(self, kind):
+        points = self._current.get(kind)
+        return LandmarkList(points) if points else None
+
+
+class SyntheticSource(FrameSource):
+    """合成画面：灰色背景上左右往返的色块，用于无摄像头环境的吞吐测试"""
+
+    def read(self):
+        width, height = self.size
+        frame = np.full((height, width, 3), 90, dtype=np.uint8)
+        span = max(1, width - width // 4)
+        offset = self.index * 8 % (2 * span)
+        x = offset if offset < span else 2 * span - offset
+        frame[height // 4: height * 3 // 4, x: x + width // 4] = (40, 160, 220)
+        self.index += 1
+        return True, frame
+
+
+class ReplaySource(FrameSource):
+    """输入回放时的帧源：关键点来自 input_replay 当前帧的录制"""
+
+    provides_landmarks = True
+
+    def __init__(self, size=(640, 480)):
+        super().__init__(size)
+        self._blank = np.full((self.size[1], self.size[0], 3), 40, dtype=np.uint8)
+
+    def read(self):
+        self.index += 1
+        return True, self._blank.copy()
+
+    def landmarks(self, kind):
+        import input_replay
+        points = input_replay.session.landmarks(kind)
+        return LandmarkList(points) if points else None
+
+
+def open_source(spec=None, size=(640, 480), loop=False):
+    """
+    根据描述字符串创建帧源
+
+    Args:
+        spec: 帧源描述（见模块说明）；为 None 时读取环境变量 ZAMMI_CAMERA，默认摄像头 0，
+              输入回放（input_replay）时使用录制的关键点
+        size: 期望的画面尺寸 (width, height)
+        loop: 文件类帧源读完后是否从头循环
+
+    Returns:
+        FrameSource 实例（调用方需检查 isOpened()）
+    """
+    if spec is None:
+        import input_replay
+        if input_replay.is_replaying():
+            return ReplaySource(size)
+        spec = os.environ.get(CAMERA_ENV, "0")
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int):
+        return DeviceSource(spec, size)
+    spec = str(spec).strip()
+    if spec.isdigit():
+        return DeviceSource(int(spec), size)
+    if spec.lower() == "synthetic":
+        return SyntheticSource(size)
+    path = Path(spec)
+    if path.is_dir():
+        return ImageDirSource(path, size, loop)
+    if path.suffix.lower() == ".jsonl":
+        return LandmarkStreamSource(path, size, loop)
+    return VideoFileSource(path, size, loop)
+
+
+def describe_source(source):
+    """帧源的简短描述，用于日志"""
+    if isinstance(source, DeviceSource):
+        return f"摄像头 {source.device}"
+    if isinstance(source, SyntheticSource):
+        return "合成画面"
+    if isinstance(source, ReplaySource):
+        return "输入回放"
+    return f"{type(source).__name__}({getattr(source, 'path', '')})"
+
+
+class LandmarkWriter:
+    """关键点流写入器"""
+
+    def __init__(self, path, size, kinds, source_desc=""):
+        self.file = open(path, "w", encoding="utf-8")
+        header = {"format": LANDMARK_FORMAT, "version": 1, "size": list(size),
+                  "kinds": list(kinds), "source": source_desc}
+        self.file.write(json.dumps(header, ensure_ascii=False) + "\n")
+        self.count = 0
+
+    def write(self, **landmarks):
+        """写入一帧，参数为 kind=LandmarkList 或点列表（None 表示该帧未检测到）"""
+        record = {}
+        for kind, value in landmarks.items():
+            record[kind] = value if value is None or isinstance(value, list) else landmarks_to_points(value)
+        self.file.write(json.dumps(record) + "\n")
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+def record_landmarks(kind, spec, out_path, frames=None, size=(640, 480)):
+    """
+    用 MediaPipe 识别帧源中的关键点并写成关键点流
+
+    Args:
+        kind: "pose"（与姿态挑战相同的配置）或 "hand"（与接苹果游戏相同的配置）
+        spec: 输入帧源描述
+        out_path: 输出 .jsonl 路径
+        frames: 最多录制的帧数，None 表示读到帧源结束
+        size: 识别前把画面缩放到的尺寸
+
+    Returns:
+        count: 写入的帧数
+    """
+    import mediapipe as mp
+
+    source = open_source(spec, size)
+    if not source.isOpened():
+        raise RuntimeError(f"无法打开帧源: {spec}")
+    if kind == "pose":
+        # 模型与游戏中相同（ZAMMI_POSE_MODEL > 轻量模型），录制的关键点流才能代表游戏中的识别结果
+        import gesture_engine
+        model = gesture_engine.create_pose(static_image_mode=False, smooth_landmarks=True,
+                                           min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    else:
+        model = mp.solutions.hands.Hands(model_complexity=0, min_detection_confidence=0.5,
+                                         min_tracking_confidence=0.5, max_num_hands=1)
+    writer = LandmarkWriter(out_path, size, [kind], describe_source(source))
+    try:
+        while frames is None or writer.count < frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            # 与游戏中一致：缩放、镜像后再识别
+            frame = cv2.flip(cv2.resize(frame, size), 1)
+            results = model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if kind == "pose":
+                writer.write(pose=results.pose_landmarks)
+            else:
+                hands = results.multi_hand_landmarks
+                writer.write(hand=hands[0] if hands else None)
+    finally:
+        writer.close()
+        source.release()
+        model.close()
+    return writer.count
+
+
+def write_pose_config_stream(pose_name, out_path, frames=60, lead_in=0, size=(1280, 720)):
+    """
+    把 pose_configs 中的目标姿势写成关键点流（用于测量挑战成功延迟）
+
+    Args:
+        pose_name: 姿势配置名
+        out_path: 输出 .jsonl 路径
+        frames: 目标姿势持续的帧数
+        lead_in: 开头没有人的帧数
+        size: 记录在文件头中的画面尺寸
+    """
+    import sys
+    giraffe_dir = str(Path(__file__).parent / "Giraffe_PANJIANI")
+    if giraffe_dir not in sys.path:
+        sys.path.insert(0, giraffe_dir)
+    from pose_configs import get_pose_landmarks
+
+    target = get_pose_landmarks(pose_name)
+    points = [[float(x), float(y), float(z), 1.0] for x, y, z in target]
+    writer = LandmarkWriter(out_path, size, ["pose"], f"pose_configs:{pose_name}")
+    try:
+        for _ in range(lead_in):
+            writer.write(pose=None)
+        for _ in range(frames):
+            writer.write(pose=points)
+    finally:
+        writer.close()
+    return writer.count
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="录制/生成关键点流")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="用 MediaPipe 从帧源录制关键点")
+    rec.add_argument("kind", choices=["pose", "hand"])
+    rec.add_argument("source", help="帧源描述（设备号、视频、图片目录）")
+    rec.add_argument("output")
+    rec.add_argument("--frames", type=int, default=None)
+    rec.add_argument("--size", default=None, help="识别尺寸 WxH，默认 pose 1280x720、hand 640x480")
+    cfg = sub.add_parser("pose-config", help="把 pose_configs 中的目标姿势写成关键点流")
+    cfg.add_argument("pose_name")
+    cfg.add_argument("output")
+    cfg.add_argument("--frames", type=int, default=60)
+    cfg.add_argument("--lead-in", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if args.size:
+            size = tuple(int(v) for v in args.size.lower().split("x"))
+        else:
+            size = (1280, 720) if args.kind == "pose" else (640, 480)
+        count = record_landmarks(args.kind, args.source, args.output, args.frames, size)
+    else:
+        count = write_pose_config_stream(args.pose_name, args.output, args.frames, args.lead_in)
+    print(f"✅ 已写入 {count} 帧: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
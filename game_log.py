@@ -0,0 +1,141 @@
+"""
+游戏日志
+基于 logging 的分级日志：主循环里只把日志记录放进有界队列，由后台线程写到控制台/文件，
+同一条消息（同一个格式模板）按时间限流，避免按住按键时每帧刷屏拖慢帧率
+
+环境变量：
+    ZAMMI_LOG_LEVEL   日志级别，默认 INFO（按键、关键点等逐帧调试信息是 DEBUG）
+    ZAMMI_LOG_FILE    同时写入的日志文件
+    ZAMMI_LOG_RATE    同一条消息的最小间隔秒数，默认 1.0，0 表示不限流
+
+用法：
+    log = game_log.get_logger("giraffe")
+    log.debug("按下A键: x从%s变为%s", old_x, x)      # 用 % 参数而不是 f-string，模板相同的消息才会被限流
+    log.info("关卡完成", extra={"rate": 0})          # 单条消息可以用 extra 覆盖限流间隔
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LEVEL_ENV = "ZAMMI_LOG_LEVEL"
+FILE_ENV = "ZAMMI_LOG_FILE"
+RATE_ENV = "ZAMMI_LOG_RATE"
+ROOT_NAME = "zammi"
+QUEUE_SIZE = 1000  # 队列满时丢弃新日志，主循环永远不等待
+
+_setup_lock = threading.Lock()
+_listener = None
+
+
+class RateLimitFilter(logging.Filter):
+    """同一格式模板的消息在 interval 秒内只输出一次，下次输出时附带被省略的条数"""
+
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self._last = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        interval = getattr(record, "rate", self.interval)
+        if interval <= 0:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _SuppressedFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f"（已省略 {suppressed} 条）"
+        return text
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """队列满时丢弃日志并计数，不阻塞调用线程"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _setup():
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        root = logging.getLogger(ROOT_NAME)
+        level = os.environ.get(LEVEL_ENV, "INFO").upper()
+        root.setLevel(getattr(logging, level, logging.INFO))
+        root.propagate = False
+
+        log_queue = queue.Queue(QUEUE_SIZE)
+        handler = _DroppingQueueHandler(log_queue)
+        handler.addFilter(RateLimitFilter(float(os.environ.get(RATE_ENV, "1.0"))))
+        # 在调用线程里只做格式化，写入由后台线程完成
+        handler.setFormatter(_SuppressedFormatter("%(message)s"))
+        root.addHandler(handler)
+
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter("%(message)s"))
+        sinks = [console]
+        log_file = os.environ.get(FILE_ENV)
+        if log_file:
+            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+            sinks.append(file_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *sinks)
+        _listener.start()
+        atexit.register(shutdown)
+
+
+def get_logger(name):
+    """
+    获取模块日志器
+
+    Args:
+        name: 模块/场景名，如 "main"、"giraffe"、"pose"
+
+    Returns:
+        logging.Logger
+    """
+    _setup()
+    return logging.getLogger(f"{ROOT_NAME}.{name}")
+
+
+def shutdown():
+    """把队列中剩余的日志写完并停止后台线程（进程退出时自动调用）"""
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+        for handler in logging.getLogger(ROOT_NAME).handlers:
+            if isinstance(handler, _DroppingQueueHandler) and handler.dropped:
+                print(f"⚠️ 日志队列已满，丢弃 {handler.dropped} 条日志")
@@ -0,0 +1,354 @@
+"""
+动态手势识别
+姿态挑战只比较单帧的相似度；挥手、拍手、跳跃这类动作要看一段时间内的变化。
+本模块把每帧的姿态关键点写入预先分配好的环形缓冲区，提取几个与体型、站位无关的特征，
+再用流式 DTW（子序列 DTW 的逐帧递推）与动作模板匹配：
+
+    - 每个模板只保留一列累计代价（长度 = 模板帧数），每来一帧按 DTW 递推更新一次，
+      不回看历史，每帧开销固定，与缓冲区长度、动作持续多久无关
+    - 任意起点开始的子序列都参与匹配，不需要切分动作的开始和结束
+    - 模板是动作最快时的样子，更慢的动作由 DTW 拉伸对齐
+
+特征（以两肩中点为原点、肩宽为单位）：
+    raised   较高的那只手腕比肩膀高多少（0～1，超过半个肩宽即为 1）
+    swing    较高的那只手腕相对手肘的左右偏移
+    hands    两手腕的距离
+    jump     臀部中点比平时（慢速滑动平均）高多少，以躯干长度为单位
+
+用法：
+    engine = gesture_engine.GestureEngine()
+    event = engine.update(pose_landmarks)        # "wave" / "clap" / "jump" / "none"；没有检测到人时传 None
+
+    gesture_engine.wait_for("wave", timeout=10)  # 打开摄像头，等到挥手或超时
+
+姿态挑战（PoseChallenge）中配置了 pose 手势的姿势（pose_configs 的 "gesture"）每帧把关键点送入本模块，
+做出该手势也算完成，如 RaiseHighWithOneHand 举手挥手
+
+环境变量：
+    ZAMMI_GESTURE_BACKEND   pose（默认，MediaPipe 关键点 + 本模块）
+                            motion（帧差运动能量，见 motion_gesture，只支持 wave / raise，适合跑不动推理的机器）
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import game_log
+
+WAVE = "wave"
+CLAP = "clap"
+JUMP = "jump"
+NONE = "none"
+
+BACKEND_ENV = "ZAMMI_GESTURE_BACKEND"
+# 环形缓冲区保留的帧数
+HISTORY = 90
+FEATURES = ("raised", "swing", "hands", "jump")
+# 平时臀部高度的滑动平均速率（跳跃的参照）
+HIP_BASELINE_RATE = 0.05
+
+log = game_log.get_logger("gesture")
+
+# MediaPipe Pose 关键点索引
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+
+def _phase(frames):
+    return np.linspace(0.0, 1.0, frames, dtype=np.float32)
+
+
+def _wave(frames):
+    """手举过肩膀，手腕绕手肘左右摆两个来回"""
+    t = _phase(frames)
+    return {"raised": np.ones_like(t), "swing": 0.4 * np.sin(2 * np.pi * 2 * t)}
+
+
+def _clap(frames):
+    """两手张开、合拢，拍两下"""
+    t = _phase(frames)
+    return {"hands": 0.6 + 0.6 * np.cos(2 * np.pi * 2 * t)}
+
+
+def _jump(frames):
+    """臀部上升再落回"""
+    t = _phase(frames)
+    return {"jump": 0.3 * np.sin(np.pi * t)}
+
+
+# 动作模板：生成函数、模板时长（秒，动作最快时）、各特征的权重（未列出的为 1）、
+# 匹配阈值（累计特征差除以模板帧数）
+TEMPLATES = {
+    WAVE: {"build": _wave, "seconds": 0.7, "weights": {"raised": 0.5}, "threshold": 0.18},
+    CLAP: {"build": _clap, "seconds": 0.8, "threshold": 0.25},
+    JUMP: {"build": _jump, "seconds": 0.5, "threshold": 0.1},
+}
+
+
+class LandmarkHistory:
+    """预先分配的关键点环形缓冲区：写入不分配内存，满了覆盖最旧的一帧"""
+
+    def __init__(self, capacity=HISTORY, points=33, features=len(FEATURES)):
+        self.capacity = capacity
+        self.points = np.zeros((capacity, points, 2), dtype=np.float32)
+        self.features = np.zeros((capacity, features), dtype=np.float32)
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.index = 0   # 下一帧写入的位置
+        self.count = 0
+
+    def push(self, points=None, features=None):
+        """
+        写入一帧
+
+        Args:
+            points: 关键点坐标 (N, 2)；没有检测到人时为 None
+            features: 该帧的特征向量
+        """
+        i = self.index
+        self.valid[i] = points is not None
+        if points is not None:
+            self.points[i] = points
+            self.features[i] = features
+        self.index = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self, n=None):
+        """
+        按时间顺序取出最近 n 帧（调试、绘制轨迹用，会复制数据）
+
+        Returns:
+            (points, features, valid)
+        """
+        n = self.count if n is None else min(n, self.count)
+        order = (self.index - n + np.arange(n)) % self.capacity
+        return self.points[order], self.features[order], self.valid[order]
+
+
+class StreamingDTW:
+    """
+    单个模板的流式子序列 DTW
+
+    D[i] 为以当前帧结尾、对齐到模板第 i 帧的最小累计代价，每来一帧：
+        D'[0] = d(0)                                 （任意一帧都可以作为动作的起点）
+        D'[i] = d(i) + min(D[i], D[i - 1])           （停在模板同一帧 / 前进一帧）
+    只允许输入比模板慢（不允许一帧跳过模板的多帧），所以模板要按动作最快时的节奏编写；
+    代价除以模板帧数而不是对齐路径长度，否则在模板首尾的静止段多停几帧就能把平均代价拉低
+    """
+
+    def __init__(self, name, template, features, weights, threshold):
+        """
+        Args:
+            name: 动作名称
+            template: 模板特征 (m, k)
+            features: 模板使用的特征在特征向量中的下标（k 个）
+            weights: 各特征的权重（k 个）
+            threshold: 匹配阈值（累计特征差 / 模板帧数）
+        """
+        self.name = name
+        self.template = template
+        self.columns = np.asarray(features)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.threshold = threshold
+        self._cost = np.full(len(template), np.inf, dtype=np.float32)
+        self.score = np.inf   # 以当前帧结束、完整走完模板的代价
+
+    def reset(self):
+        self._cost.fill(np.inf)
+        self.score = np.inf
+
+    def update(self, features):
+        """
+        送入一帧特征
+
+        Returns:
+            bool: 是否刚好完成一次匹配（匹配后清空，同一个动作只报告一次）
+        """
+        distance = np.abs(self.template - features[self.columns]) @ self.weights
+        # 从模板前一帧前进（对角）或停在同一帧（水平），取代价更小的一条
+        best = np.minimum(self._cost, np.concatenate(([np.inf], self._cost[:-1])))
+        best[0] = 0.0
+        self._cost = best + distance
+        self.score = float(self._cost[-1]) / len(self._cost)
+        if self.score <= self.threshold:
+            self.reset()
+            return True
+        return False
+
+
+def pose_features(points, hip_baseline=None):
+    """
+    从一帧关键点提取特征
+
+    Args:
+        points: 归一化坐标 (33, 2)
+        hip_baseline: 平时的臀部高度（None 时取当前帧）
+
+    Returns:
+        (features, hip_y)
+    """
+    shoulders = (points[LEFT_SHOULDER] + points[RIGHT_SHOULDER]) / 2
+    width = max(float(np.linalg.norm(points[LEFT_SHOULDER] - points[RIGHT_SHOULDER])), 1e-3)
+    left_up = (shoulders[1] - points[LEFT_WRIST][1]) / width
+    right_up = (shoulders[1] - points[RIGHT_WRIST][1]) / width
+    if left_up >= right_up:
+        up, swing = left_up, (points[LEFT_WRIST][0] - points[LEFT_ELBOW][0]) / width
+    else:
+        up, swing = right_up, (points[RIGHT_WRIST][0] - points[RIGHT_ELBOW][0]) / width
+    hands = float(np.linalg.norm(points[LEFT_WRIST] - points[RIGHT_WRIST])) / width
+
+    hip_y = float(points[LEFT_HIP][1] + points[RIGHT_HIP][1]) / 2
+    torso = max(hip_y - float(shoulders[1]), 1e-3)
+    baseline = hip_y if hip_baseline is None else hip_baseline
+    features = np.array([min(max(up / 0.5, 0.0), 1.0), swing, min(hands, 1.5), (baseline - hip_y) / torso],
+                        dtype=np.float32)
+    return features, hip_y
+
+
+class GestureEngine:
+    """关键点历史 + 多模板流式匹配"""
+
+    def __init__(self, gestures=None, fps=30, history=HISTORY):
+        """
+        Args:
+            gestures: 要识别的动作名称列表，默认 TEMPLATES 中的全部
+            fps: 关键点的帧率，用于把模板时长换算成帧数
+            history: 环形缓冲区保留的帧数
+        """
+        self.history = LandmarkHistory(history)
+        self.matchers = []
+        for name in gestures or TEMPLATES:
+            spec = TEMPLATES[name]
+            curves = spec["build"](max(4, round(spec["seconds"] * fps)))
+            columns = [FEATURES.index(key) for key in curves]
+            weights = [spec.get("weights", {}).get(key, 1.0) for key in curves]
+            template = np.stack([curves[key] for key in curves], axis=1)
+            self.matchers.append(StreamingDTW(name, template, columns, weights, spec["threshold"]))
+        self._hip_baseline = None
+
+    @property
+    def scores(self):
+        """各模板当前的平均代价（越小越接近，调试显示用）"""
+        return {m.name: m.score for m in self.matchers}
+
+    def reset(self):
+        for matcher in self.matchers:
+            matcher.reset()
+        self._hip_baseline = None
+
+    def update(self, landmarks):
+        """
+        送入一帧姿态关键点
+
+        Args:
+            landmarks: MediaPipe 的 pose_landmarks（或 frame_source.LandmarkList）；没有检测到人时为 None
+
+        Returns:
+            event: 刚完成的动作名称，没有时为 NONE
+        """
+        if landmarks is None:
+            # 人离开画面，正在进行的匹配作废
+            self.history.push(None)
+            self.reset()
+            return NONE
+        points = np.array([(lm.x, lm.y) for lm in landmarks.landmark], dtype=np.float32)
+        features, hip_y = pose_features(points, self._hip_baseline)
+        if self._hip_baseline is None:
+            self._hip_baseline = hip_y
+        else:
+            self._hip_baseline += (hip_y - self._hip_baseline) * HIP_BASELINE_RATE
+        self.history.push(points, features)
+
+        event = NONE
+        for matcher in self.matchers:
+            if matcher.update(features) and event == NONE:
+                event = matcher.name
+        return event
+
+
+def backend():
+    """当前的手势识别方式（无效值按 pose 处理）"""
+    name = os.environ.get(BACKEND_ENV, "pose").strip().lower()
+    return name if name in ("pose", "motion") else "pose"
+
+
+def create_pose(**options):
+    """
+    创建 MediaPipe Pose，模型与姿态挑战相同（pose_configs.get_model_complexity：ZAMMI_POSE_MODEL > 轻量模型）；
+    轻量 / 高精度模型第一次使用时需要下载，失败（如离线）时退回完整模型
+
+    Args:
+        options: 传给 mp.solutions.pose.Pose 的其他参数
+
+    Returns:
+        mp.solutions.pose.Pose
+    """
+    import mediapipe as mp
+    giraffe_dir = str(Path(__file__).parent / "Giraffe_PANJIANI")
+    if giraffe_dir not in sys.path:
+        sys.path.insert(0, giraffe_dir)
+    from pose_configs import get_model_complexity
+
+    complexity = get_model_complexity()
+    try:
+        return mp.solutions.pose.Pose(model_complexity=complexity, **options)
+    except Exception as e:
+        if complexity == 1:
+            raise
+        log.warning("⚠️ 无法加载 model_complexity=%d 的姿态模型（%s），改用完整模型", complexity, e)
+        return mp.solutions.pose.Pose(model_complexity=1, **options)
+
+
+def wait_for(gesture=WAVE, timeout=10.0, source=None):
+    """
+    打开帧源，等到指定动作或超时
+
+    Args:
+        gesture: WAVE / CLAP / JUMP（motion 方式下为 motion_gesture 的 WAVE / RAISE）
+        timeout: 最长等待秒数
+        source: 帧源描述（见 frame_source.open_source），None 时使用 ZAMMI_CAMERA 或摄像头 0
+
+    Returns:
+        bool: 是否在超时前检测到动作
+    """
+    import motion_gesture
+    if backend() == "motion" and gesture in (motion_gesture.WAVE, motion_gesture.RAISE):
+        return motion_gesture.wait_for(gesture, timeout, source)
+
+    import cv2
+    from frame_source import open_source, describe_source
+    from presence_gate import PresenceGate
+    cap = open_source(source)
+    if not cap.isOpened():
+        log.error("❌ 无法打开帧源: %s", describe_source(cap))
+        return False
+    pose = None
+    if not cap.provides_landmarks:
+        pose = create_pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    gate = PresenceGate("gesture")
+    engine = GestureEngine([gesture])
+    deadline = time.perf_counter() + timeout
+    try:
+        while time.perf_counter() < deadline:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if pose is None:
+                landmarks = cap.landmarks("pose")
+            elif gate.check(frame):
+                landmarks = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).pose_landmarks
+                gate.report(landmarks is not None)
+            else:
+                landmarks = None
+            if engine.update(landmarks) == gesture:
+                log.info("👋 检测到动作: %s", gesture)
+                return True
+    finally:
+        cap.release()
+        if pose is not None:
+            pose.close()
+            gate.print_summary()
+    return False
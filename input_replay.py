@@ -0,0 +1,312 @@
+"""
+输入录制与回放
+场景主循环通过这里读取事件、按键状态和帧间隔，录制时逐帧写入会话目录，回放时逐帧还原，
+摄像头识别出的关键点也一起录制，回放时不需要摄像头和 MediaPipe
+
+用法（环境变量会被场景切换启动的子进程继承，整局游戏录在同一个会话目录里）：
+    ZAMMI_INPUT_RECORD=sessions/run1 python Zammis-Delivery/main.py
+    ZAMMI_INPUT_REPLAY=sessions/run1 python Zammis-Delivery/main.py
+    ZAMMI_INPUT_REPLAY_FAST=1          回放时不等待帧间隔，尽快运行（用于基准）
+
+会话目录内容：
+    session.txt               场景启动顺序（每行一个录制文件名）
+    <场景>.<序号>.jsonl.gz    每个场景进程一个文件，第一行是文件头，之后每行一帧
+"""
+import atexit
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pygame
+
+import game_log
+
+RECORD_ENV = "ZAMMI_INPUT_RECORD"
+REPLAY_ENV = "ZAMMI_INPUT_REPLAY"
+FAST_ENV = "ZAMMI_INPUT_REPLAY_FAST"
+# 回放时记录已被哪些进程认领的目录，由第一个回放进程创建并传给子进程
+CLAIMS_ENV = "ZAMMI_INPUT_REPLAY_CLAIMS"
+INPUT_FORMAT = "zammi-input"
+MANIFEST_NAME = "session.txt"
+
+log = game_log.get_logger("replay")
+
+# 录制的事件类型及其属性
+EVENT_FIELDS = {
+    pygame.QUIT: (),
+    pygame.KEYDOWN: ("key", "mod", "unicode", "scancode"),
+    pygame.KEYUP: ("key", "mod", "unicode", "scancode"),
+    pygame.MOUSEBUTTONDOWN: ("pos", "button"),
+    pygame.MOUSEBUTTONUP: ("pos", "button"),
+}
+
+
+def _claim(path):
+    """原子地创建文件，成功返回 True（文件已存在返回 False）"""
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+        return True
+    except FileExistsError:
+        return False
+
+
+def _serialize_event(event):
+    fields = EVENT_FIELDS.get(event.type)
+    if fields is None:
+        return None
+    data = {}
+    for name in fields:
+        value = getattr(event, name, None)
+        if value is not None:
+            data[name] = list(value) if isinstance(value, tuple) else value
+    return [event.type, data] if data else [event.type]
+
+
+def _deserialize_event(item):
+    data = dict(item[1]) if len(item) > 1 else {}
+    if "pos" in data:
+        data["pos"] = tuple(data["pos"])
+    return pygame.event.Event(item[0], **data)
+
+
+class InputSession:
+    """当前进程的输入层：直通、录制或回放"""
+
+    def __init__(self):
+        self.mode = None      # None（直通）、"record" 或 "replay"
+        self.scene = None
+        self.path = None
+        self.tick_index = -1
+        self._started = False
+        self._file = None
+        self._record = None   # 当前帧的记录
+        self._last_keys = None
+        self._keys = None     # 当前帧的按键状态（缓存，一帧内多次读取结果一致）
+        self._records = []
+        self._fast = False
+
+    # ------------------------------------------------------------------
+    # 启动
+    # ------------------------------------------------------------------
+
+    def begin_scene(self, scene=None):
+        """
+        确定当前进程的场景名并打开录制/回放文件（第一次读取事件时会自动调用）
+
+        Args:
+            scene: 场景名，默认为启动脚本的文件名
+        """
+        if self._started:
+            return
+        self._started = True
+        self.scene = scene or Path(sys.argv[0]).stem or "scene"
+        record_dir = os.environ.get(RECORD_ENV)
+        replay_dir = os.environ.get(REPLAY_ENV)
+        if replay_dir:
+            self._open_replay(Path(replay_dir))
+        elif record_dir:
+            self._open_record(Path(record_dir))
+
+    def _open_record(self, session_dir):
+        session_dir.mkdir(parents=True, exist_ok=True)
+        n = 0
+        while not _claim(session_dir / f"{self.scene}.{n}.jsonl.gz"):
+            n += 1
+        self.path = session_dir / f"{self.scene}.{n}.jsonl.gz"
+        with open(session_dir / MANIFEST_NAME, "a", encoding="utf-8") as f:
+            f.write(self.path.name + "\n")
+
+        seed = int(time.time() * 1000) & 0xFFFFFFFF
+        random.seed(seed)
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        header = {"format": INPUT_FORMAT, "version": 1, "scene": self.scene, "seed": seed,
+                  "pygame": pygame.version.ver}
+        self._file.write(json.dumps(header) + "\n")
+        self.mode = "record"
+        # 场景切换时进程直接结束，退出时补写最后一帧
+        atexit.register(self.close)
+        log.info("⏺️ 录制输入: %s", self.path)
+
+    def _open_replay(self, session_dir):
+        claims = os.environ.get(CLAIMS_ENV)
+        if not claims:
+            claims = tempfile.mkdtemp(prefix="zammi-replay-")
+            os.environ[CLAIMS_ENV] = claims
+        n = 0
+        while (session_dir / f"{self.scene}.{n}.jsonl.gz").exists():
+            if _claim(Path(claims) / f"{self.scene}.{n}"):
+                break
+            n += 1
+        else:
+            log.warning("⚠️ 会话 %s 中没有可回放的 %s 录制，使用实时输入", session_dir, self.scene)
+            return
+
+        self.path = session_dir / f"{self.scene}.{n}.jsonl.gz"
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        header = lines[0] if lines and lines[0].get("format") == INPUT_FORMAT else {}
+        self._records = lines[1:] if header else lines
+        random.seed(header.get("seed", 0))
+        self._fast = os.environ.get(FAST_ENV, "") not in ("", "0")
+        self.mode = "replay"
+        log.info("▶️ 回放输入: %s（%d 帧）", self.path, len(self._records))
+
+    # ------------------------------------------------------------------
+    # 每帧输入
+    # ------------------------------------------------------------------
+
+    def events(self):
+        """
+        读取本帧事件（替代 pygame.event.get()，主循环每帧开始时调用一次）
+
+        Returns:
+            events: 事件列表
+        """
+        self.begin_scene()
+        self.tick_index += 1
+        self._keys = None
+        if self.mode == "replay":
+            # 真实事件队列仍需清空，否则窗口会被系统判定为无响应
+            pygame.event.pump()
+            pygame.event.clear()
+            if self.tick_index >= len(self._records):
+                return [pygame.event.Event(pygame.QUIT)]
+            self._record = self._records[self.tick_index]
+            return [_deserialize_event(item) for item in self._record.get("e", ())]
+
+        events = pygame.event.get()
+        if self.mode == "record":
+            self._flush()
+            self._record = {}
+            recorded = [item for item in map(_serialize_event, events) if item is not None]
+            if recorded:
+                self._record["e"] = recorded
+        return events
+
+    def pressed(self):
+        """
+        读取本帧按键状态（替代 pygame.key.get_pressed()）
+
+        Returns:
+            keys: 与 pygame.key.get_pressed() 相同类型的按键状态
+        """
+        if self._keys is not None:
+            return self._keys
+        if self.mode == "replay":
+            if self._record is not None and "k" in self._record:
+                self._last_keys = self._record["k"]
+            state = [False] * len(pygame.key.get_pressed())
+            for scancode in self._last_keys or ():
+                state[scancode] = True
+            self._keys = pygame.key.ScancodeWrapper(state)
+            return self._keys
+
+        self._keys = pygame.key.get_pressed()
+        if self.mode == "record" and self._record is not None:
+            # 只在按键状态变化的帧写入
+            down = [i for i, v in enumerate(self._keys) if v]
+            if down != self._last_keys:
+                self._record["k"] = down
+                self._last_keys = down
+        return self._keys
+
+    def record_dt(self, dt):
+        if self.mode == "record" and self._record is not None:
+            self._record["dt"] = dt
+
+    def replay_dt(self, default):
+        if self.mode == "replay" and self._record is not None:
+            return self._record.get("dt", default)
+        return default
+
+    # ------------------------------------------------------------------
+    # 关键点
+    # ------------------------------------------------------------------
+
+    def record_landmarks(self, kind, landmark_list):
+        """
+        录制本帧识别出的关键点
+
+        Args:
+            kind: "pose" 或 "hand"
+            landmark_list: MediaPipe 关键点列表，未检测到时为 None
+        """
+        if self.mode != "record" or self._record is None:
+            return
+        from frame_source import landmarks_to_points
+        self._record.setdefault("lm", {})[kind] = landmarks_to_points(landmark_list)
+
+    def landmarks(self, kind):
+        """回放时返回本帧录制的关键点点列表（没有则为 None）"""
+        if self._record is None:
+            return None
+        return self._record.get("lm", {}).get(kind)
+
+    def _flush(self):
+        if self._file is not None and self._record is not None:
+            self._file.write(json.dumps(self._record, separators=(",", ":")) + "\n")
+            self._record = None
+
+    def close(self):
+        """结束录制，写入最后一帧"""
+        if self.mode == "record" and self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+            log.info("⏹️ 输入录制完成: %s（%d 帧）", self.path, self.tick_index + 1)
+
+
+class Clock:
+    """
+    替代 pygame.time.Clock：录制时记录每帧间隔，回放时返回录制的间隔，
+    保证依赖 clock.get_time() 的动画在回放中逐帧一致
+    """
+
+    def __init__(self):
+        self._clock = pygame.time.Clock()
+        self._dt = 0
+
+    def tick(self, framerate=0):
+        return self._advance(self._clock.tick, framerate)
+
+    def tick_busy_loop(self, framerate=0):
+        """与 tick 相同，但用忙等代替睡眠，帧间隔更准"""
+        return self._advance(self._clock.tick_busy_loop, framerate)
+
+    def _advance(self, tick, framerate):
+        if session.mode == "replay":
+            if not session._fast:
+                tick(framerate)
+            self._dt = session.replay_dt(self._dt)
+        else:
+            self._dt = tick(framerate)
+            session.record_dt(self._dt)
+        return self._dt
+
+    def get_time(self):
+        return self._dt
+
+    def get_fps(self):
+        return self._clock.get_fps()
+
+
+# 全局实例，每个场景进程一个
+session = InputSession()
+begin_scene = session.begin_scene
+events = session.events
+pressed = session.pressed
+record_landmarks = session.record_landmarks
+
+
+def is_replaying():
+    session.begin_scene()
+    return session.mode == "replay"
+
+
+def close():
+    session.close()
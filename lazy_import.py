@@ -0,0 +1,152 @@
+"""
+延迟导入与启动计时
+cv2、mediapipe 等重量级模块导入要几百毫秒到一秒以上，场景启动时并不需要它们：
+用 lazy() 得到一个代理，第一次访问属性时才真正导入；或用 schedule_preload() 登记，
+在第一帧显示之后由后台线程预先导入，等真正用到时已经导入完成
+
+场景脚本应尽早 import 本模块，启动计时从这里开始；主循环第一次 flip 之后调用 first_frame()，
+输出从启动到第一帧的耗时以及各重量级模块的导入耗时
+
+用法：
+    cv2 = lazy_import.lazy("cv2")
+    lazy_import.schedule_preload("video_player")
+    ...
+    pygame.display.flip()
+    lazy_import.first_frame()
+"""
+import importlib
+import sys
+import threading
+import time
+
+_started = time.perf_counter()
+
+# 日志模块放在计时起点之后导入，计入启动耗时
+import game_log
+
+log = game_log.get_logger("startup")
+_lock = threading.Lock()
+_imports = {}            # 模块名 -> {"ms": 导入耗时, "thread": 导入线程名}
+_pending_preload = []
+_first_frame_at = None
+
+
+def load(name):
+    """
+    导入模块并记录耗时（已导入的模块直接返回）
+
+    Args:
+        name: 模块名，如 "cv2"、"PIL.Image"
+
+    Returns:
+        module: 导入的模块
+    """
+    if _is_loaded(name):
+        return sys.modules[name]
+    # 其他线程正在导入时 import_module 会等待其完成，不会拿到只初始化了一半的模块；
+    # 这种情况下等待的时间不算作导入耗时
+    fresh = name not in sys.modules
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    if fresh:
+        ms = (time.perf_counter() - start) * 1000.0
+        with _lock:
+            _imports.setdefault(name, {"ms": ms, "thread": threading.current_thread().name})
+    return module
+
+
+def _is_loaded(name):
+    """模块已导入且初始化完成"""
+    module = sys.modules.get(name)
+    spec = getattr(module, "__spec__", None)
+    return module is not None and not getattr(spec, "_initializing", False)
+
+
+class LazyModule:
+    """模块代理：第一次访问属性时导入，之后把模块属性复制到自身，访问开销与普通模块相同"""
+
+    def __init__(self, name):
+        self.__dict__["_lazy_name"] = name
+
+    def __getattr__(self, attr):
+        module = load(self.__dict__["_lazy_name"])
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self.__dict__['_lazy_name']!r}>"
+
+
+def lazy(name):
+    """
+    返回延迟导入的模块代理
+
+    Args:
+        name: 模块名
+
+    Returns:
+        已导入时直接返回模块，否则返回 LazyModule
+    """
+    return sys.modules[name] if _is_loaded(name) else LazyModule(name)
+
+
+def preload(*names):
+    """
+    在后台线程依次导入模块
+
+    Returns:
+        thread: 后台线程
+    """
+    def worker():
+        start = time.perf_counter()
+        for name in names:
+            try:
+                load(name)
+            except Exception as e:
+                # 预加载失败不影响游戏，真正用到时会在主线程再次导入并报错
+                log.warning("⚠️ 预加载 %s 失败: %s", name, e)
+        log.info("✅ 后台预加载完成: %s（%.0f ms）", "、".join(names), (time.perf_counter() - start) * 1000.0)
+
+    thread = threading.Thread(target=worker, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def schedule_preload(*names):
+    """登记第一帧显示之后在后台导入的模块"""
+    _pending_preload.extend(names)
+
+
+def first_frame():
+    """主循环每次 flip 之后调用：只在第一次调用时输出启动报告并开始后台预加载"""
+    global _first_frame_at
+    if _first_frame_at is not None:
+        return
+    _first_frame_at = time.perf_counter()
+    _print_report()
+    if _pending_preload:
+        preload(*_pending_preload)
+        _pending_preload.clear()
+
+
+def startup_report():
+    """
+    启动耗时数据
+
+    Returns:
+        dict: first_frame_ms（从导入本模块到第一帧）、first_frame_at（perf_counter 时间）、imports
+    """
+    with _lock:
+        imports = {name: dict(info) for name, info in _imports.items()}
+    first_ms = None if _first_frame_at is None else (_first_frame_at - _started) * 1000.0
+    return {"first_frame_ms": first_ms, "first_frame_at": _first_frame_at, "imports": imports}
+
+
+def _print_report():
+    report = startup_report()
+    line = f"⏱️ 启动到第一帧: {report['first_frame_ms']:.0f} ms"
+    if report["imports"]:
+        line += "，已导入: " + "、".join(f"{name} {info['ms']:.0f} ms" for name, info in report["imports"].items())
+    if _pending_preload:
+        line += "，后台预加载: " + "、".join(_pending_preload)
+    log.info("%s", line, extra={"rate": 0})
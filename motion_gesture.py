@@ -0,0 +1,265 @@
+"""
+运动能量手势检测
+不做姿态推理，只比较相邻两帧缩小后的灰度图：变化的像素就是"在动的地方"。
+按区域统计运动能量和运动重心，识别两种大幅动作：
+
+    wave    挥手：画面上半部分的运动重心在短时间内左右来回（默认 3 次换向）
+    raise   举手：运动重心从画面中下部向上移动，进入顶部区域后仍在运动（连续几帧）
+
+每帧先缩小到 80×60 再比较，640×480 的摄像头画面每帧远低于 1 毫秒，
+可以在配置较弱、跑不动 MediaPipe 的机器上代替完整的姿态识别，也可用于"有没有人在动"的粗略判断：
+ZAMMI_GESTURE_BACKEND=motion 时，姿态挑战中配置了 motion 手势的姿势（pose_configs 的 "gesture"）
+改用本模块判断，不做姿态推理
+
+用法：
+    detector = motion_gesture.MotionGesture()
+    ret, frame = cap.read()
+    event = detector.update(frame)           # "wave" / "raise" / "none"
+
+    motion_gesture.wait_for("wave", timeout=10)   # 打开摄像头，等到挥手或超时
+
+    python Zammis-Delivery/motion_gesture.py synthetic --frames 300   # 测试帧源上的事件和每帧耗时
+"""
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+import game_log
+
+WAVE = "wave"
+RAISE = "raise"
+NONE = "none"
+
+# 比较用的缩小尺寸
+SMALL_SIZE = (80, 60)
+# 灰度变化超过这个值的像素算作运动
+PIXEL_THRESHOLD = 25
+# 运动像素占区域的比例超过这个值才算有效运动（过滤噪声和光线闪烁）
+MIN_ENERGY = 0.01
+# 挥手：重心左右换向的次数、每次至少移动的距离（画面宽度的比例）、统计的时间窗口（秒）
+WAVE_REVERSALS = 3
+WAVE_MIN_SWING = 0.08
+WAVE_WINDOW = 1.5
+# 举手：重心至少上升的距离（画面高度的比例），并在顶部区域（上方 1/3）连续出现的帧数
+RAISE_MIN_RISE = 0.25
+RAISE_TOP = 1 / 3
+RAISE_HOLD_FRAMES = 3
+# 触发一次事件后的冷却时间（秒），避免同一个动作连续触发
+COOLDOWN = 1.0
+
+log = game_log.get_logger("gesture")
+
+
+def thumbnail(frame, size=SMALL_SIZE):
+    """
+    缩小成灰度小图（帧差、背景比较共用）
+
+    先隔行隔列抽取，再按面积平均缩小（每个小像素仍平均 2×2 个采样，压住摄像头噪声）；
+    640×480 直接 INTER_AREA 缩小约 0.6 毫秒，先抽取后约 0.2 毫秒
+
+    Args:
+        frame: BGR（或灰度）图像
+        size: 小图尺寸 (w, h)
+
+    Returns:
+        灰度小图（uint8，h×w）
+    """
+    step = max(1, min(frame.shape[1] // size[0], frame.shape[0] // size[1]) // 2)
+    small = cv2.resize(frame[::step, ::step], size, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small
+
+
+class MotionGesture:
+    """基于帧差的挥手 / 举手检测"""
+
+    def __init__(self, fps=30, size=SMALL_SIZE, threshold=PIXEL_THRESHOLD, min_energy=MIN_ENERGY):
+        """
+        Args:
+            fps: 帧率，用于把秒换算成帧数（按帧计算，文件帧源的结果可复现）
+            size: 比较用的缩小尺寸 (w, h)
+            threshold: 像素灰度变化阈值
+            min_energy: 有效运动的最小能量（运动像素比例）
+        """
+        self.fps = fps
+        self.size = tuple(size)
+        self.threshold = threshold
+        self.min_energy = min_energy
+        self.energy = 0.0        # 最近一帧整个画面的运动能量
+        self.centroid = None     # 最近一帧的运动重心 (x, y)，归一化坐标；没有有效运动时为 None
+        self._prev = None
+        self._upper = deque(maxlen=max(2, int(WAVE_WINDOW * fps)))   # 上半部分的重心 x
+        self._path = deque(maxlen=max(2, int(WAVE_WINDOW * fps)))    # 全画面的重心 y
+        self._top_frames = 0
+        self._cooldown = 0
+        # 归一化坐标网格，计算重心用
+        w, h = self.size
+        self._xs = (np.arange(w, dtype=np.float32) + 0.5) / w
+        self._ys = (np.arange(h, dtype=np.float32) + 0.5) / h
+
+    def reset(self):
+        """清空历史（换场景、重新开始挑战时调用）"""
+        self._prev = None
+        self._upper.clear()
+        self._path.clear()
+        self._top_frames = 0
+        self._cooldown = 0
+        self.energy = 0.0
+        self.centroid = None
+
+    def _motion(self, frame):
+        """缩小、转灰度，与上一帧比较，返回运动像素的掩码（第一帧返回 None）"""
+        small = thumbnail(frame, self.size)
+        prev, self._prev = self._prev, small
+        if prev is None:
+            return None
+        return cv2.absdiff(small, prev) > self.threshold
+
+    def _centroid(self, mask):
+        """运动像素的重心和能量"""
+        count = int(np.count_nonzero(mask))
+        energy = count / mask.size
+        if energy < self.min_energy:
+            return None, energy
+        x = float(mask.sum(axis=0) @ self._xs) / count
+        y = float(mask.sum(axis=1) @ self._ys[:mask.shape[0]]) / count
+        return (x, y), energy
+
+    def update(self, frame):
+        """
+        送入一帧画面
+
+        Args:
+            frame: BGR（或灰度）图像，尺寸不限
+
+        Returns:
+            event: WAVE / RAISE / NONE
+        """
+        mask = self._motion(frame)
+        if mask is None:
+            return NONE
+        self.centroid, self.energy = self._centroid(mask)
+        if self._cooldown:
+            self._cooldown -= 1
+            return NONE
+
+        half = mask.shape[0] // 2
+        upper, _ = self._centroid(mask[:half])
+        self._upper.append(upper[0] if upper else None)
+        self._path.append(self.centroid[1] if self.centroid else None)
+
+        event = NONE
+        if self._is_wave():
+            event = WAVE
+        elif self._is_raise():
+            event = RAISE
+        if event != NONE:
+            self._upper.clear()
+            self._path.clear()
+            self._top_frames = 0
+            self._cooldown = int(COOLDOWN * self.fps)
+        return event
+
+    def _is_wave(self):
+        """上半部分的重心 x 在窗口内来回换向足够多次"""
+        reversals = 0
+        direction = 0
+        anchor = None
+        for x in self._upper:
+            if x is None:
+                continue
+            if anchor is None:
+                anchor = x
+            elif direction and (x - anchor) * direction > 0:
+                # 沿原方向继续移动，转折点跟着延伸到最远处
+                anchor = x
+            elif abs(x - anchor) >= WAVE_MIN_SWING:
+                # 离开转折点足够远才算一次摆动，小幅抖动不计
+                step = 1 if x > anchor else -1
+                if direction and step != direction:
+                    reversals += 1
+                direction = step
+                anchor = x
+        return reversals >= WAVE_REVERSALS
+
+    def _is_raise(self):
+        """重心从中下部上升，连续几帧在顶部区域检测到运动"""
+        y = self._path[-1] if self._path else None
+        if y is None or y > RAISE_TOP:
+            self._top_frames = 0
+            return False
+        self._top_frames += 1
+        lowest = max((v for v in self._path if v is not None), default=y)
+        return self._top_frames >= RAISE_HOLD_FRAMES and lowest - y >= RAISE_MIN_RISE
+
+
+def wait_for(gesture=WAVE, timeout=10.0, source=None):
+    """
+    打开帧源，等到指定动作或超时
+
+    Args:
+        gesture: WAVE 或 RAISE
+        timeout: 最长等待秒数
+        source: 帧源描述（见 frame_source.open_source），None 时使用 ZAMMI_CAMERA 或摄像头 0
+
+    Returns:
+        bool: 是否在超时前检测到动作
+    """
+    from frame_source import open_source, describe_source
+    cap = open_source(source)
+    if not cap.isOpened():
+        log.error("❌ 无法打开帧源: %s", describe_source(cap))
+        return False
+    detector = MotionGesture()
+    deadline = time.perf_counter() + timeout
+    try:
+        while time.perf_counter() < deadline:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if detector.update(frame) == gesture:
+                log.info("👋 检测到动作: %s", gesture)
+                return True
+    finally:
+        cap.release()
+    return False
+
+
+def main():
+    import argparse
+    from frame_source import open_source, describe_source
+
+    parser = argparse.ArgumentParser(description="在帧源上运行运动能量手势检测，输出事件和每帧耗时")
+    parser.add_argument("source", nargs="?", default=None, help="帧源描述，默认 ZAMMI_CAMERA 或摄像头 0")
+    parser.add_argument("--frames", type=int, default=300, help="处理的帧数")
+    parser.add_argument("--fps", type=float, default=30, help="帧源的帧率")
+    args = parser.parse_args()
+
+    cap = open_source(args.source)
+    if not cap.isOpened():
+        print(f"❌ 无法打开帧源: {describe_source(cap)}")
+        return 1
+    detector = MotionGesture(fps=args.fps)
+    costs = []
+    for i in range(args.frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        started = time.perf_counter()
+        event = detector.update(frame)
+        costs.append((time.perf_counter() - started) * 1000)
+        if event != NONE:
+            print(f"  第 {i} 帧: {event}")
+    cap.release()
+    if costs:
+        costs.sort()
+        print(f"📊 {describe_source(cap)}: {len(costs)} 帧，每帧平均 {sum(costs) / len(costs):.3f} ms，"
+              f"p95 {costs[int(len(costs) * 0.95) - 1]:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+"""
+有人检测门控
+PoseChallenge 和 HandTracker 每帧都跑一次 MediaPipe 推理（几十毫秒），哪怕摄像头前是空房间。
+推理之前先用缩略图做一次背景差分（不到 1 毫秒）：画面和背景没有明显差别时跳过推理，当作没有检测到人；
+有人走进画面的第一帧前景就会超过阈值，同一帧立即恢复推理
+
+    - 背景：64×48 灰度缩略图的滑动平均，只在判断为没有人时更新，站着不动的人不会被学进背景
+    - 推理检测到人时门保持打开，不看前景（人可能站着不动，和背景差别不大）
+    - 前景一直很多但推理连续几帧都没有检测到人（如灯光变化、窗帘晃动），背景加快学习，门随之关闭
+    - 关闭期间每隔 PROBE_EVERY 帧仍推理一次，兜底背景里本来就有人的情况（开机时人已站在摄像头前）
+
+环境变量：
+    ZAMMI_PRESENCE_GATE   on（默认） / off（每帧都推理，与原来相同）
+
+用法：
+    gate = presence_gate.PresenceGate("pose")
+    if gate.check(frame):
+        started = time.perf_counter()
+        landmarks = pose.process(rgb).pose_landmarks
+        gate.report(landmarks is not None, (time.perf_counter() - started) * 1000)
+    else:
+        landmarks = None
+    ...
+    gate.print_summary()                          # 跳过的帧数和估计节省的 CPU 时间
+
+    python Zammis-Delivery/presence_gate.py synthetic --frames 300 --kind pose   # 在帧源上对比开关门控的推理耗时
+"""
+import os
+import time
+
+import cv2
+import numpy as np
+
+import frame_profiler
+import game_log
+from motion_gesture import thumbnail
+
+GATE_ENV = "ZAMMI_PRESENCE_GATE"
+THUMB_SIZE = (64, 48)
+# 灰度和背景相差超过这个值的像素算作前景
+PIXEL_THRESHOLD = 30
+# 前景像素比例超过这个值判断为有人
+MIN_FOREGROUND = 0.03
+# 背景学习速率：没有人时缓慢跟随光线变化；前景多但推理一直没有检测到人时加快
+LEARN_RATE = 0.05
+FAST_LEARN_RATE = 0.25
+# 推理连续多少帧没有检测到人后不再强制保持打开 / 开始加快学习背景
+MISS_FRAMES = 15
+# 前景连续少于阈值多少帧后才关闭（打开只需一帧，关闭时留余量，避免在阈值附近来回切换）
+CLOSE_FRAMES = 30
+# 门关闭时每隔多少帧兜底推理一次
+PROBE_EVERY = 30
+
+log = game_log.get_logger("presence")
+
+
+def enabled():
+    """是否启用门控（ZAMMI_PRESENCE_GATE=off 关闭）"""
+    return os.environ.get(GATE_ENV, "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+class PresenceGate:
+    """推理前的背景差分门控"""
+
+    def __init__(self, name="camera", size=THUMB_SIZE, threshold=PIXEL_THRESHOLD, min_foreground=MIN_FOREGROUND):
+        """
+        Args:
+            name: 名称，用于日志（如 "pose"、"hand"）
+            size: 缩略图尺寸 (w, h)
+            threshold: 像素灰度差阈值
+            min_foreground: 判断为有人的最小前景比例
+        """
+        self.name = name
+        self.size = tuple(size)
+        self.threshold = threshold
+        self.min_foreground = min_foreground
+        self.enabled = enabled()
+        self.foreground = 0.0     # 最近一帧的前景比例
+        self.present = True       # 最近一帧是否判断为有人（前景多或推理检测到人）
+        self._background = None
+        self._misses = MISS_FRAMES  # 推理连续没有检测到人的帧数（开始时视为没有人）
+        self._false_alarms = 0      # 前景多、推理却没有检测到人的连续帧数
+        self._moving = False
+        self._quiet = CLOSE_FRAMES  # 前景连续少于阈值的帧数
+        self._since_probe = 0
+        # 统计
+        self.frames = 0
+        self.skipped = 0
+        self.gate_ms = 0.0
+        self.inference_ms = 0.0
+        self.inferred = 0
+
+    def check(self, frame):
+        """
+        判断这一帧是否需要推理
+
+        Args:
+            frame: BGR 图像（推理用的同一帧）
+
+        Returns:
+            bool: True 时照常推理，之后调用 report()；False 时跳过推理，当作没有检测到人
+        """
+        self.frames += 1
+        if not self.enabled:
+            return True
+        started = time.perf_counter()
+        small = thumbnail(frame, self.size).astype(np.float32)
+        if self._background is None:
+            # 第一帧作为背景，照常推理一次（兜底开机时已有人的情况）
+            self._background = small
+            self._since_probe = PROBE_EVERY
+            foreground = 0.0
+        else:
+            foreground = float(np.count_nonzero(cv2.absdiff(small, self._background) > self.threshold)) / small.size
+        self.foreground = foreground
+
+        tracking = self._misses < MISS_FRAMES
+        moving = self._moving = foreground >= self.min_foreground
+        # 推理没有检测到人时才更新背景：前景少时缓慢跟随光线，
+        # 前景多但推理一直没有人（光线突变等）时加快学习；刚走进来的人（前景多）不学进背景
+        if not tracking and not moving:
+            cv2.accumulateWeighted(small, self._background, LEARN_RATE)
+        elif not tracking and self._false_alarms >= MISS_FRAMES:
+            cv2.accumulateWeighted(small, self._background, FAST_LEARN_RATE)
+
+        self._quiet = 0 if moving else self._quiet + 1
+        active = tracking or self._quiet < CLOSE_FRAMES
+        if active != self.present:
+            self.present = active
+            if active:
+                log.info("🧍 %s: 画面中出现前景（%.1f%%），恢复推理", self.name, foreground * 100)
+            else:
+                log.info("🫥 %s: 画面中没有人，暂停推理", self.name)
+        self._since_probe += 1
+        run = active or self._since_probe >= PROBE_EVERY
+        if run:
+            self._since_probe = 0
+        else:
+            self.skipped += 1
+        elapsed = (time.perf_counter() - started) * 1000
+        self.gate_ms += elapsed
+        frame_profiler.profiler.add_section("presence", elapsed)
+        return run
+
+    def report(self, found, inference_ms=None):
+        """
+        告知本帧推理结果
+
+        Args:
+            found: 是否检测到人（关键点不为空）
+            inference_ms: 本帧推理耗时（毫秒），用于估计节省的 CPU 时间
+        """
+        self._misses = 0 if found else self._misses + 1
+        self._false_alarms = self._false_alarms + 1 if self._moving and not found else 0
+        if inference_ms is not None:
+            self.inference_ms += inference_ms
+            self.inferred += 1
+
+    def saved_ms(self):
+        """按平均推理耗时估计跳过的帧节省的时间（毫秒），扣除门控本身的开销"""
+        if not self.inferred:
+            return 0.0
+        return self.skipped * self.inference_ms / self.inferred - self.gate_ms
+
+    def print_summary(self):
+        """打印跳过的帧数和估计节省的 CPU 时间"""
+        if not self.frames:
+            return
+        if not self.enabled:
+            log.info("📊 %s: 门控已关闭（%s=off），%d 帧全部推理", self.name, GATE_ENV, self.frames, extra={"rate": 0})
+            return
+        average = self.inference_ms / self.inferred if self.inferred else 0.0
+        log.info("📊 %s: %d 帧，跳过推理 %d 帧（%.0f%%），推理平均 %.1f ms，门控平均 %.2f ms，估计节省 %.1f 秒 CPU",
+                 self.name, self.frames, self.skipped, self.skipped / self.frames * 100, average,
+                 self.gate_ms / self.frames, self.saved_ms() / 1000, extra={"rate": 0})
+
+
+def _detector(kind):
+    """创建 MediaPipe 推理函数：frame(BGR) -> 是否检测到"""
+    import mediapipe as mp
+    if kind == "hand":
+        hands = mp.solutions.hands.Hands(model_complexity=0, max_num_hands=1)
+        return lambda rgb: bool(hands.process(rgb).multi_hand_landmarks)
+    from gesture_engine import create_pose
+    pose = create_pose()
+    return lambda rgb: pose.process(rgb).pose_landmarks is not None
+
+
+def main():
+    import argparse
+    from frame_source import open_source, describe_source
+
+    parser = argparse.ArgumentParser(description="在帧源上对比开关门控时的 MediaPipe 推理耗时")
+    parser.add_argument("source", nargs="?", default=None, help="帧源描述，默认 ZAMMI_CAMERA 或摄像头 0")
+    parser.add_argument("--frames", type=int, default=300, help="处理的帧数")
+    parser.add_argument("--kind", choices=("pose", "hand"), default="pose", help="推理类型")
+    args = parser.parse_args()
+
+    cap = open_source(args.source)
+    if not cap.isOpened():
+        print(f"❌ 无法打开帧源: {describe_source(cap)}")
+        return 1
+    detect = _detector(args.kind)
+    gate = PresenceGate(args.kind)
+    cpu_started = time.process_time()
+    for _ in range(args.frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if gate.check(frame):
+            started = time.perf_counter()
+            found = detect(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            gate.report(found, (time.perf_counter() - started) * 1000)
+    cap.release()
+    print(f"🧪 {describe_source(cap)}，{GATE_ENV}={'on' if gate.enabled else 'off'}，"
+          f"进程 CPU 时间 {time.process_time() - cpu_started:.2f} 秒")
+    gate.print_summary()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
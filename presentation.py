@@ -0,0 +1,74 @@
+"""
+画面输出
+场景始终按固定的逻辑分辨率绘制（行走场景为背景尺寸，如 1280×720；接苹果游戏为 800×600），
+显示时由 SDL 渲染器把整张画面一次放大到实际窗口或全屏（pygame.SCALED，纹理缩放）：
+绘制和填充的开销只取决于逻辑分辨率，与显示器是 1080p 还是 4K 无关，资源也不需要按显示器重新缩放；
+鼠标坐标由 pygame 换算回逻辑坐标，场景代码不需要改动
+
+环境变量：
+    ZAMMI_DISPLAY        window（默认）    窗口按逻辑分辨率 1:1 显示
+                         scaled           窗口按整数倍放大到桌面能放下的最大尺寸
+                         fullscreen       全屏，保持宽高比铺满（不足的部分留黑边）
+    ZAMMI_SCALE_FILTER   nearest（默认）   最近邻，像素风格的画面放大后保持锐利
+                         smooth           线性插值
+    ZAMMI_PACING=vsync   开启垂直同步（见 frame_scheduler）；垂直同步需要 SDL 渲染器，window 方式也改用 SCALED 创建
+
+用法：
+    screen = presentation.set_mode((1280, 720))    # 代替 pygame.display.set_mode
+"""
+import os
+
+import pygame
+
+import frame_scheduler
+import game_log
+
+DISPLAY_ENV = "ZAMMI_DISPLAY"
+FILTER_ENV = "ZAMMI_SCALE_FILTER"
+DISPLAY_MODES = ("window", "scaled", "fullscreen")
+# ZAMMI_SCALE_FILTER -> SDL 渲染器缩放方式
+FILTERS = {"nearest": "nearest", "smooth": "linear"}
+
+log = game_log.get_logger("display")
+
+
+def display_mode():
+    """当前的显示方式（无效值按 window 处理）"""
+    mode = os.environ.get(DISPLAY_ENV, "window").strip().lower()
+    return mode if mode in DISPLAY_MODES else "window"
+
+
+def scale_filter():
+    """当前的放大方式（无效值按 nearest 处理）"""
+    name = os.environ.get(FILTER_ENV, "nearest").strip().lower()
+    return name if name in FILTERS else "nearest"
+
+
+def set_mode(size):
+    """
+    按逻辑分辨率创建窗口
+
+    Args:
+        size: 逻辑分辨率 (w, h)，场景始终按这个尺寸绘制
+
+    Returns:
+        screen: 逻辑分辨率的窗口 Surface
+    """
+    size = tuple(size)
+    mode = display_mode()
+    vsync = frame_scheduler.pacing() == "vsync"
+    if mode == "window" and not vsync:
+        return pygame.display.set_mode(size)
+
+    # 缩放方式要在创建渲染器之前设置
+    os.environ["SDL_RENDER_SCALE_QUALITY"] = FILTERS[scale_filter()]
+    flags = pygame.SCALED | (pygame.FULLSCREEN if mode == "fullscreen" else 0)
+    try:
+        screen = pygame.display.set_mode(size, flags, vsync=int(vsync))
+    except pygame.error as e:
+        log.warning("⚠️ 无法创建缩放%s窗口（%s），改为按逻辑分辨率显示", "/垂直同步" if vsync else "", e)
+        return pygame.display.set_mode(size)
+    window = pygame.display.get_window_size()
+    log.info("🖥️ 逻辑分辨率 %d×%d → 显示 %d×%d（%s，%s%s）", size[0], size[1], window[0], window[1],
+             mode, scale_filter(), "，垂直同步" if vsync else "")
+    return screen
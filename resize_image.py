@@ -1,21 +1,17 @@
-from pathlib import Path
-from datetime import datetime
-from PIL import Image
+"""
+单张图片缩小工具：把图片缩小为原来的 1/N，输出为 *_small.ext，不修改原文件
 
-# 要处理的原始图片路径
-SRC = Path(r"F:\code\zammi\Zammis-Delivery\屏幕截图 2025-10-16 105916.png")
+场景用到的各尺寸资源（背景、GIF、对话框）请用 build_assets.py 批量生成
 
+用法：
+    python Zammis-Delivery/resize_image.py 图片1.png 图片2.png --divisor 10
+"""
+import argparse
+from pathlib import Path
 
-def backup_file(src: Path) -> Path:
-    """创建备份文件，返回备份路径"""
-    if not src.exists():
-        raise FileNotFoundError(f"找不到文件: {src}")
-    ts = datetime.now().strftime("%Y%m%d%H%M%S")
-    bak = src.with_name(src.stem + "_bak_" + ts + src.suffix)
-    src.replace(bak)  # 移动原文件到备份名（原地替换）
-    # 将备份文件复制回原名 so we still have original filename for output
-    bak.copy = bak  # placeholder to keep reference
-    return bak
+from PIL import Image
+
+from build_assets import save_png
 
 
 def resize_image(src: Path, scale_divisor: int = 10) -> Path:
@@ -23,36 +19,29 @@ def resize_image(src: Path, scale_divisor: int = 10) -> Path:
     if not src.exists():
         raise FileNotFoundError(f"找不到文件: {src}")
 
-    im = Image.open(src)
-    w, h = im.size
-    new_w = max(1, w // scale_divisor)
-    new_h = max(1, h // scale_divisor)
-    im_small = im.resize((new_w, new_h), Image.LANCZOS)
+    with Image.open(src) as im:
+        w, h = im.size
+        new_w = max(1, w // scale_divisor)
+        new_h = max(1, h // scale_divisor)
+        im_small = im.convert("RGBA").resize((new_w, new_h), Image.Resampling.LANCZOS)
 
     out_path = src.with_name(src.stem + "_small" + src.suffix)
-    im_small.save(out_path)
+    if out_path.suffix.lower() == ".png":
+        # 去掉全不透明的 alpha 通道并压缩
+        save_png(im_small, out_path)
+    else:
+        im_small.convert("RGB").save(out_path)
     return out_path
 
 
-def main():
-    src = SRC
-    if not src.exists():
-        print(f"错误：找不到源文件 {src}")
-        return
-
-    # 不直接覆盖原文件：先创建一个时间戳备份，然后复制备份回原文件名以便后续生成 small 文件
-    ts = datetime.now().strftime("%Y%m%d%H%M%S")
-    bak = src.with_name(src.stem + "_bak_" + ts + src.suffix)
-    src.rename(bak)  # 重命名为备份
-    print(f"已创建备份: {bak}")
-
-    # 将备份复制回原始文件名，以保留原始路径为操作输入
-    # 使用 Pillow 打开备份并保存为原名
-    im = Image.open(bak)
-    im.save(src)
-
-    out = resize_image(src, 10)
-    print(f"已生成缩小图片: {out} （尺寸 {im.size} -> {(out)}）")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把图片缩小为原来的 1/N，输出为 *_small.ext")
+    parser.add_argument("files", nargs="+", type=Path, help="图片文件")
+    parser.add_argument("--divisor", type=int, default=10, help="缩小倍数，默认 10")
+    args = parser.parse_args(argv)
+    for src in args.files:
+        out = resize_image(src, args.divisor)
+        print(f"已生成缩小图片: {out}")
 
 
 if __name__ == '__main__':
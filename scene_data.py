@@ -0,0 +1,375 @@
+"""
+场景定义
+各场景的资源、帧时长、出生点、移动范围、触发区域、对话页和出口写在 scenes/<名称>.json 中，
+load() 读取后立即校验并预编译：资源路径解析成文件列表（缺少的文件在启动时就报错），
+坐标表达式编译成代码对象，对话框图片汇总成一个列表，与动画帧一起在后台批量加载
+
+坐标和尺寸可以写数字，也可以写只含 + - * / // % 和括号的表达式，可用的变量：
+    W, H   窗口宽高
+    w, h   角色第一帧的宽高（只用于出生点）
+
+文件中的路径相对于项目目录（本文件所在目录）
+
+用法：
+    scene = scene_data.load("pig")
+    bg_stream = asset_loader.FrameStream("背景动画", scene.background_source())
+    x, y = scene.spawn_position(screen.get_size(), fg.get_size())
+"""
+import ast
+import json
+from collections import namedtuple
+from pathlib import Path
+
+import asset_loader
+import asset_pack
+from triggers import TriggerIndex, CircleZone, RectZone, INF
+
+ROOT = Path(__file__).parent
+SCENES_DIR = ROOT / "scenes"
+
+# 对话页点击后的动作
+ON_CLICK = (
+    "next",    # 翻到下一页
+    "close",   # 收起对话框（离开触发区域后再次进入会重新弹出）
+    "run",     # 运行 scene 指定的脚本并等待其结束，之后显示下一页
+    "exit",    # 运行 scene 指定的脚本并结束当前场景
+    "video",   # 播放场景的视频（"video" 字段），播完后显示下一页（最后一页则收起对话框）
+)
+
+Page = namedtuple("Page", "image image_index text lines text_offset on_click scene sticky flip_character")
+Trigger = namedtuple("Trigger", "name x y radius marker pages data")
+Exit = namedtuple("Exit", "name rect scene")
+
+# 表达式中允许的语法节点
+_EXPR_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+               ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.USub, ast.UAdd)
+
+
+class SceneError(ValueError):
+    """场景文件格式错误"""
+
+
+class Expr:
+    """预编译的坐标表达式，常量表达式在加载时直接求值"""
+
+    def __init__(self, source, names, where):
+        """
+        Args:
+            source: 数字或表达式字符串
+            names: 可用的变量名
+            where: 出错时提示的位置
+        """
+        self.source = source
+        self.value = None
+        self._code = None
+        if isinstance(source, bool) or not isinstance(source, (int, float, str)):
+            raise SceneError(f"{where}: 应为数字或表达式，实际是 {source!r}")
+        if not isinstance(source, str):
+            self.value = source
+            return
+        try:
+            tree = ast.parse(source, mode="eval")
+        except SyntaxError as e:
+            raise SceneError(f"{where}: 表达式语法错误 {source!r}: {e.msg}") from None
+        for node in ast.walk(tree):
+            if not isinstance(node, _EXPR_NODES):
+                raise SceneError(f"{where}: 表达式中不支持 {type(node).__name__}: {source!r}")
+            if isinstance(node, ast.Name) and node.id not in names:
+                raise SceneError(f"{where}: 未知变量 {node.id}（可用: {', '.join(names) or '无'}）")
+            if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+                raise SceneError(f"{where}: 表达式中只能有数字: {source!r}")
+        self._code = compile(tree, where, "eval")
+        if not any(isinstance(node, ast.Name) for node in ast.walk(tree)):
+            self.value = self(**{})
+            self._code = None
+
+    def __call__(self, **names):
+        if self._code is None:
+            return self.value
+        return eval(self._code, {"__builtins__": {}}, names)
+
+    def __repr__(self):
+        return f"Expr({self.source!r})"
+
+
+class Scene:
+    """校验并预编译后的场景定义"""
+
+    def __init__(self, name, data, path=None):
+        """
+        Args:
+            name: 场景名（也是日志名）
+            data: 从 JSON 读出的字典
+            path: 场景文件路径（出错提示用）
+        """
+        self.name = name
+        self.path = path
+        where = str(path or name)
+        _check_keys(data, where, required=("background", "character"),
+                    optional=("caption", "video", "spawn", "speed", "bounds", "probe",
+                              "dialogue_width", "triggers", "exits", "data"))
+        self.caption = data.get("caption", "")
+        self.background = self._parse_background(data["background"], f"{where}: background")
+        self.character = self._parse_character(data["character"], f"{where}: character")
+        # 视频文件不随仓库提供，缺少时播放器会提示，不在这里报错
+        self.video = _resolve(data["video"]) if data.get("video") else None
+
+        spawn = data.get("spawn", {"x": 0, "y": 0})
+        _check_keys(spawn, f"{where}: spawn", required=("x", "y"))
+        self.spawn = (Expr(spawn["x"], ("W", "H", "w", "h"), f"{where}: spawn.x"),
+                      Expr(spawn["y"], ("W", "H", "w", "h"), f"{where}: spawn.y"))
+        self.speed = _number(data.get("speed", 5), f"{where}: speed")
+
+        bounds = data.get("bounds", {})
+        _check_keys(bounds, f"{where}: bounds", optional=("center_x", "center_y"))
+        self.bounds = {axis: self._parse_range(bounds.get(axis), f"{where}: bounds.{axis}")
+                       for axis in ("center_x", "center_y")}
+
+        probe = data.get("probe", [0, 0])
+        if not isinstance(probe, list) or len(probe) != 2:
+            raise SceneError(f"{where}: probe 应为 [dx, dy]")
+        self.probe = tuple(_number(v, f"{where}: probe") for v in probe)
+
+        self.dialogue_width = None
+        if data.get("dialogue_width") is not None:
+            self.dialogue_width = Expr(data["dialogue_width"], ("W", "H"), f"{where}: dialogue_width")
+
+        # 对话框图片按首次出现的顺序去重，加载后按下标取用
+        self.dialogue_images = []
+        self.triggers = [self._parse_trigger(t, f"{where}: triggers[{i}]") for i, t in enumerate(data.get("triggers", []))]
+        self.exits = [self._parse_exit(e, f"{where}: exits[{i}]") for i, e in enumerate(data.get("exits", []))]
+        for kind, items in (("触发区域", self.triggers), ("出口", self.exits)):
+            names = [item.name for item in items]
+            duplicates = sorted({n for n in names if names.count(n) > 1})
+            if duplicates:
+                raise SceneError(f"{where}: {kind}重名: {', '.join(duplicates)}")
+        self.data = data.get("data", {})
+
+    # ------------------------------------------------------------------
+    # 解析与校验
+    # ------------------------------------------------------------------
+
+    def _parse_background(self, spec, where):
+        _check_keys(spec, where, optional=("frames", "gif", "size", "scale", "duration"))
+        if ("frames" in spec) == ("gif" in spec):
+            raise SceneError(f"{where}: frames 和 gif 必须二选一")
+        background = {"scale": None, "duration": 100, "size": None}
+        if "gif" in spec:
+            background["gif"] = _existing(spec["gif"], where)
+            size = spec.get("size", [1280, 720])
+            if not isinstance(size, list) or len(size) != 2:
+                raise SceneError(f"{where}: size 应为 [宽, 高]")
+            background["size"] = tuple(int(_number(v, f"{where}: size")) for v in size)
+        else:
+            background["files"] = _frame_files(spec["frames"], where)
+            if spec.get("scale") is not None:
+                background["scale"] = _number(spec["scale"], f"{where}: scale")
+            background["duration"] = _number(spec.get("duration", 100), f"{where}: duration")
+        return background
+
+    def _parse_character(self, spec, where):
+        _check_keys(spec, where, required=("frames",), optional=("flip_x", "duration"))
+        return {"files": _frame_files(spec["frames"], where),
+                "flip_x": bool(spec.get("flip_x", False)),
+                "duration": _number(spec.get("duration", 100), f"{where}: duration")}
+
+    def _parse_range(self, value, where):
+        if value is None:
+            return None
+        if not isinstance(value, list) or len(value) != 2:
+            raise SceneError(f"{where}: 应为 [最小值, 最大值]")
+        lo, hi = (_number(v, where) for v in value)
+        if lo > hi:
+            raise SceneError(f"{where}: 最小值大于最大值")
+        return lo, hi
+
+    def _parse_trigger(self, spec, where):
+        _check_keys(spec, where, required=("name", "circle"), optional=("marker", "dialogue", "data"))
+        circle = spec["circle"]
+        if not isinstance(circle, list) or len(circle) != 3:
+            raise SceneError(f"{where}: circle 应为 [x, y, 半径]")
+        x, y, radius = (_number(v, f"{where}: circle") for v in circle)
+        pages = spec.get("dialogue", [])
+        pages = tuple(self._parse_page(p, i, len(pages), f"{where}: dialogue[{i}]") for i, p in enumerate(pages))
+        marker = spec.get("marker")
+        return Trigger(spec["name"], x, y, radius, None if marker is None else _number(marker, f"{where}: marker"),
+                       pages, spec.get("data", {}))
+
+    def _parse_page(self, spec, index, count, where):
+        _check_keys(spec, where, required=("image",),
+                    optional=("text", "lines", "text_offset", "on_click", "scene", "sticky", "flip_character"))
+        image = _existing(spec["image"], where)
+        if image not in self.dialogue_images:
+            self.dialogue_images.append(image)
+        text_offset = spec.get("text_offset", [0, 0])
+        if not isinstance(text_offset, list) or len(text_offset) != 2:
+            raise SceneError(f"{where}: text_offset 应为 [dx, dy]")
+        lines = []
+        for line in spec.get("lines", []):
+            if not isinstance(line, list) or len(line) != 3 or not isinstance(line[0], str):
+                raise SceneError(f"{where}: lines 的每一项应为 [文字, x, y]")
+            lines.append((line[0], _number(line[1], where), _number(line[2], where)))
+        on_click = spec.get("on_click", "next" if index < count - 1 else "close")
+        if on_click not in ON_CLICK:
+            raise SceneError(f"{where}: 未知的 on_click {on_click!r}（可用: {', '.join(ON_CLICK)}）")
+        if on_click in ("next", "run") and index >= count - 1:
+            raise SceneError(f"{where}: 最后一页不能用 on_click={on_click}")
+        if on_click == "video" and self.video is None:
+            raise SceneError(f"{where}: on_click=video 需要场景的 video 字段")
+        scene = None
+        if on_click in ("run", "exit"):
+            if not spec.get("scene"):
+                raise SceneError(f"{where}: on_click={on_click} 需要 scene")
+            scene = str(_existing(spec["scene"], where))
+        return Page(image, self.dialogue_images.index(image), spec.get("text", ""), tuple(lines),
+                    tuple(_number(v, f"{where}: text_offset") for v in text_offset), on_click, scene,
+                    bool(spec.get("sticky", False)), bool(spec.get("flip_character", False)))
+
+    def _parse_exit(self, spec, where):
+        _check_keys(spec, where, required=("name", "rect"), optional=("scene",))
+        rect = spec["rect"]
+        if not isinstance(rect, list) or len(rect) != 4:
+            raise SceneError(f"{where}: rect 应为 [x0, y0, x1, y1]（null 表示无穷远）")
+        # null 表示该边在无穷远处：左/上为 -INF，右/下为 INF
+        rect = tuple((-INF if i < 2 else INF) if v is None else Expr(v, ("W", "H"), f"{where}: rect")
+                     for i, v in enumerate(rect))
+        scene = str(_existing(spec["scene"], where)) if spec.get("scene") else None
+        return Exit(spec["name"], rect, scene)
+
+    # ------------------------------------------------------------------
+    # 运行时
+    # ------------------------------------------------------------------
+
+    def assets(self):
+        """
+        场景用到的全部资源文件（启动前即可确定，用于批量加载和预取）
+
+        Returns:
+            paths: Path 列表，不含重复
+        """
+        paths = list(self.background.get("files", [])) or [self.background["gif"]]
+        paths += self.character["files"] + self.dialogue_images
+        if self.video is not None and self.video.exists():
+            paths.append(self.video)
+        return list(dict.fromkeys(paths))
+
+    @property
+    def plays_video(self):
+        """是否有对话页会播放视频"""
+        return any(page.on_click == "video" for trigger in self.triggers for page in trigger.pages)
+
+    @property
+    def window_size(self):
+        """GIF 背景的窗口大小在文件中给出；序列帧背景为 None，窗口大小等于第一帧背景"""
+        return self.background["size"]
+
+    def background_source(self):
+        """背景动画帧来源（在 asset_loader 工作线程中迭代）"""
+        if "gif" in self.background:
+            return asset_loader.GifFrames(self.background["gif"], self.background["size"])
+        return asset_loader.PngFrames([str(p) for p in self.background["files"]],
+                                      scale=self.background["scale"], duration=self.background["duration"])
+
+    def character_source(self):
+        """角色动画帧来源"""
+        return asset_loader.PngFrames([str(p) for p in self.character["files"]],
+                                      flip_x=self.character["flip_x"], duration=self.character["duration"])
+
+    def dialogue_source(self, window_size):
+        """
+        对话框图片来源，按 dialogue_width 缩放
+
+        Returns:
+            PngFrames，场景没有对话页时为 None
+        """
+        if not self.dialogue_images:
+            return None
+        width = None
+        if self.dialogue_width is not None:
+            width = int(self.dialogue_width(W=window_size[0], H=window_size[1]))
+        return asset_loader.PngFrames([str(p) for p in self.dialogue_images], width=width)
+
+    def spawn_position(self, window_size, character_size):
+        """
+        Returns:
+            (x, y): 角色左上角的出生坐标
+        """
+        names = {"W": window_size[0], "H": window_size[1], "w": character_size[0], "h": character_size[1]}
+        return int(self.spawn[0](**names)), int(self.spawn[1](**names))
+
+    def trigger_index(self, window_size):
+        """交互区域索引，区域的 data 中带有 trigger（Trigger 定义）"""
+        index = TriggerIndex((0, 0) + tuple(window_size))
+        for trigger in self.triggers:
+            index.add(CircleZone(trigger.name, trigger.x, trigger.y, trigger.radius, trigger=trigger, **trigger.data))
+        return index
+
+    def exit_index(self, window_size):
+        """出口索引，区域的 data 中带有 scene（为 None 表示只是画面边缘）"""
+        names = {"W": window_size[0], "H": window_size[1]}
+        index = TriggerIndex((0, 0) + tuple(window_size))
+        for exit_ in self.exits:
+            rect = [v(**names) if isinstance(v, Expr) else v for v in exit_.rect]
+            index.add(RectZone(exit_.name, *rect, scene=exit_.scene))
+        return index
+
+
+def _check_keys(obj, where, required=(), optional=()):
+    if not isinstance(obj, dict):
+        raise SceneError(f"{where}: 应为对象")
+    missing = [k for k in required if k not in obj]
+    if missing:
+        raise SceneError(f"{where}: 缺少 {', '.join(missing)}")
+    unknown = [k for k in obj if k not in required and k not in optional]
+    if unknown:
+        raise SceneError(f"{where}: 未知字段 {', '.join(unknown)}")
+
+
+def _number(value, where):
+    """数字或常量表达式（如 "2 / 3"）"""
+    return Expr(value, (), where).value
+
+
+def _resolve(path):
+    return ROOT / path
+
+
+def _existing(path, where):
+    resolved = _resolve(path)
+    if not asset_pack.exists(resolved):
+        raise SceneError(f"{where}: 找不到文件 {path}")
+    return resolved
+
+
+def _frame_files(frames, where):
+    """序列帧：文件名列表，或 glob 通配符（按文件名排序）"""
+    if isinstance(frames, str):
+        try:
+            return [Path(p) for p in asset_loader.frame_files(str(_resolve(frames)))]
+        except FileNotFoundError:
+            raise SceneError(f"{where}: 找不到匹配的文件 {frames}") from None
+    if not isinstance(frames, list) or not frames:
+        raise SceneError(f"{where}: frames 应为文件列表或通配符")
+    return [_existing(f, where) for f in frames]
+
+
+def load(name):
+    """
+    读取并预编译场景定义
+
+    Args:
+        name: 场景名（scenes/<name>.json）或场景文件路径
+
+    Returns:
+        Scene
+    """
+    path = Path(name)
+    if path.suffix != ".json":
+        path = SCENES_DIR / f"{name}.json"
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise SceneError(f"找不到场景文件: {path}") from None
+    except json.JSONDecodeError as e:
+        raise SceneError(f"{path}: JSON 格式错误: {e}") from None
+    return Scene(path.stem, data, path)
@@ -0,0 +1,449 @@
+"""
+场景引擎
+按 scene_data 的场景定义运行邮局、猪猪水果摊、结尾这类行走场景：
+WASD/方向键移动角色，检测点进入触发区域时弹出对话框（按页切换），角色中心到达出口时启动下一个场景
+
+资源在打开窗口前就已确定：背景、角色动画帧和对话框图片一起在后台线程加载，
+对话框图片在加载时按窗口宽度缩放好，绘制时不再读盘和缩放
+
+画面按脏矩形刷新：每帧只用背景恢复上一帧画过东西的区域和背景动画变化的区域（构建过增量数据时只是几个小块），
+再画角色和界面，只把这些区域提交到窗口；第一帧和视频播放结束后整帧重绘
+
+用法：
+    import scene_data, scene_engine
+    scene_engine.run(scene_data.load("main"))
+"""
+import sys
+
+import pygame
+
+import asset_loader
+import delta_frames
+import frame_profiler
+import frame_scheduler
+import game_log
+import input_replay
+import lazy_import
+import presentation
+import stall_watchdog
+from triggers import ENTER
+
+TEXT_COLOR = (0, 0, 0)
+# 背景没有覆盖到的区域的底色
+FILL_COLOR = (50, 50, 50)
+
+
+def open_scene(scene):
+    """
+    开始加载场景资源并创建窗口，显示启动画面直到每个动画有一帧就绪
+
+    Args:
+        scene: scene_data.Scene
+
+    Returns:
+        (screen, loading, background, fg_stream, dialogue_stream)
+        background 为背景动画（delta_frames.FrameAnimation / DeltaAnimation），场景没有对话页时 dialogue_stream 为 None
+    """
+    bg_stream, background = delta_frames.background(scene)
+    fg_name = "角色动画（已左右翻转）" if scene.character["flip_x"] else "角色动画"
+    fg_stream = asset_loader.FrameStream(fg_name, scene.character_source())
+    loading = asset_loader.Loading(bg_stream, fg_stream)
+    loading.start()
+
+    # 逻辑分辨率由场景给出，或与第一帧背景一致（第一帧背景解码后即可创建）；放大到显示器见 presentation
+    screen = presentation.set_mode(scene.window_size or bg_stream.first_size())
+    pygame.display.set_caption(scene.caption)
+
+    loading.splash(screen)
+
+    # 对话框图片的缩放尺寸取决于窗口宽度，场景开始后在后台加载，不推迟第一帧
+    dialogue_stream = None
+    source = scene.dialogue_source(screen.get_size())
+    if source is not None:
+        dialogue_stream = asset_loader.FrameStream("对话框", source)
+        loading.add(dialogue_stream)
+    return screen, loading, background, fg_stream, dialogue_stream
+
+
+def run(scene):
+    """
+    运行行走场景，直到退出或进入下一个场景
+
+    Args:
+        scene: scene_data.Scene
+    """
+    log = game_log.get_logger(scene.name)
+    pygame.init()
+
+    screen, loading, background, fg_stream, dialogue_stream = open_scene(scene)
+
+    # 帧列表随加载增长，动画按已就绪的帧数循环
+    fg_frames, fg_durations = fg_stream.frames, fg_stream.durations
+    fg_current_frame = 0
+    fg_frame_timer = 0
+
+    # 交互区域按角色检测点判断，场景出口按角色中心点判断（网格索引 + 平方距离）
+    triggers = scene.trigger_index(screen.get_size())
+    exits = scene.exit_index(screen.get_size())
+    talk_triggers = [t for t in scene.triggers if t.pages]
+    first_zone = triggers.zones[scene.triggers[0].name] if scene.triggers else None
+
+    clock = input_replay.Clock()
+
+    # 出生点（使用第一帧获取尺寸）
+    fg = fg_frames[fg_current_frame]
+    x, y = scene.spawn_position(screen.get_size(), fg.get_size())
+    speed = scene.speed
+    probe_dx, probe_dy = scene.probe
+
+    # 字体只创建一次（SysFont 每次都要查找字体文件）
+    font = pygame.font.SysFont(None, 20)
+    ruler_font = pygame.font.SysFont(None, 16)
+    axis_label_font = pygame.font.SysFont(None, 14)
+    page_fonts = {}
+    page_texts = {}
+
+    # 文字框状态与分页：show_box 在碰撞时为 True，box_page 控制显示哪一页文本
+    show_box = False
+    box_page = 0
+    box_manual_hide = False  # 玩家主动收起文字框后，保持隐藏直到离开碰撞区
+    pages = talk_triggers[0].pages if talk_triggers else ()
+
+    # 视频播放器（on_click=video 的对话页）：由主循环逐帧驱动（非阻塞），播放期间画面由视频覆盖
+    video_player = None
+    video_next_page = None  # 视频播完后显示的对话页
+
+    def play_video(path):
+        """开始播放视频（非阻塞），主循环负责推进，播放结束后自动回到场景。"""
+        nonlocal video_player
+        from video_player import VideoPlayer  # 依赖 cv2，第一帧之后已在后台预加载
+        if video_player is not None:
+            video_player.stop()
+        player = VideoPlayer(path, screen.get_size())
+        video_player = player if player.start() else None
+
+    if scene.plays_video:
+        # 视频播放依赖 cv2，第一帧显示后在后台导入
+        lazy_import.schedule_preload("video_player")
+
+    def dialogue_image(page):
+        # 极少数情况下对话框图片还没加载到，等它加载完成
+        if len(dialogue_stream.frames) <= page.image_index:
+            dialogue_stream.wait(page.image_index + 1)
+        return dialogue_stream.frames[page.image_index]
+
+    def page_text(page, dh):
+        # 文字只渲染一次：字体为图片高度的 1/20，最小 8
+        if page not in page_texts:
+            size = max(8, dh // 20)
+            if size not in page_fonts:
+                page_fonts[size] = pygame.font.SysFont(None, size)
+            page_texts[page] = page_fonts[size].render(page.text, True, TEXT_COLOR)
+        return page_texts[page]
+
+    def restore(rect):
+        # 用当前背景盖住 rect 区域
+        bg = background.surface
+        if not bg.get_rect().contains(rect):
+            screen.fill(FILL_COLOR, rect)
+        screen.blit(bg, rect, rect)
+
+    # 上一帧在背景之上画过的区域；full_redraw 为 True 时整帧重绘
+    drawn = []
+    full_redraw = True
+
+    running = True
+    while running:
+        frame_profiler.begin_frame()
+        for event in input_replay.events():
+            frame_profiler.handle_event(event)
+            frame_scheduler.handle_event(event)
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.WINDOWEXPOSED:
+                full_redraw = True
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                # 鼠标左键点击时，如果文字框可见并且点击在框内，则按当前页的设置翻页、收起或启动脚本
+                if event.button == 1 and show_box:
+                    mx, my = event.pos
+                    h = screen.get_height() // 3
+                    bx = 0
+                    by = screen.get_height() - h
+                    bw = screen.get_width()
+                    if bx <= mx <= bx + bw and by <= my <= by + h:
+                        page_index = box_page
+                        page = pages[page_index]
+                        if page.on_click == "next":
+                            box_page += 1
+                        elif page.on_click == "run":
+                            import subprocess
+                            proc = subprocess.Popen([sys.executable, page.scene])
+                            show_box = False
+                            box_page = 0
+                            box_manual_hide = True
+                            # 等待脚本（如小游戏）结束后显示下一页
+                            with stall_watchdog.expect(f"等待子场景 {page.scene}"):
+                                proc.wait()
+                            full_redraw = True
+                            show_box = True
+                            box_page = page_index + 1
+                            box_manual_hide = False
+                        elif page.on_click == "video":
+                            play_video(scene.video)
+                            show_box = False
+                            box_manual_hide = True
+                            video_next_page = page_index + 1
+                        elif page.on_click == "exit":
+                            import subprocess
+                            subprocess.Popen([sys.executable, page.scene])
+                            running = False
+                        else:
+                            show_box = False
+                            box_page = 0
+                            box_manual_hide = True
+                            if page.flip_character:
+                                # 左右反转角色序列帧（先等待其余帧加载完成）
+                                fg_stream.wait()
+                                fg_frames = [pygame.transform.flip(frame, True, False) for frame in fg_frames]
+                                fg = fg_frames[fg_current_frame]
+
+        frame_profiler.mark("events")
+
+        # 视频播放中：只推进并显示视频帧，场景逻辑暂停
+        if video_player is not None:
+            video_player.update(clock.get_time())
+            frame_profiler.mark("update")
+            video_player.draw(screen)
+            if video_player.finished:
+                video_player = None
+            full_redraw = True
+            frame_profiler.draw_overlay(screen)
+            frame_profiler.mark("draw")
+            pygame.display.flip()
+            frame_profiler.mark("flip")
+            # 视频播放期间保持全速
+            frame_scheduler.wake()
+            frame_scheduler.tick(clock)
+            continue
+
+        if video_next_page is not None:
+            # 视频播完（或无法播放）后回到对话：有下一页时显示，否则保持收起
+            if video_next_page < len(pages):
+                show_box = True
+                box_page = video_next_page
+                box_manual_hide = False
+            video_next_page = None
+
+        # 后台加载的动画帧逐帧加入动画（加载期间保持全速）
+        if not loading.done:
+            frame_scheduler.wake()
+            with frame_profiler.section("loading"):
+                loading.poll()
+
+        with frame_profiler.section("animation"):
+            # 更新背景动画帧，bg_dirty 为背景变化的区域
+            bg_dirty = background.update(clock.get_time())
+
+            # 更新前景动画帧
+            fg_frame_timer += clock.get_time()
+            if fg_frame_timer >= fg_durations[fg_current_frame]:
+                fg_frame_timer = 0
+                fg_current_frame = (fg_current_frame + 1) % len(fg_frames)
+                fg = fg_frames[fg_current_frame]
+
+        keys = input_replay.pressed()
+        # WASD 或 箭头 - 每帧固定位移
+        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+            x -= speed
+        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+            x += speed
+        if keys[pygame.K_w] or keys[pygame.K_UP]:
+            y -= speed
+        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+            y += speed
+
+        # 移动范围：把角色中心限制在场景给出的范围内
+        if scene.bounds["center_x"] is not None:
+            lo, hi = scene.bounds["center_x"]
+            half_width = fg.get_width() // 2
+            x = max(lo - half_width, min(hi - half_width, x))
+        if scene.bounds["center_y"] is not None:
+            lo, hi = scene.bounds["center_y"]
+            half_height = fg.get_height() // 2
+            y = max(lo - half_height, min(hi - half_height, y))
+
+        frame_profiler.mark("update")
+
+        with frame_profiler.section("draw.scene"):
+            # updates 为本帧要提交到窗口的区域，None 表示整个窗口
+            updates = None
+            try:
+                if full_redraw:
+                    screen.fill(FILL_COLOR)
+                    screen.blit(background.surface, (0, 0))
+                else:
+                    updates = bg_dirty + drawn
+                    for rect in updates:
+                        restore(rect)
+            except Exception as e:
+                log.warning("背景绘制错误: %s", e)
+            drawn = [screen.blit(fg, (int(x), int(y)))]
+
+        with frame_profiler.section("collision"):
+            # 碰撞检测:使用角色中心点作为检测点
+            character_center_x = int(x) + fg.get_width() // 2
+            character_center_y = int(y) + fg.get_height() // 2
+            # 检测点相对中心点偏移
+            detect_x = character_center_x + probe_dx
+            detect_y = character_center_y + probe_dy
+
+            # 实际触发仅在玩家检测点触碰白点时发生
+            trigger_events = triggers.update(detect_x, detect_y)
+            talking = next((t for t in talk_triggers if triggers.is_inside(t.name)), None)
+            collided = talking is not None
+
+        # 调试：在检测点画小红点，显示距离与状态文本
+        try:
+            drawn.append(pygame.draw.circle(screen, (255, 0, 0), (detect_x, detect_y), 4))
+        except Exception:
+            pass
+
+        if first_zone is not None:
+            dbg_text = font.render(f"dist={int(first_zone.distance(detect_x, detect_y))} r={first_zone.radius} collided={collided}", True, (255, 255, 255))
+            dbg_bg = pygame.Surface((dbg_text.get_width() + 8, dbg_text.get_height() + 6), pygame.SRCALPHA)
+            dbg_bg.fill((0, 0, 0, 160))
+            drawn.append(screen.blit(dbg_bg, (8, 40)))
+            drawn.append(screen.blit(dbg_text, (12, 42)))
+
+        # 在首次碰撞时在控制台打印一条记录，便于确认触发
+        for event in trigger_events:
+            if event.type == ENTER:
+                zone = event.zone
+                log.info("触发：distance=%.1f, circle_radius=%s, detect=(%s,%s), dot=(%s,%s)", zone.distance(detect_x, detect_y), zone.radius, detect_x, detect_y, zone.x, zone.y)
+
+        # 绘制交互点标记（白色实心圆，较小的视觉半径）
+        for trigger in scene.triggers:
+            if trigger.marker:
+                drawn.append(pygame.draw.circle(screen, (255, 255, 255), (trigger.x, trigger.y), trigger.marker))
+
+        # 根据碰撞设置文字框显示状态；sticky 的页面（如小游戏之后的感谢页）只能点击关闭
+        if not (show_box and pages[box_page].sticky):
+            if collided:
+                if not box_manual_hide:
+                    if not show_box:
+                        pages = talking.pages
+                    show_box = True
+            else:
+                show_box = False
+                box_manual_hide = False
+
+        # 如果文字框可见，则绘制（支持分页）
+        with frame_profiler.section("draw.dialogue"):
+            if show_box:
+                # 只显示缩小后的对话框图片，文字居中绘制在图片内
+                try:
+                    page = pages[box_page]
+                    dialogue_img = dialogue_image(page)
+                    dw, dh = dialogue_img.get_size()
+                    dx = (screen.get_width() - dw) // 2
+                    dy = screen.get_height() - dh
+                    drawn.append(screen.blit(dialogue_img, (dx, dy)))
+
+                    txt_surf = page_text(page, dh)
+                    txt_x = dx + (dw - txt_surf.get_width()) // 2 + page.text_offset[0]
+                    txt_y = dy + (dh - txt_surf.get_height()) // 2 + page.text_offset[1]
+                    drawn.append(screen.blit(txt_surf, (txt_x, txt_y)))
+                except Exception as e:
+                    log.warning("对话框图片或文字绘制失败: %s", e)
+
+        with frame_profiler.section("draw.debug"):
+            # 绘制坐标标尺
+            ruler_color = (255, 255, 0)  # 黄色
+
+            # 左侧 Y 轴标尺（每50像素一个刻度）
+            for y_pos in range(0, screen.get_height() + 1, 50):
+                line_length = 15 if y_pos % 100 == 0 else 8
+                drawn.append(pygame.draw.line(screen, ruler_color, (0, y_pos), (line_length, y_pos), 2))
+                if y_pos % 100 == 0 or y_pos in [250, 279, 300, 319, 350]:  # 主要刻度和关键位置
+                    y_text = ruler_font.render(str(y_pos), True, ruler_color)
+                    drawn.append(screen.blit(y_text, (line_length + 2, y_pos - 8)))
+
+            # 顶部 X 轴标尺（每50像素一个刻度）
+            for x_pos in range(0, screen.get_width() + 1, 50):
+                line_length = 15 if x_pos % 100 == 0 else 8
+                drawn.append(pygame.draw.line(screen, ruler_color, (x_pos, 0), (x_pos, line_length), 2))
+                if x_pos % 100 == 0 or x_pos in [500, 550, 600]:  # 主要刻度和关键位置
+                    x_text = ruler_font.render(str(x_pos), True, ruler_color)
+                    drawn.append(screen.blit(x_text, (x_pos - 10, line_length + 2)))
+
+            # 绘制坐标轴线
+            drawn.append(pygame.draw.line(screen, ruler_color, (0, 0), (0, screen.get_height()), 2))  # Y轴
+            drawn.append(pygame.draw.line(screen, ruler_color, (0, 0), (screen.get_width(), 0), 2))  # X轴
+
+            # 添加坐标轴说明
+            x_label = axis_label_font.render("X ->", True, ruler_color)
+            y_label = axis_label_font.render("Y", True, ruler_color)
+            y_label_down = axis_label_font.render("|", True, ruler_color)
+            y_label_arrow = axis_label_font.render("v", True, ruler_color)
+            drawn.append(screen.blit(x_label, (20, 2)))
+            drawn.append(screen.blit(y_label, (2, 20)))
+            drawn.append(screen.blit(y_label_down, (5, 30)))
+            drawn.append(screen.blit(y_label_arrow, (4, 38)))
+
+            # 显示当前角色中心位置以便与交互点比较
+            pos_text = ruler_font.render(f"Center: ({character_center_x}, {character_center_y})", True, (255, 255, 0))
+            pos_bg = pygame.Surface((pos_text.get_width() + 8, pos_text.get_height() + 4), pygame.SRCALPHA)
+            pos_bg.fill((0, 0, 0, 150))
+            drawn.append(screen.blit(pos_bg, (screen.get_width() - pos_text.get_width() - 12, screen.get_height() - 30)))
+            drawn.append(screen.blit(pos_text, (screen.get_width() - pos_text.get_width() - 8, screen.get_height() - 28)))
+
+        # 到达画面边缘的出口，自动运行对应的场景脚本
+        for event in exits.update(character_center_x, character_center_y):
+            if event.type == ENTER:
+                if event.zone.data["scene"] is None:
+                    log.info("角色已到达出口 %s", event.zone.name)
+                    continue
+                import subprocess
+                subprocess.Popen([
+                    sys.executable,
+                    event.zone.data["scene"]
+                ])
+                running = False
+
+        # 在右上角显示当前前景帧索引和是否启用 Y 轴限制，方便调试
+        clamp_active = fg_current_frame < 8
+        frame_status = f"Frame: {fg_current_frame}  Clamp: {'ON' if clamp_active else 'OFF'}"
+        frame_text = font.render(frame_status, True, (255, 255, 255))
+        frame_bg = pygame.Surface((frame_text.get_width() + 8, frame_text.get_height() + 6), pygame.SRCALPHA)
+        frame_bg.fill((0, 0, 0, 140))
+        fr_x = screen.get_width() - (frame_text.get_width() + 20)
+        drawn.append(screen.blit(frame_bg, (fr_x, 8)))
+        drawn.append(screen.blit(frame_text, (fr_x + 4, 10)))
+
+        info = font.render("WASD 或 箭头 移动 — Esc 退出", True, (255, 255, 255))
+        # 在左上角绘制半透明底背景以确保可读性
+        info_bg = pygame.Surface((info.get_width() + 8, info.get_height() + 6), pygame.SRCALPHA)
+        info_bg.fill((0, 0, 0, 120))
+        drawn.append(screen.blit(info_bg, (8, 8)))
+        drawn.append(screen.blit(info, (12, 10)))
+
+        drawn.append(loading.draw_progress(screen))
+        drawn.append(frame_profiler.draw_overlay(screen))
+        drawn = [rect for rect in drawn if rect]
+        frame_profiler.mark("draw")
+        if updates is None:
+            pygame.display.flip()
+            full_redraw = False
+        else:
+            pygame.display.update(updates + drawn)
+        frame_profiler.mark("flip")
+        lazy_import.first_frame()
+        # 没有活动时降低帧率（对话框等待点击、展台前没有人）
+        frame_scheduler.tick(clock)
+
+    if video_player is not None:
+        video_player.stop()
+    pygame.quit()
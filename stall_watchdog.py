@@ -0,0 +1,250 @@
+"""
+卡顿看门狗
+场景卡住时（等待子场景 proc.wait()、姿态挑战 challenge.run()、主线程上加载大资源等）窗口直接冻结，
+事后看不出卡在哪里。主循环每帧调用 heartbeat()，后台线程检查距上一次心跳的时间：
+
+    - 超过 ZAMMI_STALL_MS（默认 500 毫秒）：抓取主线程（和其他线程）的调用栈，连同帧耗时上下文写入卡顿日志，
+      仍然卡着时按 2、4、8 倍阈值再抓几次，看调用栈有没有变化；恢复后记录这次卡顿的总时长
+    - 主线程在 C 代码里一直持有 GIL 时 Python 线程无法运行，另用 faulthandler 兜底：
+      超过 HARD_TIMEOUT 秒没有心跳，由 faulthandler 直接把所有线程的调用栈写入同一个日志
+
+帧耗时上下文：卡住前最近的帧间隔（平均、p95、最长）、当前帧已完成的阶段（frame_profiler 开启时）
+和心跳位置（哪个循环）
+
+预期内的长时间阻塞（等待子场景结束、空闲时等待事件）用 expect() 包起来，期间不报告卡顿：
+
+    with stall_watchdog.expect("等待子场景 apple_catcher_game.py"):
+        proc.wait()
+
+环境变量：
+    ZAMMI_STALL_MS    卡顿阈值（毫秒），默认 500；0 / off 关闭看门狗
+    ZAMMI_STALL_LOG   卡顿日志文件，默认仓库目录下的 stalls.log（追加写入，各场景进程共用）
+
+用法：
+    stall_watchdog.heartbeat()                 # 主循环每帧调用（frame_scheduler.tick 已自动调用）
+    stall_watchdog.heartbeat("pose_challenge") # 不经过 frame_scheduler 的循环，注明位置
+"""
+import atexit
+import contextlib
+import faulthandler
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+
+import frame_profiler
+import game_log
+
+ROOT = Path(__file__).parent
+STALL_MS_ENV = "ZAMMI_STALL_MS"
+STALL_LOG_ENV = "ZAMMI_STALL_LOG"
+STALL_LOG = ROOT / "stalls.log"
+STALL_MS = 500.0
+# 同一次卡顿最多抓取几次调用栈（阈值的 1、2、4、8 倍）
+MAX_CAPTURES = 4
+# faulthandler 兜底：至少这么多秒没有心跳（且不少于阈值的 10 倍）
+HARD_TIMEOUT = 10.0
+# 心跳间隔超过这个秒数才重新设置 faulthandler 定时器（每帧设置一次开销不必要）
+REARM_EVERY = 1.0
+# 保留最近多少帧的帧间隔
+RECENT_FRAMES = 120
+
+log = game_log.get_logger("stall")
+
+
+def _stall_ms():
+    value = os.environ.get(STALL_MS_ENV, "").strip().lower()
+    if value in ("off", "no", "false"):
+        return 0.0
+    try:
+        return max(0.0, float(value)) if value else STALL_MS
+    except ValueError:
+        return STALL_MS
+
+
+def _script_name():
+    return Path(sys.argv[0]).stem.strip("-") or "python"
+
+
+class StallWatchdog:
+    """心跳 + 后台检查线程"""
+
+    def __init__(self, stall_ms=None, log_path=None):
+        """
+        Args:
+            stall_ms: 卡顿阈值（毫秒），默认读取 ZAMMI_STALL_MS；0 表示关闭
+            log_path: 卡顿日志文件，默认读取 ZAMMI_STALL_LOG
+        """
+        self.stall_ms = _stall_ms() if stall_ms is None else stall_ms
+        self.enabled = self.stall_ms > 0
+        self.log_path = Path(log_path or os.environ.get(STALL_LOG_ENV) or STALL_LOG)
+        self.hard_timeout = max(HARD_TIMEOUT, self.stall_ms * 10 / 1000)
+        self.frame = 0            # 心跳次数
+        self.where = None         # 最近一次心跳的位置
+        self.stalls = 0           # 已记录的卡顿次数
+        self._beat = None         # 最近一次心跳的时间（perf_counter）
+        self._intervals = deque(maxlen=RECENT_FRAMES)   # 最近的帧间隔（毫秒）
+        self._expected = []       # 正在进行的预期阻塞（可嵌套）
+        self._captures = 0        # 本次卡顿已抓取的次数
+        self._thread = None
+        self._stop = threading.Event()
+        self._main = threading.main_thread().ident
+        self._file = None
+        self._armed = 0.0         # 上一次设置 faulthandler 定时器的时间
+
+    # ------------------------------------------------------------------
+    # 主线程调用
+    # ------------------------------------------------------------------
+
+    def heartbeat(self, where=None):
+        """
+        主循环每帧调用一次
+
+        Args:
+            where: 心跳位置（循环名称），默认脚本名
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._thread is None:
+            self._start()
+            if not self.enabled:
+                return
+        elif self._beat is not None:
+            elapsed = (now - self._beat) * 1000
+            self._intervals.append(elapsed)
+            if self._captures:
+                self._recovered(elapsed)
+        self._beat = now
+        self.frame += 1
+        self.where = where
+        if not self._expected and now - self._armed >= REARM_EVERY:
+            self._armed = now
+            faulthandler.dump_traceback_later(self.hard_timeout, exit=False, file=self._file)
+
+    @contextlib.contextmanager
+    def expect(self, reason):
+        """
+        预期内的长时间阻塞，期间不报告卡顿，结束后重新开始计时
+
+        Args:
+            reason: 阻塞原因，写入日志（如 "等待子场景 apple_catcher_game.py"）
+        """
+        if not self.enabled:
+            yield
+            return
+        self._expected.append(reason)
+        if self._file is not None:
+            faulthandler.cancel_dump_traceback_later()
+        try:
+            yield
+        finally:
+            self._expected.pop()
+            if self._beat is not None:
+                # 阻塞的时间不算作帧间隔
+                self._beat = time.perf_counter()
+            self._armed = 0.0
+
+    def stop(self):
+        """停止检查线程（进程退出时自动调用）"""
+        self._stop.set()
+        if self._file is not None:
+            faulthandler.cancel_dump_traceback_later()
+
+    def _start(self):
+        try:
+            self._file = open(self.log_path, "a", encoding="utf-8")
+        except OSError as e:
+            log.warning("⚠️ 无法打开卡顿日志 %s（%s），看门狗已关闭", self.log_path, e)
+            self.enabled = False
+            return
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _recovered(self, elapsed):
+        self._write(f"--- {self._stamp()} 恢复：这一帧共 {elapsed:.0f} ms\n\n")
+        log.warning("⏱️ %s 卡顿 %.1f 秒后恢复（调用栈见 %s）", self.where or _script_name(),
+                    elapsed / 1000, self.log_path, extra={"rate": 0})
+        self._captures = 0
+
+    # ------------------------------------------------------------------
+    # 检查线程
+    # ------------------------------------------------------------------
+
+    def _watch(self):
+        interval = max(0.02, self.stall_ms / 4000)
+        while not self._stop.wait(interval):
+            beat = self._beat
+            if beat is None or self._expected:
+                continue
+            elapsed = (time.perf_counter() - beat) * 1000
+            if self._captures < MAX_CAPTURES and elapsed >= self.stall_ms * (1 << self._captures):
+                # 抓取期间主线程可能恢复，以抓取时的心跳为准
+                if beat == self._beat:
+                    self._capture(elapsed)
+
+    def _capture(self, elapsed):
+        first = self._captures == 0
+        self._captures += 1
+        if first:
+            self.stalls += 1
+        frames = sys._current_frames()
+        lines = [f"=== {self._stamp()} {_script_name()}（pid {os.getpid()}）第 {self.stalls} 次卡顿，"
+                 f"已 {elapsed:.0f} ms 没有心跳（阈值 {self.stall_ms:g} ms，第 {self._captures} 次抓取）\n"]
+        if first:
+            lines.extend(self._context())
+        main = frames.pop(self._main, None)
+        if main is not None:
+            lines.append("主线程调用栈：\n")
+            lines.extend(traceback.format_stack(main))
+        if first:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == threading.get_ident():
+                    continue
+                lines.append(f"线程 {names.get(ident, ident)}：\n")
+                lines.extend(traceback.format_stack(frame))
+        lines.append("\n")
+        self._write("".join(lines))
+        if first:
+            log.warning("⏱️ %s 卡顿超过 %g ms，调用栈已写入 %s", self.where or _script_name(),
+                        self.stall_ms, self.log_path, extra={"rate": 0})
+
+    def _context(self):
+        """帧耗时上下文"""
+        lines = [f"心跳位置: {self.where or _script_name()}，第 {self.frame} 帧\n"]
+        intervals = sorted(self._intervals)
+        if intervals:
+            budget = 1000 / 60
+            p95 = intervals[min(len(intervals) - 1, int(len(intervals) * 0.95))]
+            slow = sum(1 for ms in intervals if ms > 2 * budget)
+            lines.append(f"最近 {len(intervals)} 帧间隔: 平均 {sum(intervals) / len(intervals):.1f} ms，"
+                         f"p95 {p95:.1f} ms，最长 {intervals[-1]:.1f} ms，超过 {2 * budget:.0f} ms 的 {slow} 帧\n")
+            lines.append("最近 10 帧: " + " ".join(f"{ms:.0f}" for ms in list(self._intervals)[-10:]) + "\n")
+        phases, sections = frame_profiler.profiler.current_frame()
+        if phases or sections:
+            done = "  ".join(f"{k} {v:.1f}" for k, v in phases.items())
+            sections = "  ".join(f"{k} {v:.1f}" for k, v in sections.items())
+            lines.append(f"当前帧已完成的阶段: {done or '无'}" + (f"；代码段: {sections}" if sections else "") + "\n")
+        return lines
+
+    def _write(self, text):
+        try:
+            self._file.write(text)
+            self._file.flush()
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _stamp():
+        return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# 全局实例，每个场景进程一个
+watchdog = StallWatchdog()
+heartbeat = watchdog.heartbeat
+expect = watchdog.expect
@@ -0,0 +1,16 @@
+"""
+测试公共设置
+被测模块都在项目根目录和 Giraffe_PANJIANI 下（平铺，没有包），直接加入 sys.path；
+只测纯逻辑，不打开窗口和摄像头
+"""
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+for path in (ROOT, ROOT / "Giraffe_PANJIANI"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# 导入 pygame 的模块不需要真实的显示设备
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
@@ -0,0 +1,21 @@
+import pygame
+import pytest
+
+import asset_pack
+
+
+@pytest.mark.parametrize("alpha", [False, True])
+def test_pixel_entries_are_writable_copies(tmp_path, alpha):
+    image = pygame.Surface((8, 4), pygame.SRCALPHA if alpha else 0)
+    image.fill((10, 20, 30, 128 if alpha else 255))
+    png = tmp_path / "image.png"
+    pygame.image.save(image, str(png))
+    asset_pack.build(tmp_path / "test.zpak", pixels=True, paths=[png])
+
+    pack = asset_pack.AssetPack(tmp_path / "test.zpak")
+    surface = pack.load_surface(png)
+    assert surface.get_size() == (8, 4)
+    assert tuple(surface.get_at((0, 0)))[:3] == (10, 20, 30)
+    # 映射是只读的，写入 Surface 不能改到映射内存
+    surface.fill((200, 0, 0))
+    assert tuple(pack.load_surface(png).get_at((0, 0)))[:3] == (10, 20, 30)
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pygame
+import pytest
+
+import delta_frames
+
+
+def _frames(count=4, size=(90, 150)):
+    """循环动画：每帧只有一小块在动，最后一帧与第一帧也不同"""
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, size + (3,), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        frame[10 + i * 15:20 + i * 15, 40:75] = 255 - i * 40
+        frame[-5:, -3:] = i   # 贴着右下角、不满一块的区域
+        frames.append(frame)
+    return frames
+
+
+def _apply(canvas, atlas, placed):
+    for x, y, w, h, ax, ay in placed:
+        canvas[y:y + h, x:x + w] = atlas[ay:ay + h, ax:ax + w]
+
+
+def test_changed_rects_cover_differences():
+    prev, cur = _frames()[:2]
+    rects = delta_frames.changed_rects(prev, cur)
+    covered = np.zeros(prev.shape[:2], dtype=bool)
+    for x, y, w, h in rects:
+        assert x + w <= prev.shape[1] and y + h <= prev.shape[0]
+        covered[y:y + h, x:x + w] = True
+    assert covered[np.any(prev != cur, axis=2)].all()
+    assert not covered.all()
+    assert delta_frames.changed_rects(prev, prev) == []
+
+
+def test_encode_round_trip():
+    frames = _frames()
+    atlas, patches = delta_frames.encode(frames)
+    assert len(patches) == len(frames)
+    assert atlas.shape[1] == frames[0].shape[1]
+
+    canvas = frames[0].copy()
+    # 循环两圈，回到开头时用第 0 帧的小块
+    for step in range(1, 2 * len(frames) + 1):
+        index = step % len(frames)
+        _apply(canvas, atlas, patches[index])
+        np.testing.assert_array_equal(canvas, frames[index])
+
+
+def test_encode_static_animation():
+    frame = _frames(1)[0]
+    atlas, patches = delta_frames.encode([frame, frame.copy()])
+    assert patches == [[], []]
+    assert atlas.shape[0] == 1
+
+
+@pytest.fixture
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+
+def test_delta_animation_matches_frames(display):
+    frames = _frames()
+    atlas, patches = delta_frames.encode(frames)
+    surfaces = [pygame.surfarray.make_surface(a.swapaxes(0, 1)) for a in (frames[0], atlas)]
+    stream = SimpleNamespace(frames=surfaces)
+    animation = delta_frames.DeltaAnimation(stream, patches, [100] * len(frames))
+
+    assert animation.update(50) == []
+    for step in range(1, len(frames) + 2):
+        dirty = animation.update(100)
+        index = step % len(frames)
+        assert dirty == [pygame.Rect(p[:4]) for p in patches[index]]
+        pixels = pygame.surfarray.array3d(animation.surface).swapaxes(0, 1)
+        np.testing.assert_array_equal(pixels, frames[index])
+
+
+def test_delta_animation_waits_for_atlas(display):
+    frames = _frames()
+    atlas, patches = delta_frames.encode(frames)
+    stream = SimpleNamespace(frames=[pygame.surfarray.make_surface(frames[0].swapaxes(0, 1))])
+    animation = delta_frames.DeltaAnimation(stream, patches, [100] * len(frames))
+    # 图集还没加载完时停在关键帧
+    assert animation.update(1000) == []
+    assert animation.index == 0
@@ -0,0 +1,23 @@
+from frame_profiler import FrameProfiler
+
+
+def test_current_frame_reports_frame_in_progress():
+    profiler = FrameProfiler()
+    assert profiler.current_frame() == ({}, {})
+
+    profiler.enable(history=False)
+    profiler.begin_frame()
+    assert profiler.current_frame() == ({}, {})
+    profiler.mark("events")
+    profiler.add_section("inference", 12.5)
+    phases, sections = profiler.current_frame()
+    assert list(phases) == ["events"]
+    assert sections == {"inference": 12.5}
+
+    # 返回的是副本
+    sections["inference"] = 0
+    assert profiler.current_frame()[1] == {"inference": 12.5}
+
+    for phase in ("update", "draw", "flip"):
+        profiler.mark(phase)
+    assert profiler.current_frame() == ({}, {})
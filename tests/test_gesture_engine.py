@@ -0,0 +1,92 @@
+import numpy as np
+
+import gesture_engine
+from frame_source import LandmarkList
+from gesture_engine import CLAP, NONE, WAVE, GestureEngine, StreamingDTW
+
+FPS = 30
+
+
+def _body(right_wrist=(0.65, 0.75), right_elbow=(0.62, 0.6), left_wrist=(0.35, 0.75), hip_y=0.9):
+    """站立的人（归一化坐标，肩宽 0.2），可以移动右手和臀部"""
+    points = [(0.5, 0.5)] * 33
+    points[11], points[12] = (0.4, 0.5), (0.6, 0.5)
+    points[13], points[14] = (0.38, 0.6), right_elbow
+    points[15], points[16] = left_wrist, right_wrist
+    points[23], points[24] = (0.42, hip_y), (0.58, hip_y)
+    return LandmarkList(points)
+
+
+def _wave(seconds):
+    """右手举过头顶，绕手肘左右摆两个来回"""
+    frames = round(seconds * FPS)
+    for t in np.linspace(0, 1, frames):
+        yield _body(right_wrist=(0.6 + 0.08 * np.sin(2 * np.pi * 2 * t), 0.3), right_elbow=(0.6, 0.4))
+
+
+def _idle(seconds):
+    """站着不动，关键点带一点抖动"""
+    rng = np.random.default_rng(0)
+    for _ in range(round(seconds * FPS)):
+        jitter = rng.normal(0, 0.003, 2)
+        yield _body(right_wrist=(0.65 + jitter[0], 0.75 + jitter[1]))
+
+
+def _feed(engine, frames):
+    return [event for event in map(engine.update, frames) if event != NONE]
+
+
+def test_streaming_dtw_matches_slower_copy_of_template():
+    template = np.sin(np.linspace(0, 2 * np.pi, 10, dtype=np.float32))[:, None]
+    dtw = StreamingDTW("sine", template, [0], [1.0], threshold=0.05)
+
+    # 先静止一段，再做一遍慢一倍的动作
+    stream = [0.0] * 20 + list(np.repeat(template[:, 0], 2))
+    matched = [i for i, value in enumerate(stream) if dtw.update(np.array([value], dtype=np.float32))]
+    # 走到模板最后一帧（重复的第一份）即完成
+    assert matched == [len(stream) - 2]
+    # 匹配后清空，不会重复报告
+    assert dtw.score == np.inf
+
+
+def test_streaming_dtw_ignores_idle_input():
+    template = np.sin(np.linspace(0, 2 * np.pi, 10, dtype=np.float32))[:, None]
+    dtw = StreamingDTW("sine", template, [0], [1.0], threshold=0.05)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        assert not dtw.update(rng.normal(0, 0.02, 1).astype(np.float32))
+    assert dtw.score > dtw.threshold
+
+
+def test_engine_detects_wave():
+    engine = GestureEngine([WAVE, CLAP], fps=FPS)
+    assert _feed(engine, _idle(1)) == []
+    assert _feed(engine, _wave(1.2)) == [WAVE]
+
+
+def test_engine_idle_and_raised_hand_do_not_match():
+    engine = GestureEngine(fps=FPS)
+    assert _feed(engine, _idle(3)) == []
+    # 只举手不摆动不算挥手
+    still = [_body(right_wrist=(0.6, 0.3), right_elbow=(0.6, 0.4))] * (2 * FPS)
+    assert _feed(engine, still) == []
+
+
+def test_engine_losing_the_person_cancels_the_match():
+    engine = GestureEngine([WAVE], fps=FPS)
+    frames = list(_wave(1.2))
+    half = len(frames) // 2
+    assert _feed(engine, frames[:half]) == []
+    assert engine.update(None) == NONE
+    assert _feed(engine, frames[half:]) == []
+
+
+def test_history_ring_buffer_keeps_latest_frames():
+    engine = GestureEngine([WAVE], fps=FPS, history=8)
+    for i, frame in enumerate(_idle(0.5)):
+        engine.update(frame)
+    engine.update(None)
+    points, features, valid = engine.history.latest(3)
+    assert engine.history.count == 8
+    assert valid.tolist() == [True, True, False]
+    assert features.shape == (3, len(gesture_engine.FEATURES))
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from landmark_filter import LandmarkFilter
+from pose_configs import LANDMARK_FILTER, get_filter_params
+
+DT = 1 / 30
+
+
+def _run(smoother, frames):
+    return np.array([smoother(points, i * DT) for i, points in enumerate(frames)])
+
+
+def test_defaults_come_from_pose_configs():
+    smoother = LandmarkFilter()
+    assert {key: getattr(smoother, key) for key in LANDMARK_FILTER} == LANDMARK_FILTER
+    assert LandmarkFilter(beta=0.5).beta == 0.5
+    assert LandmarkFilter(**get_filter_params("strong_action")).min_cutoff == LANDMARK_FILTER["min_cutoff"]
+
+
+def test_reduces_jitter_around_still_point():
+    rng = np.random.default_rng(0)
+    center = np.full((33, 3), 0.5)
+    frames = center + rng.normal(0, 0.01, (300, 33, 3))
+    smoothed = _run(LandmarkFilter(), frames)[30:]
+    raw = frames[30:]
+    # 静止时抖动明显减小，且不偏离真实位置
+    assert smoothed.std(axis=0).mean() < 0.5 * raw.std(axis=0).mean()
+    assert np.abs(smoothed.mean(axis=0) - center).max() < 0.01
+
+
+def test_converges_after_step():
+    frames = [np.zeros((33, 2))] * 10 + [np.ones((33, 2))] * 60
+    smoothed = _run(LandmarkFilter(), frames)
+    # 跳变后第一帧不会直接到位，之后单调逼近，不会越过目标
+    assert 0 < smoothed[10].mean() < 1
+    assert np.all(np.diff(smoothed[10:, 0, 0]) >= 0)
+    assert smoothed.max() <= 1
+    assert smoothed[-1] == pytest.approx(np.ones((33, 2)), abs=1e-3)
+
+
+def test_beta_makes_fast_motion_follow_closer():
+    frames = [np.zeros((33, 2))] * 10 + [np.ones((33, 2))] * 5
+    slow = _run(LandmarkFilter(beta=0.0), frames)
+    fast = _run(LandmarkFilter(beta=5.0), frames)
+    assert fast[-1].mean() > slow[-1].mean()
+
+
+def test_disabled_passes_input_through():
+    rng = np.random.default_rng(1)
+    frames = rng.random((5, 33, 3))
+    np.testing.assert_array_equal(_run(LandmarkFilter(enabled=False), frames), frames)
+
+
+def test_reset_and_non_increasing_timestamp():
+    smoother = LandmarkFilter()
+    smoother(np.zeros((33, 2)), 0.0)
+    # 时间没有前进时返回上一次的结果
+    np.testing.assert_array_equal(smoother(np.ones((33, 2)), 0.0), np.zeros((33, 2)))
+    smoother.reset()
+    np.testing.assert_array_equal(smoother(np.ones((33, 2)), 1.0), np.ones((33, 2)))
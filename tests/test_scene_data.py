@@ -0,0 +1,139 @@
+import copy
+import json
+
+import pytest
+
+import scene_data
+from scene_data import Expr, SceneError
+
+NAMES = ("W", "H", "w", "h")
+
+
+def test_expr_numbers_and_constant_expressions():
+    assert Expr(5, NAMES, "x")() == 5
+    assert Expr(0.5, NAMES, "x")() == 0.5
+    # 常量表达式在加载时求值
+    expr = Expr("2 / 3", NAMES, "x")
+    assert expr.value == pytest.approx(2 / 3)
+    assert expr() == pytest.approx(2 / 3)
+
+
+def test_expr_with_variables():
+    expr = Expr("(H - h) // 2 + -w % 7", NAMES, "spawn.y")
+    assert expr.value is None
+    assert expr(W=1280, H=720, w=100, h=50) == (720 - 50) // 2 + -100 % 7
+
+
+@pytest.mark.parametrize("source", [
+    "__import__('os')",           # 函数调用
+    "W.__class__",                # 属性访问
+    "[W, H]",                     # 列表
+    "W if H else h",              # 条件表达式
+    "W ** 2",                     # 不支持的运算符
+    "lambda: W",
+])
+def test_expr_rejects_unsupported_syntax(source):
+    with pytest.raises(SceneError, match="spawn.x"):
+        Expr(source, NAMES, "spawn.x")
+
+
+@pytest.mark.parametrize("source, message", [
+    ("W + x", "未知变量 x"),
+    ("W + 'a'", "只能有数字"),
+    ("W + True", "只能有数字"),
+    ("W +", "语法错误"),
+    (True, "应为数字或表达式"),
+    (None, "应为数字或表达式"),
+    ([1, 2], "应为数字或表达式"),
+])
+def test_expr_errors(source, message):
+    with pytest.raises(SceneError, match=message):
+        Expr(source, NAMES, "spawn.x")
+
+
+def test_constant_only_fields_reject_variables():
+    with pytest.raises(SceneError, match="未知变量 W（可用: 无）"):
+        Expr("W / 2", (), "speed")
+
+
+def _main_data():
+    return json.loads((scene_data.SCENES_DIR / "main.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("name", sorted(p.stem for p in scene_data.SCENES_DIR.glob("*.json")))
+def test_bundled_scenes_load(name):
+    scene = scene_data.load(name)
+    assert scene.name == name
+    assert scene.background
+
+
+def test_spawn_position_uses_expressions():
+    scene = scene_data.load("main")
+    x, y = scene.spawn_position((1280, 720), (100, 50))
+    assert (x, y) == (0, (720 - 50) // 2)
+
+
+def test_scene_missing_field():
+    data = _main_data()
+    del data["character"]
+    with pytest.raises(SceneError, match="缺少 character"):
+        scene_data.Scene("main", data)
+
+
+def test_scene_unknown_field():
+    data = _main_data()
+    data["spwan"] = {"x": 0, "y": 0}
+    with pytest.raises(SceneError, match="未知字段 spwan"):
+        scene_data.Scene("main", data)
+
+
+def test_scene_nested_errors_name_the_field():
+    data = _main_data()
+    data["spawn"] = {"x": "W + open"}
+    with pytest.raises(SceneError, match="spawn: 缺少 y"):
+        scene_data.Scene("main", data)
+
+    data["spawn"] = {"x": "open('x')", "y": 0}
+    with pytest.raises(SceneError, match="spawn.x"):
+        scene_data.Scene("main", data)
+
+    data = _main_data()
+    data["probe"] = [1, 2, 3]
+    with pytest.raises(SceneError, match="probe"):
+        scene_data.Scene("main", data)
+
+
+def test_scene_bad_on_click():
+    data = _main_data()
+    data["triggers"][0]["dialogue"][0]["on_click"] = "explode"
+    with pytest.raises(SceneError, match="triggers\\[0\\]"):
+        scene_data.Scene("main", data)
+
+
+def test_scene_duplicate_trigger_names():
+    data = _main_data()
+    data["triggers"].append(copy.deepcopy(data["triggers"][0]))
+    with pytest.raises(SceneError, match="重名: door"):
+        scene_data.Scene("main", data)
+
+
+def test_load_missing_and_malformed(tmp_path):
+    with pytest.raises(SceneError, match="找不到场景文件"):
+        scene_data.load("no_such_scene")
+
+    broken = tmp_path / "broken.json"
+    broken.write_text("{", encoding="utf-8")
+    with pytest.raises(SceneError, match="JSON 格式错误"):
+        scene_data.load(broken)
+
+
+def test_video_page_needs_scene_video():
+    data = _main_data()
+    assert not scene_data.Scene("main", data).plays_video
+
+    data["triggers"][0]["dialogue"][0]["on_click"] = "video"
+    assert scene_data.Scene("main", data).plays_video
+
+    del data["video"]
+    with pytest.raises(SceneError, match="on_click=video 需要场景的 video 字段"):
+        scene_data.Scene("main", data)
@@ -0,0 +1,61 @@
+import pytest
+
+from triggers import CircleZone, RectZone, TriggerIndex, ENTER, EXIT, INF, STAY
+
+
+def _types(events):
+    return [(event.type, event.zone.name) for event in events]
+
+
+def test_circle_enter_stay_exit():
+    triggers = TriggerIndex((0, 0, 1280, 720))
+    triggers.add(CircleZone("door", 550, 600, 40))
+
+    assert _types(triggers.update(100, 100)) == []
+    assert _types(triggers.update(550, 640)) == [(ENTER, "door")]   # 边界上算在区域内
+    assert triggers.is_inside("door")
+    assert _types(triggers.update(560, 600)) == [(STAY, "door")]
+    assert _types(triggers.update(550, 641)) == [(EXIT, "door")]
+    assert not triggers.is_inside("door")
+    assert _types(triggers.update(550, 700)) == []
+
+
+def test_exit_events_come_before_enter():
+    triggers = TriggerIndex((0, 0, 1280, 720))
+    triggers.add(CircleZone("a", 100, 100, 50))
+    triggers.add(CircleZone("b", 200, 100, 50))
+
+    triggers.update(90, 100)
+    assert _types(triggers.update(210, 100)) == [(EXIT, "a"), (ENTER, "b")]
+
+
+def test_overlapping_zones_in_insertion_order():
+    triggers = TriggerIndex((0, 0, 1280, 720))
+    triggers.add(RectZone("room", 0, 0, 400, 400))
+    triggers.add(CircleZone("chair", 200, 200, 30))
+
+    assert _types(triggers.update(200, 200)) == [(ENTER, "room"), (ENTER, "chair")]
+    assert _types(triggers.update(300, 300)) == [(EXIT, "chair"), (STAY, "room")]
+
+
+def test_edge_zone_outside_grid():
+    # 画面右边缘以外的出口：超出网格范围的点归入边缘格子
+    triggers = TriggerIndex((0, 0, 1280, 720))
+    triggers.add(RectZone("right", 1280, -INF, INF, INF, scene="pig.py"))
+
+    assert _types(triggers.update(1279, 360)) == []
+    events = triggers.update(1300, 360)
+    assert _types(events) == [(ENTER, "right")]
+    assert events[0].zone.data["scene"] == "pig.py"
+
+
+def test_remove_and_duplicate_name():
+    triggers = TriggerIndex((0, 0, 1280, 720))
+    triggers.add(CircleZone("door", 100, 100, 20))
+    with pytest.raises(ValueError):
+        triggers.add(CircleZone("door", 300, 300, 20))
+
+    triggers.update(100, 100)
+    triggers.remove("door")
+    assert not triggers.is_inside("door")
+    assert triggers.update(100, 100) == []
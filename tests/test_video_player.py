@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+import pytest
+
+from video_player import VideoPlayer
+
+FPS = 10
+FRAMES = 12
+SIZE = (64, 48)
+
+
+@pytest.fixture
+def video(tmp_path):
+    """每帧整幅填成 帧号 * 20 的灰度，方便从画面读出帧号"""
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), FPS, SIZE)
+    for i in range(FRAMES):
+        writer.write(np.full((SIZE[1], SIZE[0], 3), i * 20, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _shown(player):
+    return round(int(player.frame_surface.surface.get_at((10, 10))[0]) / 20)
+
+
+def _play(path, dts):
+    player = VideoPlayer(path, SIZE)
+    player._sync = True   # 与回放输入时相同：等待解码
+    assert player.start()
+    shown = []
+    for dt in dts:
+        player.update(dt)
+        shown.append(_shown(player))
+    player.stop()
+    return shown, player
+
+
+def test_playback_follows_frame_intervals(video):
+    # 帧间隔 50 ms，视频 10 fps：每两帧换一次视频帧
+    shown, player = _play(video, [50] * 20)
+    assert shown == [i // 2 for i in range(20)]
+    assert player.dropped == 0
+
+
+def test_slow_frames_drop_video_frames(video):
+    shown, player = _play(video, [0] + [250] * 4)
+    assert shown == [0, 2, 5, 7, 10]
+    assert player.dropped > 0
+
+
+def test_finishes_after_last_frame(video):
+    _, player = _play(video, [100] * (FRAMES + 2))
+    assert player.finished
+    assert player.presented == FRAMES
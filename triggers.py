@@ -0,0 +1,160 @@
+"""
+触发区域
+场景中的交互点（门口、楼层触发点）和出口（画面边缘）统一用圆形/矩形区域描述，
+放进均匀网格索引：每帧只检查检测点所在格子里的区域，区域数量增加时每帧开销基本不变；
+圆形区域用平方距离判断，不开方
+
+每次 update() 返回进入（enter）、停留（stay）、离开（exit）事件
+
+用法：
+    triggers = TriggerIndex((0, 0, 1280, 720))
+    door = triggers.add(CircleZone("door", 550, 600, 40))
+    triggers.add(RectZone("right", 1280, -INF, INF, INF, scene="Zammis-Delivery/pig.py"))
+    for event in triggers.update(x, y):
+        if event.type == "enter" and event.zone is door:
+            ...
+"""
+from collections import namedtuple
+
+INF = float("inf")
+CELL_SIZE = 128
+
+ENTER = "enter"
+STAY = "stay"
+EXIT = "exit"
+
+TriggerEvent = namedtuple("TriggerEvent", "type zone x y")
+
+
+class CircleZone:
+    """圆形区域"""
+
+    def __init__(self, name, x, y, radius, **data):
+        """
+        Args:
+            name: 区域名（在同一个索引中唯一）
+            x, y: 圆心
+            radius: 半径（边界上算在区域内）
+            data: 附加数据，如出口对应的场景脚本
+        """
+        self.name = name
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.r2 = radius * radius
+        self.data = data
+
+    @property
+    def bounds(self):
+        return self.x - self.radius, self.y - self.radius, self.x + self.radius, self.y + self.radius
+
+    def contains(self, px, py):
+        dx = px - self.x
+        dy = py - self.y
+        return dx * dx + dy * dy <= self.r2
+
+    def distance(self, px, py):
+        """到圆心的距离（调试显示用）"""
+        return ((px - self.x) ** 2 + (py - self.y) ** 2) ** 0.5
+
+
+class RectZone:
+    """矩形区域，边可以是 ±INF（如画面边缘以外的整个半平面）"""
+
+    def __init__(self, name, x0, y0, x1, y1, **data):
+        """
+        Args:
+            name: 区域名（在同一个索引中唯一）
+            x0, y0, x1, y1: 左上角和右下角（边界上算在区域内）
+            data: 附加数据
+        """
+        self.name = name
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+        self.data = data
+
+    @property
+    def bounds(self):
+        return self.x0, self.y0, self.x1, self.y1
+
+    def contains(self, px, py):
+        return self.x0 <= px <= self.x1 and self.y0 <= py <= self.y1
+
+    def distance(self, px, py):
+        """到矩形的距离，在区域内为 0（调试显示用）"""
+        dx = max(self.x0 - px, 0, px - self.x1)
+        dy = max(self.y0 - py, 0, py - self.y1)
+        return (dx * dx + dy * dy) ** 0.5
+
+
+class TriggerIndex:
+    """区域网格索引，跟踪一个检测点的进入/停留/离开"""
+
+    def __init__(self, bounds, cell_size=CELL_SIZE):
+        """
+        Args:
+            bounds: 网格覆盖范围 (x0, y0, x1, y1)，通常是窗口；范围外的点和区域归入边缘格子
+            cell_size: 格子边长（像素）
+        """
+        self.x0, self.y0, self.x1, self.y1 = bounds
+        self.cell_size = cell_size
+        self.cols = max(1, int((bounds[2] - bounds[0]) // cell_size) + 1)
+        self.rows = max(1, int((bounds[3] - bounds[1]) // cell_size) + 1)
+        self.zones = {}
+        self._cells = {}
+        self._inside = {}  # 当前所在区域（按进入顺序）
+
+    def _cell(self, x, y):
+        # 先夹到网格范围内（也处理 ±INF）
+        col = int((min(max(x, self.x0), self.x1) - self.x0) // self.cell_size)
+        row = int((min(max(y, self.y0), self.y1) - self.y0) // self.cell_size)
+        return col, row
+
+    def add(self, zone):
+        """
+        加入区域
+
+        Returns:
+            zone: 传入的区域，便于保存引用
+        """
+        if zone.name in self.zones:
+            raise ValueError(f"区域重名: {zone.name}")
+        self.zones[zone.name] = zone
+        x0, y0, x1, y1 = zone.bounds
+        c0, r0 = self._cell(x0, y0)
+        c1, r1 = self._cell(x1, y1)
+        for col in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                self._cells.setdefault((col, row), []).append(zone)
+        return zone
+
+    def remove(self, name):
+        zone = self.zones.pop(name)
+        for cell in self._cells.values():
+            if zone in cell:
+                cell.remove(zone)
+        self._inside.pop(name, None)
+
+    def query(self, x, y):
+        """
+        Returns:
+            zones: 包含点 (x, y) 的区域列表
+        """
+        return [zone for zone in self._cells.get(self._cell(x, y), ()) if zone.contains(x, y)]
+
+    def update(self, x, y):
+        """
+        移动检测点，返回本帧的事件（先是离开事件，之后按区域加入顺序给出进入或停留事件）
+
+        Returns:
+            events: TriggerEvent 列表
+        """
+        current = {zone.name: zone for zone in self.query(x, y)}
+        events = [TriggerEvent(EXIT, zone, x, y) for name, zone in self._inside.items() if name not in current]
+        for name, zone in current.items():
+            events.append(TriggerEvent(STAY if name in self._inside else ENTER, zone, x, y))
+        self._inside = current
+        return events
+
+    def is_inside(self, name):
+        """检测点当前是否在区域内（以最近一次 update 为准）"""
+        return name in self._inside
@@ -0,0 +1,160 @@
+"""
+线程化视频播放器
+解码在后台线程进行，主循环每帧调用 update(dt) 按播放进度取帧显示，落后时丢帧追赶
+
+播放进度由主循环的帧间隔（input_replay.Clock）累加，不读系统时钟：回放输入时每帧显示的视频帧与录制时一致；
+回放时解码跟不上也会等到该显示的帧解码完成，而不是先显示旧帧
+"""
+import queue
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import game_log
+import input_replay
+from video_surface import FrameSurface
+
+# 解码线程写入队列的结束标记
+_EOF = object()
+
+log = game_log.get_logger("video")
+
+
+class VideoPlayer:
+    """非阻塞视频播放组件"""
+
+    def __init__(self, path, size, queue_size=4):
+        """
+        Args:
+            path: 视频文件路径
+            size: 显示尺寸 (width, height)
+            queue_size: 已解码帧队列长度（越小越省内存，越大越能抵抗解码抖动）
+        """
+        self.path = Path(path)
+        self.size = (int(size[0]), int(size[1]))
+        self.frame_surface = FrameSurface(self.size)
+        self.fps = 30.0
+        self.finished = False
+        self.presented = 0  # 已显示帧数
+        self.dropped = 0    # 因落后而跳过的帧数
+
+        self._frames = queue.Queue(maxsize=queue_size)
+        # 复用的帧缓冲：队列里最多 queue_size 帧，主线程手上最多 2 帧（待显示 + 正在拷贝），解码线程正在写 1 帧
+        width, height = self.size
+        self._buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(queue_size + 3)]
+        self._stop = threading.Event()
+        self._thread = None
+        self._cap = None
+        self._pending = None      # 已取出但还未到显示时间的帧
+        self.position = 0         # 播放进度（毫秒），按帧间隔累加
+        # 回放输入时等待解码，保证逐帧结果与录制时一致
+        self._sync = input_replay.is_replaying()
+
+    def start(self):
+        """
+        打开视频并启动解码线程
+
+        Returns:
+            ok: 是否成功开始播放
+        """
+        if not self.path.exists():
+            log.error("找不到视频文件: %s", self.path)
+            return False
+        cap = cv2.VideoCapture(str(self.path))
+        if not cap.isOpened():
+            log.error("无法打开视频: %s", self.path)
+            return False
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._cap = cap
+        self._thread = threading.Thread(target=self._decode_loop, name="video-decoder", daemon=True)
+        self._thread.start()
+        log.info("开始播放视频: %s", self.path)
+        return True
+
+    def _decode_loop(self):
+        """解码线程：读取、缩放到显示尺寸后放入有界队列"""
+        raw = None
+        index = 0
+        try:
+            while not self._stop.is_set():
+                ret, raw = self._cap.read(raw)
+                if not ret:
+                    break
+                buf = self._buffers[index % len(self._buffers)]
+                if raw.shape[1] == self.size[0] and raw.shape[0] == self.size[1]:
+                    buf[...] = raw
+                else:
+                    cv2.resize(raw, self.size, dst=buf, interpolation=cv2.INTER_LINEAR)
+                item = (index, buf)
+                index += 1
+                # 队列满时阻塞等待，但要能及时响应 stop()
+                while not self._stop.is_set():
+                    try:
+                        self._frames.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        finally:
+            self._cap.release()
+            while not self._stop.is_set():
+                try:
+                    self._frames.put(_EOF, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def update(self, dt):
+        """
+        推进播放（不阻塞，回放输入时除外），每个主循环帧调用一次
+
+        Args:
+            dt: 距上一帧的毫秒数（clock.get_time()）
+
+        Returns:
+            changed: 本次是否换了新的一帧
+        """
+        if self.finished or self._thread is None:
+            return False
+        if self.presented:
+            # 第一帧在开始播放时立即显示
+            self.position += dt
+        due = None
+        while True:
+            if self._pending is None:
+                try:
+                    self._pending = self._frames.get(block=self._sync)
+                except queue.Empty:
+                    break
+            if self._pending is _EOF:
+                # 先把最后一帧显示出来，下一次 update 再结束
+                if due is None:
+                    self.finished = True
+                    log.info("视频播放结束: %s（显示 %d 帧，丢弃 %d 帧）", self.path, self.presented, self.dropped)
+                break
+            index, frame = self._pending
+            # 按帧号比较（不用浮点时间戳），累加误差不会让换帧提前或推后一帧
+            if index * 1000 > self.position * self.fps:
+                break
+            if due is not None:
+                self.dropped += 1
+            due = self._pending
+            self._pending = None
+
+        if due is None:
+            return False
+        self.frame_surface.update(due[1])
+        self.presented += 1
+        return True
+
+    def draw(self, screen, position=(0, 0)):
+        """把当前帧绘制到屏幕"""
+        screen.blit(self.frame_surface.surface, position)
+
+    def stop(self):
+        """停止解码线程并释放资源"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.finished = True
@@ -0,0 +1,67 @@
+"""
+视频/摄像头帧显示工具
+把 OpenCV 解码出的 BGR 帧直接写入预分配的 pygame Surface，避免每帧多次整帧拷贝
+"""
+import cv2
+import numpy as np
+import pygame
+
+# BGR 字节序对应的通道掩码：内存中依次为 B、G、R，用掩码告诉 SDL 如何解释，无需 cvtColor
+BGR_MASKS = (0xFF0000, 0x00FF00, 0x0000FF, 0)
+
+
+class FrameSurface:
+    """可复用的帧显示 Surface"""
+
+    def __init__(self, size, interpolation=cv2.INTER_LINEAR):
+        """
+        Args:
+            size: 显示尺寸 (width, height)，帧会被缩放到这个尺寸
+            interpolation: cv2.resize 使用的插值方式
+        """
+        self.size = (int(size[0]), int(size[1]))
+        self.interpolation = interpolation
+        width, height = self.size
+        # 24 位 BGR Surface，像素内存布局与 OpenCV 帧一致
+        self.surface = pygame.Surface(self.size, 0, 24, BGR_MASKS)
+        self._pitch = self.surface.get_pitch()
+        # 行没有填充字节时可以直接缩放进 Surface 内存，否则先缩放到复用的中间缓冲区
+        self._contiguous = self._pitch == width * 3
+        self._resize_dst = None if self._contiguous else np.empty((height, width, 3), dtype=np.uint8)
+
+    def _pixels(self, buffer):
+        """返回映射到 Surface 像素内存的 (height, width, 3) BGR 视图"""
+        width, height = self.size
+        return np.ndarray((height, width, 3), dtype=np.uint8, buffer=buffer,
+                          strides=(self._pitch, 3, 1))
+
+    def update(self, frame):
+        """
+        写入一帧 BGR 图像
+
+        Args:
+            frame: OpenCV 帧 (height, width, 3)，BGR 顺序
+
+        Returns:
+            surface: 更新后的 pygame Surface（始终是同一个对象）
+        """
+        # 持有 BufferProxy 期间 Surface 处于锁定状态，写完后必须释放才能 blit
+        buffer = self.surface.get_buffer()
+        try:
+            pixels = self._pixels(buffer)
+            if frame.shape[1] == self.size[0] and frame.shape[0] == self.size[1]:
+                pixels[...] = frame
+            elif self._contiguous:
+                cv2.resize(frame, self.size, dst=pixels, interpolation=self.interpolation)
+            else:
+                cv2.resize(frame, self.size, dst=self._resize_dst, interpolation=self.interpolation)
+                pixels[...] = self._resize_dst
+            del pixels
+        finally:
+            del buffer
+        return self.surface
+
+    def resize(self, size):
+        """窗口尺寸变化时重新分配（尺寸相同则什么都不做）"""
+        if (int(size[0]), int(size[1])) != self.size:
+            self.__init__(size, self.interpolation)